@@ -0,0 +1,62 @@
+import json
+from collections import namedtuple
+
+# Automatic grading of multiple-choice assessments.
+#
+# The answer key of an assessment (correct letter per multiple-choice
+# question, plus the questions only a human can grade) is derived from its
+# cached definition (assessment_cache.py) when that is loaded, so scoring a
+# submission needs no query beyond the definition's version check.
+
+# choices: {question_id: correct letter}; manual: question ids needing a human
+AnswerKey = namedtuple("AnswerKey", ["choices", "manual"])
+
+
+def build_answer_key(questions):
+    """Answer key of an assessment from its question definitions (see assessment_cache.py)."""
+    choices = {}
+    manual = set()
+    for question in questions:
+        if question["question_type"] == "multiple_choice":
+            choices[question["question_id"]] = question["correct_answer"].strip().upper()
+        else:
+            # Open-ended (or untyped) questions are graded by the instructor
+            manual.add(question["question_id"])
+    return AnswerKey(choices, frozenset(manual))
+
+
+def score_answers(answer_key, answers):
+    """
+    Score submitted answers ({question_id: answer}, or its JSON string)
+    against an answer key.
+
+    Returns (grade, results): `results` maps every multiple-choice question id
+    to whether it was answered correctly; `grade` is the percentage of
+    correct answers (0-100), or None when the assessment has questions that
+    need a human, or no questions at all.
+    """
+    if isinstance(answers, str):
+        try:
+            answers = json.loads(answers)
+        except ValueError:
+            answers = {}
+    answers = answers if isinstance(answers, dict) else {}
+
+    results = {
+        question_id: str(answers.get(question_id, "")).strip().upper() == correct
+        for question_id, correct in answer_key.choices.items()
+    }
+    if answer_key.manual or not results:
+        return None, results
+    grade = round(100 * sum(results.values()) / len(results))
+    return grade, results
+
+
+def combine_grade(auto_points, auto_max_points, manual_max_points, manual_grade):
+    """
+    Grade (0-100) of an assessment with open-ended questions, from the
+    multiple-choice points stored at submit time and the instructor's grade
+    (0-100) of the open-ended part. Every question weighs the same.
+    """
+    manual_points = manual_max_points * manual_grade / 100
+    return round(100 * (auto_points + manual_points) / (auto_max_points + manual_max_points))
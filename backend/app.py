@@ -1,8 +1,13 @@
 import os
-from flask import Flask
+from flask import Flask, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
-from db import connect_postgres_db, connect_project_db
+import db
+from db import connect_postgres_db, close_pool
+from prepared import statement_stats
+from report_cache import start_report_cache_refresher
+from report_jobs import start_report_job_heartbeat
+from migrate import migrate
 
 app = Flask(__name__)
 load_dotenv()
@@ -17,12 +22,19 @@ DB_PORT = os.getenv("DB_PORT")
 app.secret_key = os.getenv("SECRET_KEY", "your_default_secret_key")
 CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
 
+# Request-scoped DB session: one pooled connection per request, returned at teardown
+db.init_app(app)
+
 
 def reset_database():
     """
     Drops and recreates the LearnHub DB by connecting to 'postgres' DB
-    (because we can't drop the DB we're connected to).
+    (because we can't drop the DB we're connected to). The empty database
+    is then built by migrate().
     """
+    # Pooled connections would be terminated below anyway, drop them cleanly first
+    close_pool()
+
     conn = connect_postgres_db()
     conn.autocommit = True
     cursor = conn.cursor()
@@ -47,43 +59,20 @@ def reset_database():
     conn.close()
 
 
-import subprocess
-
-
-def initialize_tables():
-    """
-    Initializes database tables using Python's psycopg2 instead of the psql CLI tool
-    """
-    schema_path = os.path.join(os.path.dirname(__file__), "schema.sql")
-    
-    # Read the schema.sql file
-    with open(schema_path, 'r') as f:
-        schema_sql = f.read()
-    
-    print("Running schema.sql via Python connection...")
-    
-    # Connect to the project database
-    conn = connect_project_db()
-    conn.autocommit = True
-    cursor = conn.cursor()
-    
-    try:
-        # Execute the SQL commands
-        cursor.execute(schema_sql)
-        print("✅ Tables initialized successfully")
-    except Exception as e:
-        print(f"❌ Error initializing tables: {e}")
-        raise
-    finally:
-        # Close cursor and connection
-        cursor.close()
-        conn.close()
-
 @app.route("/")
 def home():
     return "Backend is running!"
 
 
+@app.route("/api/db/stats")
+def db_stats():
+    # Pool usage and prepared-statement plan cache hits, for monitoring
+    return jsonify({
+        "pool": db.get_pool().stats(),
+        "prepared_statements": statement_stats(),
+    })
+
+
 # ───── ROUTES ─────
 from routes.auth import auth_bp
 from routes.create_course import course_bp
@@ -124,12 +113,27 @@ app.register_blueprint(content_operations_bp)
 app.register_blueprint(grading_bp)
 
 
+# ───── BACKGROUND WORK ─────
+# Every serving process starts the report snapshot refresher (one of them at
+# a time actually refreshes, see report_cache.py) and the report job
+# heartbeat, which also fails jobs left behind by dead processes, whether it
+# runs under a WSGI server or app.run(). Only the debug reloader's watcher process (this
+# file run as __main__ before the reloader re-runs it with WERKZEUG_RUN_MAIN
+# set) serves nothing and is skipped.
+if __name__ != "__main__" or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+    start_report_cache_refresher()
+    start_report_job_heartbeat()
+
+
 # ───── DB RESET IF SPECIFIED ─────
+# Local development only: wipes all data. Schema changes are shipped as
+# migrations (see migrate.py) and applied on every startup instead.
 RESET_DB = os.getenv("RESET_DB", "false").lower() == "true"
 print(f"RESET_DB = {RESET_DB}")
 
 if __name__ == "__main__":
     if RESET_DB:
         reset_database()
-        initialize_tables()
+    # Builds an empty database from schema.sql, then applies pending migrations
+    migrate()
     app.run(host="0.0.0.0", port=5001, debug=True)
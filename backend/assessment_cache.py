@@ -0,0 +1,144 @@
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from answer_keys import build_answer_key
+
+# Cached assessment definitions.
+#
+# An assessment's questions (with their multiple_choice / open_ended rows)
+# change rarely but are read on every content view, submission and grading
+# page. Each process keeps the definitions it has loaded, together with the
+# assessment.question_version they were loaded at. The database bumps that
+# stamp on every question change (QUESTION VERSIONS in schema.sql), so a read
+# only has to compare stamps: a primary-key lookup, or a single unnest query
+# for a whole page of assessments. Changes made by other processes, or by
+# hand, are therefore never served stale. At most ASSESSMENT_CACHE_SIZE
+# definitions are kept per process, least recently used first out.
+ASSESSMENT_CACHE_SIZE = int(os.getenv("ASSESSMENT_CACHE_SIZE", "1000"))
+
+# questions: [{question_id, question_body, max_time, question_type, correct_answer}]
+# in question_id order; answer_key: the AnswerKey derived from them
+Assessment = namedtuple("Assessment", ["version", "questions", "answer_key"])
+
+_cache = OrderedDict()  # (course_id, sec_id, content_id) -> Assessment
+_cache_lock = threading.Lock()
+
+
+def _load(cursor, keys):
+    """Read the definitions of the given assessments ({key: version}) in one query."""
+    columns = [list(column) for column in zip(*keys)]
+    cursor.execute(
+        """
+        SELECT q.course_id, q.sec_id, q.content_id,
+               q.question_id, q.question_body, q.max_time,
+               mc.correct_answer AS mc_answer,
+               oe.answer AS oe_answer,
+               oe.question_id IS NOT NULL AS is_open_ended
+        FROM question q
+        JOIN unnest(%s::VARCHAR[], %s::VARCHAR[], %s::VARCHAR[]) AS k(course_id, sec_id, content_id)
+          ON q.course_id = k.course_id AND q.sec_id = k.sec_id AND q.content_id = k.content_id
+        LEFT JOIN multiple_choice mc
+          ON mc.course_id = q.course_id AND mc.sec_id = q.sec_id
+         AND mc.content_id = q.content_id AND mc.question_id = q.question_id
+        LEFT JOIN open_ended oe
+          ON oe.course_id = q.course_id AND oe.sec_id = q.sec_id
+         AND oe.content_id = q.content_id AND oe.question_id = q.question_id
+        ORDER BY q.course_id, q.sec_id, q.content_id, q.question_id
+        """,
+        columns,
+    )
+    questions = {key: [] for key in keys}
+    for row in cursor.fetchall():
+        course_id, sec_id, content_id, question_id, body, max_time, mc_answer, oe_answer, is_open_ended = row
+        if mc_answer:
+            question_type = "multiple_choice"
+        elif is_open_ended:
+            question_type = "open_ended"
+        else:
+            question_type = None
+        questions[(course_id, sec_id, content_id)].append({
+            "question_id": question_id,
+            "question_body": body,
+            "max_time": max_time,
+            "question_type": question_type,
+            "correct_answer": mc_answer if mc_answer else oe_answer,
+        })
+    return {
+        key: Assessment(version, questions[key], build_answer_key(questions[key]))
+        for key, version in keys.items()
+    }
+
+
+def _versions(cursor, keys):
+    """Current question_version of each of `keys` that is an assessment."""
+    columns = [list(column) for column in zip(*keys)]
+    cursor.execute(
+        """
+        SELECT a.course_id, a.sec_id, a.content_id, a.question_version
+        FROM assessment a
+        JOIN unnest(%s::VARCHAR[], %s::VARCHAR[], %s::VARCHAR[]) AS k(course_id, sec_id, content_id)
+          ON a.course_id = k.course_id AND a.sec_id = k.sec_id AND a.content_id = k.content_id
+        """,
+        columns,
+    )
+    return {(course_id, sec_id, content_id): version for course_id, sec_id, content_id, version in cursor.fetchall()}
+
+
+def get_assessments(cursor, keys, versions=None):
+    """
+    Definitions of the assessments in `keys` ((course_id, sec_id, content_id)
+    tuples), by key. Keys that are not assessments are left out.
+
+    `versions` ({key: question_version}) can be passed when the caller has
+    already read the stamps (e.g. joined with assessment); otherwise they are
+    read with one query. Missing or outdated definitions are loaded together
+    with one more query.
+    """
+    keys = set(keys)
+    if not keys:
+        return {}
+    if versions is None:
+        versions = _versions(cursor, keys)
+
+    found = {}
+    with _cache_lock:
+        for key in keys:
+            cached = _cache.get(key)
+            if key in versions and cached is not None and cached.version == versions[key]:
+                _cache.move_to_end(key)
+                found[key] = cached
+
+    missing = {key: versions[key] for key in keys if key in versions and key not in found}
+    if missing:
+        loaded = _load(cursor, missing)
+        found.update(loaded)
+        with _cache_lock:
+            for key, assessment in loaded.items():
+                cached = _cache.get(key)
+                # A concurrent request may already have stored a newer version
+                if cached is None or cached.version <= assessment.version:
+                    _cache[key] = assessment
+                    _cache.move_to_end(key)
+            while len(_cache) > ASSESSMENT_CACHE_SIZE:
+                _cache.popitem(last=False)
+    return found
+
+
+def get_assessment(cursor, course_id, sec_id, content_id, version=None):
+    """Definition of one assessment, or None if the content is not an assessment."""
+    key = (course_id, sec_id, content_id)
+    versions = None if version is None else {key: version}
+    return get_assessments(cursor, [key], versions).get(key)
+
+
+def invalidate_assessment(course_id, sec_id, content_id):
+    """Drop the cached definition of an assessment. Call after the question change is committed."""
+    with _cache_lock:
+        _cache.pop((course_id, sec_id, content_id), None)
+
+
+def invalidate_course_assessments(course_id):
+    """Drop the cached definitions of every assessment in a course (e.g. after the course was edited)."""
+    with _cache_lock:
+        for key in [key for key in _cache if key[0] == course_id]:
+            del _cache[key]
@@ -0,0 +1,104 @@
+"""
+Measure notification fan-out throughput.
+
+Creates N throwaway users (ids "Z0000001", ...), then delivers one
+notification to all of them three ways and prints rows/second for each:
+
+- loop:     one INSERT INTO receive per recipient (the old create_notification)
+- user_ids: a single INSERT ... SELECT over the id array (explicit recipient list)
+- audience: fan_out() over an audience of the benchmark users (same query
+            shape as "all_users", restricted to the id prefix), chunked and
+            committed per chunk
+
+Everything the benchmark creates (users, notifications, receive rows) is
+deleted afterwards. Run it against a development database only.
+
+Usage:
+    python bench_notifications.py [recipients] [chunk size]
+"""
+
+import sys
+import time
+from db import borrow_connection
+from notifications import AUDIENCES, NOTIFICATION_FANOUT_CHUNK, deliver_to_users, fan_out, insert_notification
+
+USER_PREFIX = "Z"
+
+# Registered for this process only, so the benchmark never reaches real users
+AUDIENCES["bench_users"] = ('SELECT id FROM "user" WHERE id LIKE %(prefix)s', ("prefix",))
+
+
+def _create_users(cursor, count):
+    cursor.execute(
+        """
+        INSERT INTO "user" (id, first_name, last_name, email, password, registration_date, birth_date, role)
+        SELECT %(prefix)s || lpad(n::TEXT, 7, '0'), 'Bench', 'User',
+               'bench' || n || '@example.invalid', 'x', CURRENT_DATE, DATE '2000-01-01', 'student'
+        FROM generate_series(1, %(count)s) AS n
+        ON CONFLICT DO NOTHING
+        """,
+        {"prefix": USER_PREFIX, "count": count},
+    )
+
+
+def _cleanup(cursor, notification_ids):
+    if notification_ids:
+        cursor.execute("DELETE FROM notification WHERE notification_id = ANY(%s)", (notification_ids,))
+    cursor.execute('DELETE FROM "user" WHERE id LIKE %s', (USER_PREFIX + "%",))
+
+
+def _report(label, rows, seconds):
+    rate = rows / seconds if seconds else float("inf")
+    print(f"{label:<10} {rows:>8} rows  {seconds:8.3f}s  {rate:>10.0f} rows/s")
+
+
+def main(count, chunk_size):
+    notification_ids = []
+    with borrow_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            _create_users(cursor, count)
+            conn.commit()
+            cursor.execute('SELECT id FROM "user" WHERE id LIKE %s ORDER BY id', (USER_PREFIX + "%",))
+            user_ids = [row[0] for row in cursor.fetchall()]
+
+            # Old path: one round trip per recipient, one transaction
+            notification_id = insert_notification(cursor, "benchmark", "loop")
+            notification_ids.append(notification_id)
+            started = time.perf_counter()
+            for user_id in user_ids:
+                cursor.execute(
+                    "INSERT INTO receive (notification_id, id) VALUES (%s, %s)",
+                    (notification_id, user_id),
+                )
+            conn.commit()
+            _report("loop", len(user_ids), time.perf_counter() - started)
+
+            notification_id = insert_notification(cursor, "benchmark", "user_ids")
+            notification_ids.append(notification_id)
+            started = time.perf_counter()
+            rows = deliver_to_users(cursor, notification_id, user_ids)
+            conn.commit()
+            _report("user_ids", rows, time.perf_counter() - started)
+
+            notification_id = insert_notification(cursor, "benchmark", "audience")
+            notification_ids.append(notification_id)
+            started = time.perf_counter()
+            rows = fan_out(
+                conn, notification_id, "bench_users",
+                params={"prefix": USER_PREFIX + "%"}, chunk_size=chunk_size,
+            )
+            _report("audience", rows, time.perf_counter() - started)
+        finally:
+            conn.rollback()
+            _cleanup(cursor, notification_ids)
+            conn.commit()
+            cursor.close()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        count=int(args[0]) if args else 10000,
+        chunk_size=int(args[1]) if len(args) > 1 else NOTIFICATION_FANOUT_CHUNK,
+    )
@@ -0,0 +1,154 @@
+"""
+Check that the SQL in routes/ is served by indexes.
+
+Every string literal in routes/*.py that looks like a query is PREPAREd on
+the project database and its *generic* plan (the plan used for arbitrary
+parameter values) is inspected with sequential scans disabled. Anything
+that still reads a watched table with a Seq Scan, or walks a whole index
+without an index condition, has no index to back it and is reported.
+
+Nothing is executed: only PREPARE/EXPLAIN run, inside a transaction that is
+rolled back. Exits with status 1 if any query is not index-backed.
+
+Usage:
+    python check_query_plans.py [-v]
+"""
+
+import ast
+import os
+import re
+import sys
+import psycopg2
+from db import borrow_connection
+
+ROUTES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "routes")
+
+# Reporting queries aggregate whole tables on purpose (and are served from
+# materialized views / background jobs), so they are not checked
+SKIP_FILES = {"generate_report.py"}
+
+# Tables that grow with users/activity; small lookup tables are not reported
+WATCHED_TABLES = {
+    "enroll",
+    "course",
+    "receive",
+    "notification",
+    "submit",
+    "complete",
+    "feedback",
+    "comment",
+    "apply_financial_aid",
+    "earn_certificate",
+    "student_category",
+    "content",
+    "section",
+    "task",
+    "question",
+}
+
+SQL_START = re.compile(r"^\s*(SELECT|WITH|UPDATE|DELETE|INSERT)\b", re.IGNORECASE)
+PLACEHOLDER = re.compile(r"%\((\w+)\)s|%s|%%")
+
+
+def collect_queries():
+    """Yield (file name, line number, sql) for every SQL string literal in routes/."""
+    for name in sorted(os.listdir(ROUTES_DIR)):
+        if not name.endswith(".py") or name in SKIP_FILES:
+            continue
+        with open(os.path.join(ROUTES_DIR, name)) as f:
+            tree = ast.parse(f.read(), filename=name)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                if SQL_START.match(node.value) and re.search(r"\b(FROM|INTO|SET)\b", node.value, re.IGNORECASE):
+                    yield name, node.lineno, node.value
+
+
+def to_positional(sql):
+    """Rewrite psycopg2 placeholders (%s, %(name)s) as $1, $2, ... Returns (sql, param count)."""
+    names = {}
+    count = 0
+
+    def replace(match):
+        nonlocal count
+        if match.group(0) == "%%":
+            return "%"
+        name = match.group(1)
+        if name is not None and name in names:
+            return f"${names[name]}"
+        count += 1
+        if name is not None:
+            names[name] = count
+        return f"${count}"
+
+    return PLACEHOLDER.sub(replace, sql), count
+
+
+def generic_plan(cursor, sql):
+    """EXPLAIN the generic plan of `sql`, or return None if it cannot be prepared."""
+    positional, param_count = to_positional(sql.strip().rstrip(";"))
+    cursor.execute("SAVEPOINT plan_check")
+    try:
+        cursor.execute(f"PREPARE plan_check AS {positional}")
+        args = f" ({', '.join(['NULL'] * param_count)})" if param_count else ""
+        cursor.execute(f"EXPLAIN (FORMAT JSON) EXECUTE plan_check{args}")
+        plan = cursor.fetchone()[0][0]["Plan"]
+        cursor.execute("RELEASE SAVEPOINT plan_check")
+        return plan
+    except psycopg2.Error:
+        cursor.execute("ROLLBACK TO SAVEPOINT plan_check")
+        return None
+    finally:
+        cursor.execute("DEALLOCATE ALL")
+
+
+def unindexed_scans(plan):
+    """List the watched relations the plan reads without using an index."""
+    found = []
+    relation = plan.get("Relation Name")
+    if relation in WATCHED_TABLES:
+        node_type = plan["Node Type"]
+        if node_type == "Seq Scan":
+            found.append(f"Seq Scan on {relation}")
+        elif node_type in ("Index Scan", "Index Only Scan") and "Index Cond" not in plan:
+            found.append(f"full {node_type} of {plan['Index Name']} on {relation}")
+    for child in plan.get("Plans", []):
+        found.extend(unindexed_scans(child))
+    return found
+
+
+def main(verbose=False):
+    problems = []
+    skipped = []
+    checked = 0
+
+    with borrow_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Generic plans only, and make the planner prefer any usable index
+            cursor.execute("SET LOCAL plan_cache_mode = force_generic_plan")
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+            for name, line, sql in collect_queries():
+                plan = generic_plan(cursor, sql)
+                if plan is None:
+                    skipped.append((name, line))
+                    continue
+                checked += 1
+                for scan in unindexed_scans(plan):
+                    problems.append((name, line, scan))
+        finally:
+            conn.rollback()
+            cursor.close()
+
+    for name, line, scan in problems:
+        print(f"routes/{name}:{line}  {scan}")
+    if verbose:
+        for name, line in skipped:
+            print(f"routes/{name}:{line}  skipped (could not be prepared without its runtime context)")
+
+    print(f"{checked} queries checked, {len(problems)} unindexed scans, {len(skipped)} skipped")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(verbose="-v" in sys.argv[1:]))
@@ -0,0 +1,109 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from flask import Response, jsonify, request
+
+# Response cache for read-mostly course pages.
+#
+# Course overview, syllabus, section and content lists only change when the
+# course is edited, yet are requested on every page view. Each cached
+# response is keyed by the page, its arguments and the course's version
+# stamp: course.page_version (bumped by the COURSE PAGE VERSIONS triggers in
+# schema.sql when the course's editable columns, sections, contents or tasks
+# change). Counters do not bump it, so the overview, which also shows the
+# enrollment count and the instructor's name and rating, is stamped with
+# those on top and the other pages survive enrollments. The stamp comes from one
+# primary-key lookup that also yields what the access checks need, so a
+# cached page costs that single query. Responses carry a strong ETag derived
+# from the key; a client sending it back in If-None-Match gets a 304 without
+# the page being rebuilt or even looked up. At most COURSE_PAGE_CACHE_SIZE
+# responses are kept per process, least recently used first out.
+COURSE_PAGE_CACHE_SIZE = int(os.getenv("COURSE_PAGE_CACHE_SIZE", "2000"))
+
+CourseStamp = namedtuple("CourseStamp", ["status", "creator_id", "version", "overview_version"])
+
+# Page whose stamp includes the counters and instructor details it shows
+OVERVIEW_PAGE = "overview"
+
+_cache = OrderedDict()  # (page, args) -> (version, etag, body)
+_cache_lock = threading.Lock()
+
+
+def course_stamp(cursor, course_id):
+    """Status, creator and version stamps of a course, or None if it does not exist."""
+    cursor.execute(
+        """
+        SELECT c.status, c.creator_id, c.page_version, c.enrollment_count,
+               i.i_rating, u.first_name, u.middle_name, u.last_name
+        FROM course c
+        LEFT JOIN instructor i ON i.id = c.creator_id
+        LEFT JOIN "user" u ON u.id = c.creator_id
+        WHERE c.course_id = %s
+        """,
+        (course_id,),
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    status, creator_id, page_version, enrollment_count, *shown = row
+    version = str(page_version)
+    overview_version = ":".join(map(str, [version, enrollment_count, *shown]))
+    return CourseStamp(status, creator_id, version, overview_version)
+
+
+def _etag(page, args, version):
+    raw = "\x1f".join([page, *map(str, args), version])
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+def _send(body, etag):
+    response = Response(body, status=200, mimetype="application/json")
+    response.set_etag(etag)
+    # Always revalidate; private because unpublished courses are only shown to their creator
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def cached_course_page(page, args, stamp, build):
+    """
+    Serve a course page from the cache.
+
+    `args` identifies the page instance (course id first), `stamp` is the
+    course's CourseStamp and `build()` produces the response payload and
+    status on a miss. Only 200 responses are cached; the access checks are
+    the caller's job and must run before this.
+    """
+    key = (page, tuple(args))
+    version = stamp.overview_version if page == OVERVIEW_PAGE else stamp.version
+    etag = _etag(page, args, version)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == version:
+            _cache.move_to_end(key)
+            return _send(cached[2], cached[1])
+
+    payload, status = build()
+    if status != 200:
+        return jsonify(payload), status
+
+    body = jsonify(payload).get_data()
+    with _cache_lock:
+        _cache[key] = (version, etag, body)
+        _cache.move_to_end(key)
+        while len(_cache) > COURSE_PAGE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return _send(body, etag)
+
+
+def invalidate_course_pages(course_id):
+    """Drop every cached page of a course. Call after the edit is committed."""
+    with _cache_lock:
+        for key in [key for key in _cache if key[1][0] == course_id]:
+            del _cache[key]
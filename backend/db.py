@@ -1,6 +1,13 @@
 import os
+import threading
+import time
+from contextlib import contextmanager
 import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
+import psycopg2.pool
 from dotenv import load_dotenv
+from flask import g, has_request_context
 
 # Load environment from .env (same logic as in app.py)
 env_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".env"))
@@ -13,6 +20,17 @@ POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD")
 DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 
+# Connection pool settings
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))                 # seconds to wait for a free connection
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))    # seconds before a connection is recycled
+DB_POOL_HEALTHCHECK_AFTER = float(os.getenv("DB_POOL_HEALTHCHECK_AFTER", "30"))  # idle seconds before "SELECT 1" on borrow
+
+
+class PoolTimeout(psycopg2.pool.PoolError):
+    """Raised when no pooled connection becomes free within DB_POOL_TIMEOUT."""
+
 
 def connect_postgres_db():
     return psycopg2.connect(
@@ -24,11 +42,337 @@ def connect_postgres_db():
     )
 
 
-def connect_project_db():
+class ProjectConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that remembers which named statements it has PREPAREd (see prepared.py)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
+def _open_project_connection():
     return psycopg2.connect(
         dbname=POSTGRES_DB,
         user=POSTGRES_USER,
         password=POSTGRES_PASSWORD,
         host=DB_HOST,
         port=DB_PORT,
+        connection_factory=ProjectConnection,
     )
+
+
+def connect_listener_db():
+    """
+    Open a dedicated autocommit connection to the project database for
+    LISTEN or a session-level advisory lock. It stays open for the life of
+    the process, so it is not taken from the pool.
+    """
+    conn = _open_project_connection()
+    conn.autocommit = True
+    return conn
+
+
+class PooledConnection:
+    """
+    Thin proxy around a psycopg2 connection borrowed from the pool.
+    Everything is delegated to the real connection except close(),
+    which hands the connection back to the pool instead of closing it.
+    """
+
+    def __init__(self, pool, raw):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_raw", raw)
+
+    def __getattr__(self, name):
+        raw = object.__getattribute__(self, "_raw")
+        if raw is None:
+            raise psycopg2.InterfaceError("connection already returned to the pool")
+        return getattr(raw, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._raw, name, value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def raw(self):
+        return self._raw
+
+    def close(self):
+        raw = self._raw
+        if raw is None:
+            return  # already returned, close() is idempotent
+        object.__setattr__(self, "_raw", None)
+        self._pool.release(raw)
+
+
+class ConnectionPool:
+    """
+    Process-wide pool of connections to the project database.
+
+    - at most `maxconn` connections exist at once; borrowers wait up to
+      `timeout` seconds for one to be returned, then get PoolTimeout
+    - connections older than `max_lifetime` seconds are closed and replaced
+    - connections idle for more than `healthcheck_after` seconds are pinged
+      with "SELECT 1" before being handed out; dead ones are replaced
+    """
+
+    def __init__(self, minconn, maxconn, timeout, max_lifetime, healthcheck_after):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.healthcheck_after = healthcheck_after
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._idle = []        # [(conn, created_at, returned_at)], most recently returned last
+        self._created = {}     # id(conn) -> created_at, for connections currently borrowed
+        self._closed = False
+
+        for _ in range(minconn):
+            conn = _open_project_connection()
+            self._idle.append((conn, time.monotonic(), time.monotonic()))
+
+    def _is_usable(self, conn, created_at, returned_at):
+        now = time.monotonic()
+        if conn.closed:
+            return False
+        if self.max_lifetime and now - created_at > self.max_lifetime:
+            return False
+        if now - returned_at > self.healthcheck_after:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                conn.rollback()
+            except psycopg2.Error:
+                return False
+        return True
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def acquire(self):
+        if self._closed:
+            raise psycopg2.pool.PoolError("connection pool is closed")
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f"no database connection available within {self.timeout}s")
+
+        try:
+            while True:
+                with self._lock:
+                    entry = self._idle.pop() if self._idle else None
+                if entry is None:
+                    conn, created_at = _open_project_connection(), time.monotonic()
+                    break
+                conn, created_at, returned_at = entry
+                if self._is_usable(conn, created_at, returned_at):
+                    break
+                self._discard(conn)
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._created[id(conn)] = created_at
+        return conn
+
+    def release(self, conn):
+        with self._lock:
+            created_at = self._created.pop(id(conn), time.monotonic())
+
+        try:
+            if self._closed or conn.closed:
+                self._discard(conn)
+                return
+
+            # Leave the connection as a fresh one would be: no open transaction, no autocommit
+            try:
+                if conn.status != psycopg2.extensions.STATUS_READY:
+                    conn.rollback()
+                if conn.autocommit:
+                    conn.autocommit = False
+            except psycopg2.Error:
+                self._discard(conn)
+                return
+
+            with self._lock:
+                self._idle.append((conn, created_at, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def closeall(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "idle": len(self._idle),
+                "in_use": len(self._created),
+                "max": self.maxconn,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    minconn=DB_POOL_MIN,
+                    maxconn=DB_POOL_MAX,
+                    timeout=DB_POOL_TIMEOUT,
+                    max_lifetime=DB_POOL_MAX_LIFETIME,
+                    healthcheck_after=DB_POOL_HEALTHCHECK_AFTER,
+                )
+    return _pool
+
+
+def close_pool():
+    """Close every idle pooled connection (e.g. before dropping the database)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+class RequestConnection(PooledConnection):
+    """
+    Handle onto the connection owned by the current request's DBSession.
+    close() is a no-op: the session gives the connection back at teardown.
+    """
+
+    def close(self):
+        pass
+
+
+class DBSession:
+    """
+    Request-scoped database session stored on flask.g.
+
+    The pooled connection is borrowed lazily on first use, so requests that
+    never touch the database never take a connection. At teardown the
+    session closes its cursors, commits (or rolls back if the request raised
+    or answered with an error status) and returns the connection to the pool.
+    """
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._raw = None
+        self._cursors = []
+        self.failed = False
+
+    @property
+    def conn(self):
+        if self._raw is None:
+            self._raw = self._pool.acquire()
+        return self._raw
+
+    def connection(self):
+        return RequestConnection(self._pool, self.conn)
+
+    def cursor(self, dict_cursor=True):
+        if dict_cursor:
+            cursor = self.conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+        else:
+            cursor = self.conn.cursor()
+        self._cursors.append(cursor)
+        return cursor
+
+    def commit(self):
+        if self._raw is not None:
+            self._raw.commit()
+
+    def rollback(self):
+        if self._raw is not None:
+            self._raw.rollback()
+
+    def close(self, commit=True):
+        raw, self._raw = self._raw, None
+        cursors, self._cursors = self._cursors, []
+        for cursor in cursors:
+            if not cursor.closed:
+                cursor.close()
+        if raw is None:
+            return
+        try:
+            if not raw.closed:
+                if commit and not self.failed:
+                    raw.commit()
+                else:
+                    raw.rollback()
+        except psycopg2.Error as e:
+            print(f"Error finishing request transaction: {e}")
+        finally:
+            self._pool.release(raw)
+
+
+def get_db():
+    """Return the DBSession of the current request, creating it on first use."""
+    if "db_session" not in g:
+        g.db_session = DBSession(get_pool())
+    return g.db_session
+
+
+def _mark_failed_response(response):
+    session = g.get("db_session")
+    if session is not None and response.status_code >= 400:
+        session.failed = True
+    return response
+
+
+def _teardown_db(exc):
+    session = g.pop("db_session", None)
+    if session is not None:
+        session.close(commit=exc is None)
+
+
+def init_app(app):
+    """Register the request-scoped session hooks on the Flask app."""
+    app.after_request(_mark_failed_response)
+    app.teardown_appcontext(_teardown_db)
+
+
+def connect_project_db():
+    """
+    Borrow a connection from the process-wide pool.
+
+    Inside a request this is the request's single shared connection (see
+    DBSession); outside of one (startup, background work) calling close()
+    on the returned object gives it back to the pool.
+    """
+    if has_request_context():
+        return get_db().connection()
+    pool = get_pool()
+    return PooledConnection(pool, pool.acquire())
+
+
+@contextmanager
+def borrow_connection():
+    """
+    Borrow a pooled connection that is independent of the current request's
+    session, e.g. for background jobs or autocommit maintenance statements.
+    """
+    pool = get_pool()
+    conn = PooledConnection(pool, pool.acquire())
+    try:
+        yield conn
+    finally:
+        conn.close()
@@ -0,0 +1,246 @@
+"""
+Versioned schema migrations.
+
+schema.sql is the baseline: it builds the complete current schema (and the
+demo data) on an empty database. Changes for databases that already exist
+go into migrations/NNNN_description.sql and are applied in version order,
+each exactly once; schema_migrations records what ran and a checksum of
+every file so an edited migration is caught instead of silently skipped.
+
+schema.sql records itself: its last statements create schema_migrations
+and insert the baseline and every migration it already contains, so a
+database built from it by any means (migrate.py, the Docker init script,
+psql) never re-runs them. Those rows carry no checksum; the first migrate()
+fills it in from the file on disk.
+
+Rules for migration files:
+- every change is also folded into schema.sql, and the migration is added
+  to the schema_migrations rows at the end of schema.sql
+- a database created before migrations were tracked has no history and
+  runs them all, so they must be idempotent (IF NOT EXISTS, ...)
+- a file runs in a single transaction, unless its first line is
+  "-- migrate: no-transaction"; then each statement runs on its own in
+  autocommit mode, which online-safe steps such as CREATE INDEX CONCURRENTLY need
+- DDL waits at most MIGRATION_LOCK_TIMEOUT for table locks, so a migration
+  fails fast rather than queueing live traffic behind it
+
+Usage:
+    python migrate.py            apply pending migrations
+    python migrate.py status     list applied and pending migrations
+"""
+
+import hashlib
+import os
+import re
+import sys
+import time
+from db import borrow_connection
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_PATH = os.path.join(BASE_DIR, "schema.sql")
+MIGRATIONS_DIR = os.path.join(BASE_DIR, "migrations")
+
+MIGRATION_LOCK_TIMEOUT = os.getenv("MIGRATION_LOCK_TIMEOUT", "5s")
+
+# pg_advisory_lock key, so only one process migrates at a time
+MIGRATION_LOCK_ID = 35301
+
+NO_TRANSACTION_MARKER = "-- migrate: no-transaction"
+FILE_PATTERN = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+
+class MigrationError(Exception):
+    """A migration could not be applied, or an applied one has changed on disk."""
+
+
+def _checksum(sql):
+    return hashlib.sha256(sql.encode("utf-8")).hexdigest()
+
+
+def load_migrations():
+    """Return [(version, name, sql)] for every file in migrations/, in version order."""
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = FILE_PATTERN.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(MIGRATIONS_DIR, filename)) as f:
+            migrations.append((int(match.group(1)), match.group(2), f.read()))
+
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise MigrationError("two migration files share a version number")
+    return migrations
+
+
+def _split_statements(sql):
+    # Files run statement by statement hold plain DDL, so splitting on a ";"
+    # that ends a line is enough (no function bodies in them)
+    statements = []
+    for chunk in re.split(r";\s*$", sql, flags=re.MULTILINE):
+        lines = [line for line in chunk.splitlines() if not line.strip().startswith("--")]
+        statement = "\n".join(lines).strip()
+        if statement:
+            statements.append(statement)
+    return statements
+
+
+def _ensure_history(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version      INTEGER PRIMARY KEY,
+            name         VARCHAR(100) NOT NULL,
+            checksum     CHAR(64),
+            applied_at   TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            execution_ms INTEGER
+        )
+    """)
+    # Checksums are NULL for rows inserted by schema.sql until migrate() fills them in
+    cursor.execute("ALTER TABLE schema_migrations ALTER COLUMN checksum DROP NOT NULL")
+
+
+def _applied(cursor):
+    cursor.execute("SELECT version, name, checksum FROM schema_migrations ORDER BY version")
+    return {version: (name, checksum) for version, name, checksum in cursor.fetchall()}
+
+
+def _record(cursor, version, name, checksum, started):
+    cursor.execute(
+        """
+        INSERT INTO schema_migrations (version, name, checksum, execution_ms)
+        VALUES (%s, %s, %s, %s)
+        """,
+        (version, name, checksum, int((time.monotonic() - started) * 1000)),
+    )
+
+
+def _is_empty(cursor):
+    cursor.execute("SELECT to_regclass('public.\"user\"') IS NULL")
+    return cursor.fetchone()[0]
+
+
+def _apply_baseline(conn, cursor):
+    with open(SCHEMA_PATH) as f:
+        schema_sql = f.read()
+
+    print("Empty database, building it from schema.sql")
+    conn.autocommit = False
+    try:
+        # Records the baseline and the migrations it contains in schema_migrations
+        cursor.execute(schema_sql)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise MigrationError(f"baseline schema failed and was rolled back: {e}") from e
+    finally:
+        conn.autocommit = True
+
+
+def _apply(conn, cursor, version, name, sql):
+    started = time.monotonic()
+    label = f"{version:04d}_{name}"
+    print(f"Applying migration {label}...")
+
+    if sql.lstrip().startswith(NO_TRANSACTION_MARKER):
+        conn.autocommit = True
+        cursor.execute("SET lock_timeout = %s", (MIGRATION_LOCK_TIMEOUT,))
+        try:
+            for statement in _split_statements(sql):
+                try:
+                    cursor.execute(statement)
+                except Exception as e:
+                    raise MigrationError(
+                        f"{label} failed on:\n{statement}\n{e}\n"
+                        "A failed CREATE INDEX CONCURRENTLY leaves an INVALID index behind; "
+                        "drop it before re-running."
+                    ) from e
+            _record(cursor, version, name, _checksum(sql), started)
+        finally:
+            cursor.execute("RESET lock_timeout")
+        return
+
+    conn.autocommit = False
+    try:
+        cursor.execute("SET LOCAL lock_timeout = %s", (MIGRATION_LOCK_TIMEOUT,))
+        cursor.execute(sql)
+        _record(cursor, version, name, _checksum(sql), started)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise MigrationError(f"{label} failed and was rolled back: {e}") from e
+    finally:
+        conn.autocommit = True
+
+
+def migrate():
+    """Bring the project database up to date. Safe to call on every startup."""
+    migrations = load_migrations()
+
+    with borrow_connection() as conn:
+        conn.autocommit = True
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+            try:
+                _ensure_history(cursor)
+                applied = _applied(cursor)
+
+                if 0 not in applied and _is_empty(cursor):
+                    _apply_baseline(conn, cursor)
+                    applied = _applied(cursor)
+                elif 0 not in applied:
+                    print("Database predates migration tracking, applying every migration")
+
+                for version, name, sql in migrations:
+                    if version in applied:
+                        if applied[version][1] is None:
+                            # Recorded by schema.sql: take the file as it is now
+                            cursor.execute(
+                                "UPDATE schema_migrations SET checksum = %s WHERE version = %s",
+                                (_checksum(sql), version),
+                            )
+                        elif applied[version][1] != _checksum(sql):
+                            raise MigrationError(
+                                f"migration {version:04d}_{name} was changed after it was applied; "
+                                "add a new migration instead of editing it"
+                            )
+                        continue
+                    _apply(conn, cursor, version, name, sql)
+
+                print("Database schema is up to date")
+            finally:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+        finally:
+            cursor.close()
+
+
+def status():
+    """Print every migration with its state."""
+    migrations = load_migrations()
+    with borrow_connection() as conn:
+        conn.autocommit = True
+        cursor = conn.cursor()
+        try:
+            _ensure_history(cursor)
+            applied = _applied(cursor)
+        finally:
+            cursor.close()
+
+    print(f"0000_baseline: {'applied' if 0 in applied else 'not built from schema.sql'}")
+    for version, name, sql in migrations:
+        if version not in applied:
+            state = "pending"
+        elif applied[version][1] is None:
+            state = "applied (recorded by schema.sql)"
+        elif applied[version][1] != _checksum(sql):
+            state = "applied, CHANGED SINCE"
+        else:
+            state = "applied"
+        print(f"{version:04d}_{name}: {state}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["status"]:
+        status()
+    else:
+        migrate()
@@ -0,0 +1,41 @@
+-- migrate: no-transaction
+-- 0001: secondary indexes for student-, creator- and recipient-keyed lookups
+--
+-- Same indexes as the SECONDARY INDEXES section of schema.sql, built without
+-- blocking writes (CREATE INDEX CONCURRENTLY cannot run inside a transaction).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_enroll_student
+    ON enroll(student_id) INCLUDE (progress_rate, enroll_date);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_course_creator
+    ON course(creator_id, status);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_course_status
+    ON course(status, creation_date DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_receive_user
+    ON receive(id) INCLUDE (read_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_submit_ungraded
+    ON submit(course_id, sec_id, content_id)
+    INCLUDE (submission_date)
+    WHERE grade IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_submit_student
+    ON submit(student_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_complete_student
+    ON complete(student_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_feedback_student
+    ON feedback(student_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_comment_user
+    ON comment(user_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_financial_aid_student
+    ON apply_financial_aid(student_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_financial_aid_pending
+    ON apply_financial_aid(course_id)
+    WHERE status = 'pending';
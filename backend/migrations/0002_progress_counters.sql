@@ -0,0 +1,171 @@
+-- 0002: maintain enroll.progress_rate from counters with statement-level triggers
+--
+-- Replaces the per-row update_progress_rate / update_progress_rate_on_content
+-- triggers, which recounted content and completions for every row.
+
+ALTER TABLE course ADD COLUMN IF NOT EXISTS
+    content_count INTEGER NOT NULL DEFAULT 0 CHECK (content_count >= 0);
+ALTER TABLE enroll ADD COLUMN IF NOT EXISTS
+    completed_count INTEGER NOT NULL DEFAULT 0 CHECK (completed_count >= 0);
+
+DROP TRIGGER IF EXISTS trg_update_progress_rate ON complete;
+DROP TRIGGER IF EXISTS trg_update_progress_rate_on_content ON content;
+DROP FUNCTION IF EXISTS update_progress_rate();
+DROP FUNCTION IF EXISTS update_progress_rate_on_content();
+
+-- PROGRESS COUNTERS
+-- enroll.progress_rate is derived from two counters: course.content_count
+-- (content items in the course) and enroll.completed_count (items the student
+-- completed). Statement-level triggers fold each INSERT/UPDATE/DELETE batch
+-- into the counters in one pass using transition tables.
+
+CREATE OR REPLACE FUNCTION progress_from_counts(completed INTEGER, total INTEGER)
+RETURNS INTEGER AS $$
+    SELECT CASE WHEN total = 0 THEN 0
+                ELSE LEAST(100, ROUND(100.0 * completed / total))::INTEGER END;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Transition tables are only visible inside the trigger function itself,
+-- so each function folds its batch into per-(course, student) deltas inline
+CREATE OR REPLACE FUNCTION count_completions_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE enroll e
+    SET completed_count = e.completed_count + d.delta,
+        progress_rate = progress_from_counts(e.completed_count + d.delta, c.content_count)
+    FROM (
+        SELECT course_id, student_id, COUNT(*)::INTEGER AS delta
+        FROM new_rows
+        WHERE is_completed
+        GROUP BY course_id, student_id
+    ) d
+    JOIN course c ON c.course_id = d.course_id
+    WHERE e.course_id = d.course_id AND e.student_id = d.student_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION count_completions_on_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE enroll e
+    SET completed_count = GREATEST(e.completed_count + d.delta, 0),
+        progress_rate = progress_from_counts(GREATEST(e.completed_count + d.delta, 0), c.content_count)
+    FROM (
+        SELECT course_id, student_id, SUM(change)::INTEGER AS delta
+        FROM (
+            SELECT course_id, student_id, 1 AS change FROM new_rows WHERE is_completed
+            UNION ALL
+            SELECT course_id, student_id, -1 FROM old_rows WHERE is_completed
+        ) changes
+        GROUP BY course_id, student_id
+        HAVING SUM(change) <> 0
+    ) d
+    JOIN course c ON c.course_id = d.course_id
+    WHERE e.course_id = d.course_id AND e.student_id = d.student_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION count_completions_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE enroll e
+    SET completed_count = GREATEST(e.completed_count - d.removed, 0),
+        progress_rate = progress_from_counts(GREATEST(e.completed_count - d.removed, 0), c.content_count)
+    FROM (
+        SELECT course_id, student_id, COUNT(*)::INTEGER AS removed
+        FROM old_rows
+        WHERE is_completed
+        GROUP BY course_id, student_id
+    ) d
+    JOIN course c ON c.course_id = d.course_id
+    WHERE e.course_id = d.course_id AND e.student_id = d.student_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_count_completions_insert ON complete;
+CREATE TRIGGER trg_count_completions_insert
+AFTER INSERT ON complete
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_completions_on_insert();
+
+DROP TRIGGER IF EXISTS trg_count_completions_update ON complete;
+CREATE TRIGGER trg_count_completions_update
+AFTER UPDATE ON complete
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_completions_on_update();
+
+DROP TRIGGER IF EXISTS trg_count_completions_delete ON complete;
+CREATE TRIGGER trg_count_completions_delete
+AFTER DELETE ON complete
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_completions_on_delete();
+
+-- Adding or removing content changes the denominator for everyone enrolled
+CREATE OR REPLACE FUNCTION count_content_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE course c
+    SET content_count = c.content_count + d.added
+    FROM (SELECT course_id, COUNT(*)::INTEGER AS added FROM new_rows GROUP BY course_id) d
+    WHERE c.course_id = d.course_id;
+
+    UPDATE enroll e
+    SET progress_rate = progress_from_counts(e.completed_count, c.content_count)
+    FROM course c
+    WHERE c.course_id = e.course_id
+      AND e.course_id IN (SELECT DISTINCT course_id FROM new_rows);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION count_content_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE course c
+    SET content_count = GREATEST(c.content_count - d.removed, 0)
+    FROM (SELECT course_id, COUNT(*)::INTEGER AS removed FROM old_rows GROUP BY course_id) d
+    WHERE c.course_id = d.course_id;
+
+    UPDATE enroll e
+    SET progress_rate = progress_from_counts(e.completed_count, c.content_count)
+    FROM course c
+    WHERE c.course_id = e.course_id
+      AND e.course_id IN (SELECT DISTINCT course_id FROM old_rows);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_count_content_insert ON content;
+CREATE TRIGGER trg_count_content_insert
+AFTER INSERT ON content
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_content_on_insert();
+
+DROP TRIGGER IF EXISTS trg_count_content_delete ON content;
+CREATE TRIGGER trg_count_content_delete
+AFTER DELETE ON content
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_content_on_delete();
+
+-- Backfill the counters from the current data
+UPDATE course c
+SET content_count = COALESCE((SELECT COUNT(*) FROM content ct WHERE ct.course_id = c.course_id), 0);
+
+UPDATE enroll e
+SET completed_count = (
+        SELECT COUNT(*) FROM complete cp
+        WHERE cp.course_id = e.course_id AND cp.student_id = e.student_id AND cp.is_completed
+    );
+
+UPDATE enroll e
+SET progress_rate = progress_from_counts(e.completed_count, c.content_count)
+FROM course c
+WHERE c.course_id = e.course_id;
@@ -0,0 +1,164 @@
+-- 0003: statement-level counters for enrollment_count, course_count and certificate_count
+--
+-- Replaces the row-level triggers that bumped course.enrollment_count,
+-- instructor.course_count and student.certificate_count once per row with
+-- statement-level triggers that aggregate the transition table, so a bulk
+-- INSERT/DELETE updates each counter row once. The financial aid approval
+-- trigger becomes statement-level too, so approving a batch enrolls it with
+-- a single INSERT. The stored counts do not change, so there is no backfill.
+
+DROP TRIGGER IF EXISTS enrollment_count_updater ON enroll;
+DROP TRIGGER IF EXISTS trg_decrement_enrollment_count ON enroll;
+DROP TRIGGER IF EXISTS trg_update_instructor_course_count ON course;
+DROP TRIGGER IF EXISTS trg_decrement_course_count ON course;
+DROP TRIGGER IF EXISTS update_certificate_count ON earn_certificate;
+DROP TRIGGER IF EXISTS handle_certificate_delete ON certificate;
+DROP TRIGGER IF EXISTS trg_enroll_after_financial_aid_approval ON apply_financial_aid;
+
+DROP FUNCTION IF EXISTS update_enrollment_count();
+DROP FUNCTION IF EXISTS decrement_enrollment_count();
+DROP FUNCTION IF EXISTS update_instructor_course_count();
+DROP FUNCTION IF EXISTS decrement_instructor_course_count();
+DROP FUNCTION IF EXISTS increment_certificate_count();
+DROP FUNCTION IF EXISTS decrement_certificate_count_on_certificate_delete();
+
+-- Enrollment count of a course
+CREATE OR REPLACE FUNCTION count_enrollments_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE course c
+    SET enrollment_count = COALESCE(c.enrollment_count, 0) + d.added
+    FROM (SELECT course_id, COUNT(*)::INTEGER AS added FROM new_rows GROUP BY course_id) d
+    WHERE c.course_id = d.course_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION count_enrollments_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE course c
+    SET enrollment_count = GREATEST(COALESCE(c.enrollment_count, 0) - d.removed, 0)
+    FROM (SELECT course_id, COUNT(*)::INTEGER AS removed FROM old_rows GROUP BY course_id) d
+    WHERE c.course_id = d.course_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_count_enrollments_insert ON enroll;
+CREATE TRIGGER trg_count_enrollments_insert
+AFTER INSERT ON enroll
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_enrollments_on_insert();
+
+DROP TRIGGER IF EXISTS trg_count_enrollments_delete ON enroll;
+CREATE TRIGGER trg_count_enrollments_delete
+AFTER DELETE ON enroll
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_enrollments_on_delete();
+
+-- Course count of an instructor
+CREATE OR REPLACE FUNCTION count_courses_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE instructor i
+    SET course_count = COALESCE(i.course_count, 0) + d.added
+    FROM (SELECT creator_id, COUNT(*)::INTEGER AS added FROM new_rows GROUP BY creator_id) d
+    WHERE i.id = d.creator_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION count_courses_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE instructor i
+    SET course_count = GREATEST(COALESCE(i.course_count, 0) - d.removed, 0)
+    FROM (SELECT creator_id, COUNT(*)::INTEGER AS removed FROM old_rows GROUP BY creator_id) d
+    WHERE i.id = d.creator_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_count_courses_insert ON course;
+CREATE TRIGGER trg_count_courses_insert
+AFTER INSERT ON course
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_courses_on_insert();
+
+DROP TRIGGER IF EXISTS trg_count_courses_delete ON course;
+CREATE TRIGGER trg_count_courses_delete
+AFTER DELETE ON course
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_courses_on_delete();
+
+-- Certificate count of a student (deleting a certificate cascades to earn_certificate)
+CREATE OR REPLACE FUNCTION count_certificates_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE student s
+    SET certificate_count = COALESCE(s.certificate_count, 0) + d.added
+    FROM (SELECT student_id, COUNT(*)::INTEGER AS added FROM new_rows GROUP BY student_id) d
+    WHERE s.id = d.student_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION count_certificates_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE student s
+    SET certificate_count = GREATEST(COALESCE(s.certificate_count, 0) - d.removed, 0)
+    FROM (SELECT student_id, COUNT(*)::INTEGER AS removed FROM old_rows GROUP BY student_id) d
+    WHERE s.id = d.student_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_count_certificates_insert ON earn_certificate;
+CREATE TRIGGER trg_count_certificates_insert
+AFTER INSERT ON earn_certificate
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_certificates_on_insert();
+
+DROP TRIGGER IF EXISTS trg_count_certificates_delete ON earn_certificate;
+CREATE TRIGGER trg_count_certificates_delete
+AFTER DELETE ON earn_certificate
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_certificates_on_delete();
+
+-- Financial aid approval
+CREATE OR REPLACE FUNCTION enroll_on_financial_aid_approval()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Insert into enroll if not already present
+    INSERT INTO enroll (course_id, student_id, enroll_date, progress_rate)
+    SELECT course_id, student_id, CURRENT_DATE, 0
+    FROM new_rows
+    WHERE status = 'approved'
+    ON CONFLICT (course_id, student_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables cannot be combined with UPDATE OF <column>, so the
+-- update trigger fires on any update and filters on status above
+DROP TRIGGER IF EXISTS trg_enroll_after_financial_aid_insert ON apply_financial_aid;
+CREATE TRIGGER trg_enroll_after_financial_aid_insert
+AFTER INSERT ON apply_financial_aid
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION enroll_on_financial_aid_approval();
+
+DROP TRIGGER IF EXISTS trg_enroll_after_financial_aid_update ON apply_financial_aid;
+CREATE TRIGGER trg_enroll_after_financial_aid_update
+AFTER UPDATE ON apply_financial_aid
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION enroll_on_financial_aid_approval();
@@ -0,0 +1,160 @@
+-- 0004: running rating totals per course and per instructor
+--
+-- update_instructor_rating recomputed AVG(rating) over every feedback row of
+-- the instructor on each new feedback. Ratings are now kept as running
+-- sum/count columns on course and instructor, maintained by statement-level
+-- triggers on feedback insert, update and delete; i_rating is derived from
+-- the instructor totals.
+
+ALTER TABLE course ADD COLUMN IF NOT EXISTS rating_sum INTEGER NOT NULL DEFAULT 0 CHECK (rating_sum >= 0);
+ALTER TABLE course ADD COLUMN IF NOT EXISTS rating_count INTEGER NOT NULL DEFAULT 0 CHECK (rating_count >= 0);
+ALTER TABLE instructor ADD COLUMN IF NOT EXISTS rating_sum INTEGER NOT NULL DEFAULT 0 CHECK (rating_sum >= 0);
+ALTER TABLE instructor ADD COLUMN IF NOT EXISTS rating_count INTEGER NOT NULL DEFAULT 0 CHECK (rating_count >= 0);
+
+DROP TRIGGER IF EXISTS update_i_rating ON feedback;
+DROP FUNCTION IF EXISTS update_instructor_rating();
+
+-- Add per-course rating deltas to the courses and their instructors
+CREATE OR REPLACE FUNCTION apply_rating_deltas(course_ids VARCHAR[], sums INTEGER[], counts INTEGER[])
+RETURNS VOID AS $$
+BEGIN
+    WITH delta AS (
+        SELECT course_id, SUM(rating_sum)::INTEGER AS rating_sum, SUM(rating_count)::INTEGER AS rating_count
+        FROM unnest(course_ids, sums, counts) AS d(course_id, rating_sum, rating_count)
+        GROUP BY course_id
+    ),
+    courses AS (
+        UPDATE course c
+        SET rating_sum = c.rating_sum + d.rating_sum,
+            rating_count = c.rating_count + d.rating_count
+        FROM delta d
+        WHERE c.course_id = d.course_id
+        RETURNING c.creator_id, d.rating_sum, d.rating_count
+    )
+    UPDATE instructor i
+    SET rating_sum = i.rating_sum + x.rating_sum,
+        rating_count = i.rating_count + x.rating_count,
+        i_rating = CASE
+            WHEN i.rating_count + x.rating_count > 0
+            THEN (i.rating_sum + x.rating_sum)::FLOAT / (i.rating_count + x.rating_count)
+            ELSE 0
+        END
+    FROM (
+        SELECT creator_id, SUM(rating_sum)::INTEGER AS rating_sum, SUM(rating_count)::INTEGER AS rating_count
+        FROM courses
+        GROUP BY creator_id
+    ) x
+    WHERE i.id = x.creator_id;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION count_ratings_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM apply_rating_deltas(array_agg(course_id), array_agg(rating_sum), array_agg(rating_count))
+    FROM (
+        SELECT course_id, SUM(rating)::INTEGER AS rating_sum, COUNT(*)::INTEGER AS rating_count
+        FROM new_rows
+        GROUP BY course_id
+    ) d;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION count_ratings_on_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM apply_rating_deltas(array_agg(course_id), array_agg(rating_sum), array_agg(rating_count))
+    FROM (
+        SELECT course_id, SUM(rating_sum)::INTEGER AS rating_sum, SUM(rating_count)::INTEGER AS rating_count
+        FROM (
+            SELECT course_id, rating AS rating_sum, 1 AS rating_count FROM new_rows
+            UNION ALL
+            SELECT course_id, -rating, -1 FROM old_rows
+        ) changes
+        GROUP BY course_id
+    ) d;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION count_ratings_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM apply_rating_deltas(array_agg(course_id), array_agg(-rating_sum), array_agg(-rating_count))
+    FROM (
+        SELECT course_id, SUM(rating)::INTEGER AS rating_sum, COUNT(*)::INTEGER AS rating_count
+        FROM old_rows
+        GROUP BY course_id
+    ) d;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_count_ratings_insert ON feedback;
+CREATE TRIGGER trg_count_ratings_insert
+AFTER INSERT ON feedback
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_ratings_on_insert();
+
+DROP TRIGGER IF EXISTS trg_count_ratings_update ON feedback;
+CREATE TRIGGER trg_count_ratings_update
+AFTER UPDATE ON feedback
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_ratings_on_update();
+
+DROP TRIGGER IF EXISTS trg_count_ratings_delete ON feedback;
+CREATE TRIGGER trg_count_ratings_delete
+AFTER DELETE ON feedback
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_ratings_on_delete();
+
+-- Deleting a course also removes its ratings from the instructor totals
+CREATE OR REPLACE FUNCTION count_courses_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- The deleted courses' feedback cascades after the course rows are gone,
+    -- so their ratings are taken out of the instructor totals here
+    UPDATE instructor i
+    SET course_count = GREATEST(COALESCE(i.course_count, 0) - d.removed, 0),
+        rating_sum = i.rating_sum - d.rating_sum,
+        rating_count = i.rating_count - d.rating_count,
+        i_rating = CASE
+            WHEN i.rating_count - d.rating_count > 0
+            THEN (i.rating_sum - d.rating_sum)::FLOAT / (i.rating_count - d.rating_count)
+            ELSE 0
+        END
+    FROM (
+        SELECT creator_id,
+               COUNT(*)::INTEGER AS removed,
+               SUM(rating_sum)::INTEGER AS rating_sum,
+               SUM(rating_count)::INTEGER AS rating_count
+        FROM old_rows
+        GROUP BY creator_id
+    ) d
+    WHERE i.id = d.creator_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill the totals from the existing feedback
+UPDATE course c
+SET rating_sum = COALESCE((SELECT SUM(f.rating) FROM feedback f WHERE f.course_id = c.course_id), 0),
+    rating_count = (SELECT COUNT(*) FROM feedback f WHERE f.course_id = c.course_id);
+
+UPDATE instructor i
+SET rating_sum = t.rating_sum,
+    rating_count = t.rating_count,
+    i_rating = CASE WHEN t.rating_count > 0 THEN t.rating_sum::FLOAT / t.rating_count ELSE i.i_rating END
+FROM (
+    SELECT ins.id,
+           COALESCE(SUM(c.rating_sum), 0)::INTEGER AS rating_sum,
+           COALESCE(SUM(c.rating_count), 0)::INTEGER AS rating_count
+    FROM instructor ins
+    LEFT JOIN course c ON c.creator_id = ins.id
+    GROUP BY ins.id
+) t
+WHERE i.id = t.id;
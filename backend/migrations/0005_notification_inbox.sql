@@ -0,0 +1,127 @@
+-- 0005: per-recipient read/archive state and a per-user unread counter
+--
+-- Read and archived state move to the receive row (read_at, archived_at) so
+-- one user reading a broadcast no longer marks it read for everyone.
+-- notification_counter keeps each user's unread count up to date through
+-- statement-level triggers on receive, and received_at gives the inbox a
+-- per-user sort key for keyset pagination (indexed in 0006).
+
+ALTER TABLE receive ADD COLUMN IF NOT EXISTS received_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE receive ADD COLUMN IF NOT EXISTS archived_at TIMESTAMP;
+
+CREATE TABLE IF NOT EXISTS notification_counter(
+    id VARCHAR(8),
+    unread_count INTEGER NOT NULL DEFAULT 0 CHECK (unread_count >= 0),
+    PRIMARY KEY (id),
+    FOREIGN KEY (id) REFERENCES "user"(id) ON DELETE CASCADE
+);
+
+-- Carry the shared notification state over to the recipients
+UPDATE receive r
+SET received_at = n.timestamp
+FROM notification n
+WHERE n.notification_id = r.notification_id
+  AND r.received_at <> n.timestamp;
+
+UPDATE receive r
+SET read_at = n.timestamp
+FROM notification n
+WHERE n.notification_id = r.notification_id
+  AND n.status = 'read'
+  AND r.read_at IS NULL;
+
+UPDATE receive r
+SET archived_at = CURRENT_TIMESTAMP
+FROM notification n
+WHERE n.notification_id = r.notification_id
+  AND n.status = 'archived'
+  AND r.archived_at IS NULL;
+
+-- Recompute every counter from scratch
+INSERT INTO notification_counter (id, unread_count)
+SELECT u.id, COUNT(r.id)::INTEGER
+FROM "user" u
+LEFT JOIN receive r ON r.id = u.id AND r.read_at IS NULL AND r.archived_at IS NULL
+GROUP BY u.id
+ON CONFLICT (id) DO UPDATE
+SET unread_count = EXCLUDED.unread_count;
+
+CREATE OR REPLACE FUNCTION count_unread_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO notification_counter (id, unread_count)
+    SELECT id, COUNT(*)::INTEGER
+    FROM new_rows
+    WHERE read_at IS NULL AND archived_at IS NULL
+    GROUP BY id
+    ON CONFLICT (id) DO UPDATE
+    SET unread_count = notification_counter.unread_count + EXCLUDED.unread_count;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION count_unread_on_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    WITH delta AS (
+        SELECT id, SUM(change)::INTEGER AS change
+        FROM (
+            SELECT id, 1 AS change FROM new_rows WHERE read_at IS NULL AND archived_at IS NULL
+            UNION ALL
+            SELECT id, -1 FROM old_rows WHERE read_at IS NULL AND archived_at IS NULL
+        ) changes
+        GROUP BY id
+        HAVING SUM(change) <> 0
+    ),
+    updated AS (
+        UPDATE notification_counter c
+        SET unread_count = GREATEST(c.unread_count + d.change, 0)
+        FROM delta d
+        WHERE c.id = d.id
+        RETURNING c.id
+    )
+    INSERT INTO notification_counter (id, unread_count)
+    SELECT id, change
+    FROM delta
+    WHERE change > 0 AND id NOT IN (SELECT id FROM updated)
+    ON CONFLICT (id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION count_unread_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE notification_counter c
+    SET unread_count = GREATEST(c.unread_count - d.removed, 0)
+    FROM (
+        SELECT id, COUNT(*)::INTEGER AS removed
+        FROM old_rows
+        WHERE read_at IS NULL AND archived_at IS NULL
+        GROUP BY id
+    ) d
+    WHERE c.id = d.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_count_unread_insert ON receive;
+CREATE TRIGGER trg_count_unread_insert
+AFTER INSERT ON receive
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_unread_on_insert();
+
+DROP TRIGGER IF EXISTS trg_count_unread_update ON receive;
+CREATE TRIGGER trg_count_unread_update
+AFTER UPDATE ON receive
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_unread_on_update();
+
+DROP TRIGGER IF EXISTS trg_count_unread_delete ON receive;
+CREATE TRIGGER trg_count_unread_delete
+AFTER DELETE ON receive
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_unread_on_delete();
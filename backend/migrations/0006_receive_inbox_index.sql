@@ -0,0 +1,10 @@
+-- migrate: no-transaction
+-- 0006: index for the keyset-paginated inbox
+--
+-- Replaces idx_receive_user (0001): the inbox reads a user's receive rows
+-- newest first by (received_at, notification_id).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_receive_inbox
+    ON receive(id, received_at DESC, notification_id DESC);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_receive_user;
@@ -0,0 +1,31 @@
+-- 0007: announce new notifications on the notification_events channel
+--
+-- Feeds the server-sent event stream (notification_stream.py) through
+-- LISTEN/NOTIFY, so clients no longer need to poll the inbox.
+
+CREATE OR REPLACE FUNCTION announce_received_notifications()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF (SELECT COUNT(*) FROM new_rows) <= 100 THEN
+        PERFORM pg_notify(
+            'notification_events',
+            json_build_object('id', id, 'notification_id', notification_id)::TEXT
+        )
+        FROM new_rows;
+    ELSE
+        PERFORM pg_notify(
+            'notification_events',
+            json_build_object('notification_id', notification_id, 'bulk', TRUE)::TEXT
+        )
+        FROM (SELECT DISTINCT notification_id FROM new_rows) n;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_announce_received_notifications ON receive;
+CREATE TRIGGER trg_announce_received_notifications
+AFTER INSERT ON receive
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION announce_received_notifications();
@@ -0,0 +1,118 @@
+-- 0008: set-based grading side effects
+--
+-- mark_completion_on_grade and the grade notifications ran once per graded
+-- row. They become statement-level triggers, so grading a whole class in one
+-- UPDATE (POST /api/grade/<course_id>/bulk) marks completions and writes
+-- notifications with one INSERT each.
+
+DROP TRIGGER IF EXISTS trg_mark_completion_on_grade ON submit;
+DROP TRIGGER IF EXISTS trg_grade_notification ON submit;
+DROP FUNCTION IF EXISTS generate_grade_notification();
+
+CREATE OR REPLACE FUNCTION mark_completion_on_grade()
+RETURNS TRIGGER AS $$
+BEGIN
+  -- Only rows whose grade is newly set or changed to a non-NULL value
+  INSERT INTO complete (course_id, sec_id, content_id, student_id, is_completed)
+  SELECT n.course_id, n.sec_id, n.content_id, n.student_id, TRUE
+  FROM new_rows n
+  JOIN old_rows o
+    ON o.course_id = n.course_id AND o.sec_id = n.sec_id
+   AND o.content_id = n.content_id AND o.student_id = n.student_id
+  WHERE n.grade IS NOT NULL
+    AND o.grade IS DISTINCT FROM n.grade
+  ON CONFLICT (course_id, sec_id, content_id, student_id)
+  DO UPDATE SET is_completed = TRUE
+  WHERE complete.is_completed IS DISTINCT FROM TRUE;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables cannot be combined with UPDATE OF <column>, so the
+-- function compares old and new grades itself
+DROP TRIGGER IF EXISTS trg_mark_completion_on_grade ON submit;
+CREATE TRIGGER trg_mark_completion_on_grade
+AFTER UPDATE ON submit
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION mark_completion_on_grade();
+
+CREATE OR REPLACE FUNCTION notify_grades(
+    course_ids VARCHAR[], sec_ids VARCHAR[], content_ids VARCHAR[], student_ids VARCHAR[], grades INTEGER[]
+)
+RETURNS VOID AS $$
+BEGIN
+    WITH graded AS (
+        SELECT 'N' || SUBSTRING(MD5(RANDOM()::TEXT), 1, 7) AS notify_id,
+               g.content_id, g.student_id, g.grade,
+               c.title AS content_title, course.title AS course_title, t.passing_grade
+        FROM unnest(course_ids, sec_ids, content_ids, student_ids, grades)
+             AS g(course_id, sec_id, content_id, student_id, grade)
+        JOIN content c ON c.course_id = g.course_id AND c.sec_id = g.sec_id AND c.content_id = g.content_id
+        JOIN course ON course.course_id = g.course_id
+        JOIN task t ON t.course_id = g.course_id AND t.sec_id = g.sec_id AND t.content_id = g.content_id
+    ),
+    notifications AS (
+        INSERT INTO notification (notification_id, type, entity_type, entity_id, message)
+        SELECT notify_id,
+               CASE WHEN grade >= passing_grade THEN 'assignment_passed' ELSE 'assignment_failed' END,
+               'content',
+               content_id,
+               CASE
+                   WHEN grade >= passing_grade
+                   THEN 'You passed "' || content_title || '" in the course "' || course_title || '" with a grade of ' || grade || '.'
+                   ELSE 'You did not pass "' || content_title || '" in the course "' || course_title || '". Your grade: ' || grade || '.'
+               END
+        FROM graded
+    )
+    -- Send notification to student
+    INSERT INTO receive (notification_id, id)
+    SELECT notify_id, student_id
+    FROM graded;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION generate_grade_notification_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM notify_grades(
+        array_agg(course_id), array_agg(sec_id), array_agg(content_id), array_agg(student_id), array_agg(grade)
+    )
+    FROM new_rows
+    WHERE grade IS NOT NULL
+    HAVING COUNT(*) > 0;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION generate_grade_notification_on_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM notify_grades(
+        array_agg(n.course_id), array_agg(n.sec_id), array_agg(n.content_id), array_agg(n.student_id), array_agg(n.grade)
+    )
+    FROM new_rows n
+    JOIN old_rows o
+      ON o.course_id = n.course_id AND o.sec_id = n.sec_id
+     AND o.content_id = n.content_id AND o.student_id = n.student_id
+    WHERE n.grade IS NOT NULL
+      AND o.grade IS DISTINCT FROM n.grade
+    HAVING COUNT(*) > 0;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_grade_notification_insert ON submit;
+CREATE TRIGGER trg_grade_notification_insert
+AFTER INSERT ON submit
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION generate_grade_notification_on_insert();
+
+DROP TRIGGER IF EXISTS trg_grade_notification_update ON submit;
+CREATE TRIGGER trg_grade_notification_update
+AFTER UPDATE ON submit
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION generate_grade_notification_on_update();
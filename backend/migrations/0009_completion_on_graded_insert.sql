@@ -0,0 +1,28 @@
+-- 0009: mark content complete for submissions that arrive already graded
+--
+-- Multiple-choice assessments are graded at submit time (answer_keys.py), so
+-- the grade is set by the INSERT and the UPDATE-only completion trigger
+-- never sees it.
+
+-- Submissions graded on arrival (auto-graded multiple-choice assessments)
+CREATE OR REPLACE FUNCTION mark_completion_on_graded_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO complete (course_id, sec_id, content_id, student_id, is_completed)
+  SELECT course_id, sec_id, content_id, student_id, TRUE
+  FROM new_rows
+  WHERE grade IS NOT NULL
+  ON CONFLICT (course_id, sec_id, content_id, student_id)
+  DO UPDATE SET is_completed = TRUE
+  WHERE complete.is_completed IS DISTINCT FROM TRUE;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_mark_completion_on_graded_insert ON submit;
+CREATE TRIGGER trg_mark_completion_on_graded_insert
+AFTER INSERT ON submit
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION mark_completion_on_graded_insert();
@@ -0,0 +1,116 @@
+-- 0010: version stamp for cached assessment definitions
+--
+-- assessment.question_version is bumped by statement-level triggers on
+-- question, multiple_choice and open_ended; assessment_cache.py reloads a
+-- cached definition when the stamp no longer matches.
+
+ALTER TABLE assessment ADD COLUMN IF NOT EXISTS question_version INTEGER NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION bump_question_version_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE assessment a
+  SET question_version = a.question_version + 1
+  FROM (SELECT DISTINCT course_id, sec_id, content_id FROM new_rows) AS changed
+  WHERE a.course_id = changed.course_id
+    AND a.sec_id = changed.sec_id
+    AND a.content_id = changed.content_id;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bump_question_version_on_update()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE assessment a
+  SET question_version = a.question_version + 1
+  FROM (
+    SELECT course_id, sec_id, content_id FROM new_rows
+    UNION
+    SELECT course_id, sec_id, content_id FROM old_rows
+  ) AS changed
+  WHERE a.course_id = changed.course_id
+    AND a.sec_id = changed.sec_id
+    AND a.content_id = changed.content_id;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bump_question_version_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE assessment a
+  SET question_version = a.question_version + 1
+  FROM (SELECT DISTINCT course_id, sec_id, content_id FROM old_rows) AS changed
+  WHERE a.course_id = changed.course_id
+    AND a.sec_id = changed.sec_id
+    AND a.content_id = changed.content_id;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_question_version_insert ON question;
+CREATE TRIGGER trg_question_version_insert
+AFTER INSERT ON question
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_question_version_on_insert();
+
+DROP TRIGGER IF EXISTS trg_question_version_update ON question;
+CREATE TRIGGER trg_question_version_update
+AFTER UPDATE ON question
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_question_version_on_update();
+
+DROP TRIGGER IF EXISTS trg_question_version_delete ON question;
+CREATE TRIGGER trg_question_version_delete
+AFTER DELETE ON question
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_question_version_on_delete();
+
+DROP TRIGGER IF EXISTS trg_multiple_choice_version_insert ON multiple_choice;
+CREATE TRIGGER trg_multiple_choice_version_insert
+AFTER INSERT ON multiple_choice
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_question_version_on_insert();
+
+DROP TRIGGER IF EXISTS trg_multiple_choice_version_update ON multiple_choice;
+CREATE TRIGGER trg_multiple_choice_version_update
+AFTER UPDATE ON multiple_choice
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_question_version_on_update();
+
+DROP TRIGGER IF EXISTS trg_multiple_choice_version_delete ON multiple_choice;
+CREATE TRIGGER trg_multiple_choice_version_delete
+AFTER DELETE ON multiple_choice
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_question_version_on_delete();
+
+DROP TRIGGER IF EXISTS trg_open_ended_version_insert ON open_ended;
+CREATE TRIGGER trg_open_ended_version_insert
+AFTER INSERT ON open_ended
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_question_version_on_insert();
+
+DROP TRIGGER IF EXISTS trg_open_ended_version_update ON open_ended;
+CREATE TRIGGER trg_open_ended_version_update
+AFTER UPDATE ON open_ended
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_question_version_on_update();
+
+DROP TRIGGER IF EXISTS trg_open_ended_version_delete ON open_ended;
+CREATE TRIGGER trg_open_ended_version_delete
+AFTER DELETE ON open_ended
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_question_version_on_delete();
@@ -0,0 +1,8 @@
+-- migrate: no-transaction
+-- 0011: index for the admin profile
+--
+-- The profile query lists the courses an admin approved or rejected by
+-- approver_id, which had no index.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_course_approver
+    ON course(approver_id, status);
@@ -0,0 +1,162 @@
+-- 0012: version stamp for cached course pages
+--
+-- course.page_version is bumped on every change to the course row and by
+-- statement-level triggers on section, content, task, assessment and
+-- assignment; course_page_cache.py keys cached responses and ETags by it.
+
+ALTER TABLE course ADD COLUMN IF NOT EXISTS page_version INTEGER NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION bump_page_version_on_course_update()
+RETURNS TRIGGER AS $$
+BEGIN
+  -- Explicit bumps (below) already moved the version
+  IF NEW.page_version = OLD.page_version AND NEW IS DISTINCT FROM OLD THEN
+    NEW.page_version := OLD.page_version + 1;
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_course_page_version ON course;
+CREATE TRIGGER trg_course_page_version
+BEFORE UPDATE ON course
+FOR EACH ROW
+EXECUTE FUNCTION bump_page_version_on_course_update();
+
+CREATE OR REPLACE FUNCTION bump_page_version_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE course
+  SET page_version = page_version + 1
+  WHERE course_id IN (SELECT course_id FROM new_rows);
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bump_page_version_on_update()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE course
+  SET page_version = page_version + 1
+  WHERE course_id IN (SELECT course_id FROM new_rows UNION SELECT course_id FROM old_rows);
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bump_page_version_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE course
+  SET page_version = page_version + 1
+  WHERE course_id IN (SELECT course_id FROM old_rows);
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_section_page_version_insert ON section;
+CREATE TRIGGER trg_section_page_version_insert
+AFTER INSERT ON section
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_page_version_on_insert();
+
+DROP TRIGGER IF EXISTS trg_section_page_version_update ON section;
+CREATE TRIGGER trg_section_page_version_update
+AFTER UPDATE ON section
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_page_version_on_update();
+
+DROP TRIGGER IF EXISTS trg_section_page_version_delete ON section;
+CREATE TRIGGER trg_section_page_version_delete
+AFTER DELETE ON section
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_page_version_on_delete();
+
+DROP TRIGGER IF EXISTS trg_content_page_version_insert ON content;
+CREATE TRIGGER trg_content_page_version_insert
+AFTER INSERT ON content
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_page_version_on_insert();
+
+DROP TRIGGER IF EXISTS trg_content_page_version_update ON content;
+CREATE TRIGGER trg_content_page_version_update
+AFTER UPDATE ON content
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_page_version_on_update();
+
+DROP TRIGGER IF EXISTS trg_content_page_version_delete ON content;
+CREATE TRIGGER trg_content_page_version_delete
+AFTER DELETE ON content
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_page_version_on_delete();
+
+DROP TRIGGER IF EXISTS trg_task_page_version_insert ON task;
+CREATE TRIGGER trg_task_page_version_insert
+AFTER INSERT ON task
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_page_version_on_insert();
+
+DROP TRIGGER IF EXISTS trg_task_page_version_update ON task;
+CREATE TRIGGER trg_task_page_version_update
+AFTER UPDATE ON task
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_page_version_on_update();
+
+DROP TRIGGER IF EXISTS trg_task_page_version_delete ON task;
+CREATE TRIGGER trg_task_page_version_delete
+AFTER DELETE ON task
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_page_version_on_delete();
+
+DROP TRIGGER IF EXISTS trg_assessment_page_version_insert ON assessment;
+CREATE TRIGGER trg_assessment_page_version_insert
+AFTER INSERT ON assessment
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_page_version_on_insert();
+
+DROP TRIGGER IF EXISTS trg_assessment_page_version_update ON assessment;
+CREATE TRIGGER trg_assessment_page_version_update
+AFTER UPDATE ON assessment
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_page_version_on_update();
+
+DROP TRIGGER IF EXISTS trg_assessment_page_version_delete ON assessment;
+CREATE TRIGGER trg_assessment_page_version_delete
+AFTER DELETE ON assessment
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_page_version_on_delete();
+
+DROP TRIGGER IF EXISTS trg_assignment_page_version_insert ON assignment;
+CREATE TRIGGER trg_assignment_page_version_insert
+AFTER INSERT ON assignment
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_page_version_on_insert();
+
+DROP TRIGGER IF EXISTS trg_assignment_page_version_update ON assignment;
+CREATE TRIGGER trg_assignment_page_version_update
+AFTER UPDATE ON assignment
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_page_version_on_update();
+
+DROP TRIGGER IF EXISTS trg_assignment_page_version_delete ON assignment;
+CREATE TRIGGER trg_assignment_page_version_delete
+AFTER DELETE ON assignment
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_page_version_on_delete();
@@ -0,0 +1,229 @@
+-- 0013: materialized views behind the admin general reports
+--
+-- These were created by report_cache.py on first use, from a request, which
+-- needed DDL rights at runtime and raced between processes. They are schema
+-- now; report_cache.py only refreshes them.
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS report_student_general AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+WITH base AS (
+    SELECT s.id,
+           DATE_PART('year', AGE(CURRENT_DATE, u.birth_date)) AS age,
+           s.major,
+           s.account_status,
+           s.certificate_count
+    FROM student s
+    JOIN "user" u ON u.id = s.id
+),
+enrolls AS (
+    SELECT student_id,
+           COUNT(*) AS enroll_cnt,
+           AVG(progress_rate) AS avg_progress
+    FROM enroll
+    GROUP BY student_id
+),
+majors AS (
+    SELECT major,
+           COUNT(*) AS cnt,
+           ROW_NUMBER() OVER(ORDER BY COUNT(*) DESC, major) AS rn
+    FROM student s
+    GROUP BY major
+)
+SELECT
+  (SELECT COUNT(*) FROM base)                                       AS total_students,
+  (SELECT COUNT(*) FROM base WHERE account_status = 'active')       AS active_student_count,
+  ROUND((SELECT AVG(enroll_cnt) FROM enrolls)::numeric,2)          AS avg_enroll_per_student,
+  ROUND((SELECT AVG(certificate_count) FROM base)::numeric,2)      AS avg_cert_per_student,
+  ROUND((SELECT AVG(avg_progress) FROM enrolls)::numeric,2)        AS avg_completion_rate,
+  (SELECT major FROM majors WHERE rn = 1)                          AS most_common_major,
+  (SELECT cnt FROM majors WHERE rn = 1)                            AS most_common_major_count,
+  ROUND((SELECT AVG(age) FROM base)::numeric,2)                    AS avg_age,
+  (SELECT MIN(age) FROM base)                                      AS youngest_age,
+  (SELECT MAX(age) FROM base)                                      AS oldest_age
+) q;
+
+CREATE UNIQUE INDEX IF NOT EXISTS report_student_general_key ON report_student_general (refreshed_at);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS report_student_top AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+WITH stats AS (
+    SELECT s.id,
+           s.certificate_count,
+           COUNT(e.course_id) AS enroll_cnt,
+           AVG(e.progress_rate) AS avg_progress
+    FROM student s
+    LEFT JOIN enroll e ON e.student_id = s.id
+    WHERE s.id IN (SELECT student_id FROM enroll WHERE progress_rate = 100) 
+    GROUP BY s.id, s.certificate_count
+),
+scores AS (
+    SELECT id,
+           ROUND(certificate_count*2 + enroll_cnt*0.5 + COALESCE(avg_progress,0)*0.1,2) AS achievement_score
+    FROM (
+      SELECT id,
+             certificate_count,
+             enroll_cnt,
+             COALESCE(ROUND(avg_progress::numeric,2),0) AS avg_progress
+      FROM stats
+    ) t
+)
+SELECT
+  sc.id,
+  u.first_name || ' ' || u.last_name AS full_name,
+  s.major,
+  sc.achievement_score
+FROM scores sc
+JOIN student s ON s.id = sc.id
+JOIN "user" u    ON u.id = sc.id
+ORDER BY sc.achievement_score DESC
+LIMIT 3
+) q;
+
+CREATE UNIQUE INDEX IF NOT EXISTS report_student_top_key ON report_student_top (id);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS report_course_general AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+WITH base AS (
+    SELECT course_id,
+           price,
+           COALESCE(enrollment_count,0) AS enrollment_count
+    FROM course
+),
+freepaid AS (
+    SELECT COUNT(*) FILTER(WHERE price=0) AS free_course_count,
+           COUNT(*) FILTER(WHERE price>0) AS paid_course_count
+    FROM base
+),
+popular AS (
+    SELECT c.course_id,
+           c.enrollment_count,
+           c.price,
+           c.creator_id
+    FROM course c
+    ORDER BY c.enrollment_count DESC
+    LIMIT 1
+),
+completed_raw AS (
+    SELECT b.course_id,
+           COALESCE(c.completion_count,0) AS completion_count,
+           b.enrollment_count,
+           CASE WHEN b.enrollment_count>0
+                THEN ROUND(COALESCE(c.completion_count,0)*100.0/b.enrollment_count,2)
+                ELSE 0 END AS completion_ratio,
+           b.price,
+           cr.creator_id
+    FROM base b
+    LEFT JOIN (
+      SELECT course_id, COUNT(*) AS completion_count
+      FROM enroll
+      WHERE progress_rate = 100
+      GROUP BY course_id
+    ) c USING(course_id)
+    JOIN course cr USING(course_id)
+    ORDER BY COALESCE(c.completion_count,0) DESC
+    LIMIT 1
+)
+SELECT
+  (SELECT COUNT(*) FROM base)                                        AS total_courses,
+
+  -- most popular
+  popular.course_id                                                 AS most_popular_course_id,
+  (SELECT title FROM course WHERE course_id = popular.course_id)    AS most_popular_course_title,
+  popular.enrollment_count                                          AS most_popular_enrollment_count,
+  popular.price                                                     AS most_popular_price,
+  popular.creator_id                                                AS most_popular_instructor_id,
+  (SELECT u.first_name || ' ' || u.last_name
+   FROM "user" u WHERE u.id = popular.creator_id)                   AS most_popular_instructor_name,
+
+  ROUND((SELECT AVG(enrollment_count)::numeric FROM base),2)        AS avg_enroll_per_course,
+  COALESCE((SELECT SUM(price*enrollment_count) FROM base),0)         AS total_revenue,
+  freepaid.free_course_count                                        AS free_course_count,
+  freepaid.paid_course_count                                        AS paid_course_count,
+
+  -- most completed
+  completed_raw.course_id                                           AS most_completed_course_id,
+  (SELECT title FROM course WHERE course_id = completed_raw.course_id) 
+                                                                    AS most_completed_course_title,
+  completed_raw.enrollment_count                                    AS most_completed_enrollment_count,
+  completed_raw.completion_ratio                                    AS most_completed_completion_ratio,
+  completed_raw.price                                               AS most_completed_price,
+  completed_raw.creator_id                                          AS most_completed_instructor_id,
+  (SELECT u.first_name || ' ' || u.last_name
+   FROM "user" u WHERE u.id = completed_raw.creator_id)            AS most_completed_instructor_name
+
+FROM popular
+CROSS JOIN freepaid
+CROSS JOIN completed_raw
+) q;
+
+CREATE UNIQUE INDEX IF NOT EXISTS report_course_general_key ON report_course_general (refreshed_at);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS report_course_enroll_stats AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT
+  ROUND(AVG(e.progress_rate)::numeric,2) AS avg_completion_rate,
+  COUNT(*) FILTER (WHERE c.price=0)   AS free_enroll_count,
+  COUNT(*) FILTER (WHERE c.price>0)   AS paid_enroll_count
+FROM enroll e
+JOIN course c ON c.course_id=e.course_id
+) q;
+
+CREATE UNIQUE INDEX IF NOT EXISTS report_course_enroll_stats_key ON report_course_enroll_stats (refreshed_at);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS report_category_enrollments AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT category, SUM(COALESCE(enrollment_count,0)) AS total_enrollments
+FROM course GROUP BY category ORDER BY total_enrollments DESC
+) q;
+
+CREATE UNIQUE INDEX IF NOT EXISTS report_category_enrollments_key ON report_category_enrollments (category);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS report_difficulty_stats AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT c.difficulty_level,
+       SUM(COALESCE(c.enrollment_count,0)) AS total_enrollments,
+       ROUND(COALESCE(AVG(e.progress_rate),0)::numeric,2) AS avg_completion_rate
+FROM course c LEFT JOIN enroll e ON e.course_id=c.course_id
+GROUP BY c.difficulty_level ORDER BY c.difficulty_level
+) q;
+
+CREATE UNIQUE INDEX IF NOT EXISTS report_difficulty_stats_key ON report_difficulty_stats (difficulty_level);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS report_instructor_general AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT *
+FROM (SELECT COUNT(*) AS total_instructors FROM instructor) total
+CROSS JOIN (SELECT COUNT(DISTINCT c.creator_id) FILTER(WHERE c.price=0) AS instructors_with_free_course,
+       COUNT(DISTINCT c.creator_id) FILTER(WHERE c.price>0) AS instructors_with_paid_course
+FROM course c) paid_free
+CROSS JOIN (SELECT ROUND(AVG(course_count)::numeric,2) AS avg_courses_per_instructor FROM instructor) avg_courses
+CROSS JOIN (SELECT ROUND(AVG(DATE_PART('year', AGE(CURRENT_DATE, u.birth_date)))::numeric,2) AS avg_age,
+       MIN(DATE_PART('year', AGE(CURRENT_DATE, u.birth_date))) AS youngest_age,
+       MAX(DATE_PART('year', AGE(CURRENT_DATE, u.birth_date))) AS oldest_age
+FROM instructor i
+JOIN "user" u ON u.id=i.id) ages
+) q;
+
+CREATE UNIQUE INDEX IF NOT EXISTS report_instructor_general_key ON report_instructor_general (refreshed_at);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS report_most_popular_instructor AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT i.id,
+       u.first_name || ' ' || u.last_name AS full_name,
+       COALESCE(SUM(c.enrollment_count),0) AS total_enrollments
+FROM instructor i
+JOIN "user" u ON u.id=i.id
+LEFT JOIN course c ON c.creator_id=i.id
+GROUP BY i.id,u.first_name,u.last_name
+ORDER BY total_enrollments DESC LIMIT 1
+) q;
+
+CREATE UNIQUE INDEX IF NOT EXISTS report_most_popular_instructor_key ON report_most_popular_instructor (id);
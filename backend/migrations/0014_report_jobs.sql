@@ -0,0 +1,33 @@
+-- 0014: background report jobs
+--
+-- report_job was only in schema.sql, so existing databases never got it.
+-- Each job also records the process that owns it and that process's last
+-- heartbeat, so a starting server only fails the jobs of servers that are
+-- gone instead of every unfinished job in the database.
+
+CREATE TABLE IF NOT EXISTS report_job (
+    job_id       VARCHAR(8)  PRIMARY KEY,
+    admin_id     VARCHAR(8),
+    endpoint     VARCHAR(50) NOT NULL,
+    params       JSONB       NOT NULL DEFAULT '{}'::jsonb,
+    status       VARCHAR(10) NOT NULL DEFAULT 'queued'
+                 CHECK (status IN ('queued', 'running', 'done', 'failed')),
+    progress     INTEGER     NOT NULL DEFAULT 0 CHECK (progress BETWEEN 0 AND 100),
+    report_id    VARCHAR(8),
+    error        TEXT,
+    created_at   TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at   TIMESTAMPTZ,
+    finished_at  TIMESTAMPTZ,
+    FOREIGN KEY (admin_id) REFERENCES admin(id) ON DELETE CASCADE,
+    FOREIGN KEY (report_id) REFERENCES report(report_id) ON DELETE SET NULL
+);
+
+ALTER TABLE report_job ADD COLUMN IF NOT EXISTS owner VARCHAR(64);
+ALTER TABLE report_job ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMPTZ;
+
+-- Unfinished jobs from before owners were recorded: let the next sweep fail them
+UPDATE report_job
+SET heartbeat_at = COALESCE(started_at, created_at)
+WHERE status IN ('queued', 'running') AND heartbeat_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_report_job_status ON report_job(status);
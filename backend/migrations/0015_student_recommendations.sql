@@ -0,0 +1,136 @@
+-- 0015: trigger-maintained student recommendations
+--
+-- student_recommendation and the triggers that keep it current were only in
+-- schema.sql. Existing students get their lists built at the end.
+
+CREATE TABLE IF NOT EXISTS student_recommendation (
+    student_id VARCHAR(8),
+    course_id VARCHAR(8),
+    priority SMALLINT NOT NULL CHECK (priority IN (1, 2)),
+    PRIMARY KEY (student_id, course_id),
+    FOREIGN KEY (student_id) REFERENCES student(id) ON DELETE CASCADE,
+    FOREIGN KEY (course_id) REFERENCES course(course_id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_student_recommendation_priority
+    ON student_recommendation(student_id, priority);
+
+-- Rebuild the recommendation list of one student
+CREATE OR REPLACE FUNCTION refresh_student_recommendations(p_student_id VARCHAR)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM student_recommendation WHERE student_id = p_student_id;
+
+    INSERT INTO student_recommendation (student_id, course_id, priority)
+    SELECT p_student_id,
+           c.course_id,
+           CASE WHEN c.category IN (
+                    SELECT category FROM enrolled_course_categories WHERE student_id = p_student_id
+                ) THEN 1 ELSE 2 END
+    FROM course c
+    WHERE c.status = 'accepted'
+      AND NOT EXISTS (
+          SELECT 1 FROM enroll e
+          WHERE e.student_id = p_student_id AND e.course_id = c.course_id
+      );
+END;
+$$ LANGUAGE plpgsql;
+
+-- New students start with every accepted course
+CREATE OR REPLACE FUNCTION init_student_recommendations()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_student_recommendations(NEW.id);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_init_student_recommendations ON student;
+CREATE TRIGGER trg_init_student_recommendations
+AFTER INSERT ON student
+FOR EACH ROW
+EXECUTE FUNCTION init_student_recommendations();
+
+-- Enrolling removes the course and promotes the rest of its category;
+-- dropping an enrollment rebuilds that student's list
+CREATE OR REPLACE FUNCTION update_recommendations_on_enroll()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        DELETE FROM student_recommendation
+        WHERE student_id = NEW.student_id AND course_id = NEW.course_id;
+
+        UPDATE student_recommendation r
+        SET priority = 1
+        FROM course c
+        WHERE r.student_id = NEW.student_id
+          AND r.priority = 2
+          AND c.course_id = r.course_id
+          AND c.category = (SELECT category FROM course WHERE course_id = NEW.course_id);
+        RETURN NEW;
+    END IF;
+
+    PERFORM refresh_student_recommendations(OLD.student_id);
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_update_recommendations_on_enroll ON enroll;
+CREATE TRIGGER trg_update_recommendations_on_enroll
+AFTER INSERT OR DELETE ON enroll
+FOR EACH ROW
+EXECUTE FUNCTION update_recommendations_on_enroll();
+
+-- Accepting a course recommends it to every student not enrolled in it;
+-- any other status withdraws it
+CREATE OR REPLACE FUNCTION update_recommendations_on_course()
+RETURNS TRIGGER AS $$
+DECLARE
+    enrolled_student VARCHAR(8);
+BEGIN
+    IF NEW.status = 'accepted' THEN
+        INSERT INTO student_recommendation (student_id, course_id, priority)
+        SELECT s.id,
+               NEW.course_id,
+               CASE WHEN NEW.category IN (
+                        SELECT category FROM enrolled_course_categories WHERE student_id = s.id
+                    ) THEN 1 ELSE 2 END
+        FROM student s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM enroll e
+            WHERE e.student_id = s.id AND e.course_id = NEW.course_id
+        )
+        ON CONFLICT (student_id, course_id) DO UPDATE SET priority = EXCLUDED.priority;
+    ELSE
+        DELETE FROM student_recommendation WHERE course_id = NEW.course_id;
+    END IF;
+
+    -- A category change also changes the categories of everyone enrolled in the course
+    IF TG_OP = 'UPDATE' AND OLD.category IS DISTINCT FROM NEW.category THEN
+        FOR enrolled_student IN
+            SELECT student_id FROM enroll WHERE course_id = NEW.course_id
+        LOOP
+            PERFORM refresh_student_recommendations(enrolled_student);
+        END LOOP;
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_update_recommendations_on_course ON course;
+CREATE TRIGGER trg_update_recommendations_on_course
+AFTER INSERT OR UPDATE OF status, category ON course
+FOR EACH ROW
+EXECUTE FUNCTION update_recommendations_on_course();
+
+-- Build the lists of students that existed before the triggers
+DO $$
+DECLARE
+    existing_student VARCHAR(8);
+BEGIN
+    FOR existing_student IN SELECT id FROM student LOOP
+        PERFORM refresh_student_recommendations(existing_student);
+    END LOOP;
+END;
+$$;
@@ -0,0 +1,63 @@
+-- 0016: full-text search for the course catalog
+--
+-- course.search_vector and the triggers that maintain it were only in
+-- schema.sql. Existing courses are indexed at the end; the GIN and trigram
+-- indexes are built online by 0017.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE course ADD COLUMN IF NOT EXISTS search_vector TSVECTOR;
+
+-- course.search_vector indexes title (A), category and instructor name (B)
+-- and description (C) for the catalog search in online_degrees
+
+CREATE OR REPLACE FUNCTION course_search_vector(
+    p_title VARCHAR, p_category VARCHAR, p_description VARCHAR, p_creator_id VARCHAR
+)
+RETURNS TSVECTOR AS $$
+    SELECT setweight(to_tsvector('simple', COALESCE(p_title, '')), 'A')
+        || setweight(to_tsvector('simple', COALESCE(p_category, '')), 'B')
+        || setweight(to_tsvector('simple', COALESCE(
+               (SELECT CONCAT_WS(' ', u.first_name, u.middle_name, u.last_name)
+                FROM "user" u WHERE u.id = p_creator_id), '')), 'B')
+        || setweight(to_tsvector('simple', COALESCE(p_description, '')), 'C');
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION update_course_search_vector()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_vector := course_search_vector(NEW.title, NEW.category, NEW.description, NEW.creator_id);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_course_search_vector ON course;
+CREATE TRIGGER trg_course_search_vector
+BEFORE INSERT OR UPDATE OF title, category, description, creator_id ON course
+FOR EACH ROW
+EXECUTE FUNCTION update_course_search_vector();
+
+-- Renaming an instructor re-indexes their courses
+CREATE OR REPLACE FUNCTION update_instructor_course_search_vectors()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.role = 'instructor'
+       AND (OLD.first_name, OLD.middle_name, OLD.last_name)
+           IS DISTINCT FROM (NEW.first_name, NEW.middle_name, NEW.last_name) THEN
+        UPDATE course
+        SET search_vector = course_search_vector(title, category, description, creator_id)
+        WHERE creator_id = NEW.id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_instructor_course_search_vectors ON "user";
+CREATE TRIGGER trg_instructor_course_search_vectors
+AFTER UPDATE OF first_name, middle_name, last_name ON "user"
+FOR EACH ROW
+EXECUTE FUNCTION update_instructor_course_search_vectors();
+
+UPDATE course
+SET search_vector = course_search_vector(title, category, description, creator_id)
+WHERE search_vector IS NULL;
@@ -0,0 +1,14 @@
+-- migrate: no-transaction
+-- 0017: indexes for the catalog search
+--
+-- Built concurrently so courses stay writable; 0016 added the column and
+-- the pg_trgm extension they need.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_course_search_vector
+    ON course USING gin (search_vector);
+
+-- Trigram indexes: typo-tolerant title matching and the title/description ILIKE filters
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_course_title_trgm
+    ON course USING gin (title gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_course_description_trgm
+    ON course USING gin (description gin_trgm_ops);
@@ -0,0 +1,23 @@
+-- migrate: no-transaction
+-- 0018: catalog ordering indexes
+--
+-- The keyset-paged /api/degrees catalog reads each sort option from its own
+-- partial expression index over accepted courses. They were only in
+-- schema.sql; built concurrently here so courses stay writable.
+
+-- Catalog ordering: one index per /api/degrees sort key (see SORT_KEYS in
+-- online_degrees.py), so each keyset page is a short index range scan
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_course_catalog_newest
+    ON course ((COALESCE(creation_date, DATE '0001-01-01')) DESC, course_id DESC)
+    WHERE status = 'accepted';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_course_catalog_enrolled
+    ON course ((COALESCE(enrollment_count, 0)) DESC, course_id DESC)
+    WHERE status = 'accepted';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_course_catalog_price
+    ON course ((COALESCE(price, 0)), course_id)
+    WHERE status = 'accepted';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_course_catalog_relevance
+    ON course ((COALESCE(enrollment_count, 0) * 5
+                + (COALESCE(creation_date, DATE '1970-01-01') - DATE '1970-01-01')) DESC,
+               course_id DESC)
+    WHERE status = 'accepted';
@@ -0,0 +1,29 @@
+-- 0019: bump course.page_version only for page-visible course columns
+--
+-- 0012 bumped it on any change to the course row, so every enrollment,
+-- content count or rating update invalidated all cached pages of the
+-- course. Only the editable columns shown on the pages bump it now; the
+-- overview adds the counters it shows to its own cache stamp.
+
+CREATE OR REPLACE FUNCTION bump_page_version_on_course_update()
+RETURNS TRIGGER AS $$
+BEGIN
+  -- Explicit bumps (below) already moved the version
+  IF NEW.page_version = OLD.page_version
+     AND (NEW.title, NEW.description, NEW.category, NEW.price, NEW.creation_date,
+          NEW.last_update_date, NEW.status, NEW.qna_link, NEW.difficulty_level, NEW.creator_id)
+         IS DISTINCT FROM
+         (OLD.title, OLD.description, OLD.category, OLD.price, OLD.creation_date,
+          OLD.last_update_date, OLD.status, OLD.qna_link, OLD.difficulty_level, OLD.creator_id) THEN
+    NEW.page_version := OLD.page_version + 1;
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_course_page_version ON course;
+CREATE TRIGGER trg_course_page_version
+BEFORE UPDATE OF title, description, category, price, creation_date, last_update_date,
+                 status, qna_link, difficulty_level, creator_id ON course
+FOR EACH ROW
+EXECUTE FUNCTION bump_page_version_on_course_update();
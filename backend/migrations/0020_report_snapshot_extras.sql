@@ -0,0 +1,94 @@
+-- 0020: snapshots for the rest of the admin general reports
+--
+-- The general reports still ran their monthly series, status counts,
+-- instructor rankings and first-month probes as live scans next to the 0013
+-- snapshots. These views materialize them as well.
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS report_student_monthly AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT TO_CHAR(date_trunc('month', u.registration_date),'YYYY-MM') AS month,
+       COUNT(*) AS registration_count
+FROM "user" u
+JOIN student s ON s.id = u.id
+GROUP BY month
+) q;
+
+CREATE UNIQUE INDEX IF NOT EXISTS report_student_monthly_key ON report_student_monthly (month);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS report_course_status_counts AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT status, COUNT(*) AS count FROM (
+  SELECT status FROM course WHERE creation_date>=CURRENT_DATE-INTERVAL '1 year'
+) sub GROUP BY status
+) q;
+
+CREATE UNIQUE INDEX IF NOT EXISTS report_course_status_counts_key ON report_course_status_counts (status);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS report_course_monthly AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT TO_CHAR(date_trunc('month', creation_date),'YYYY-MM') AS month,
+       COUNT(*) AS course_count
+FROM course WHERE creation_date>=CURRENT_DATE-INTERVAL '1 year'
+GROUP BY month
+) q;
+
+CREATE UNIQUE INDEX IF NOT EXISTS report_course_monthly_key ON report_course_monthly (month);
+
+-- First month with data, where each general report's range starts
+CREATE MATERIALIZED VIEW IF NOT EXISTS report_first_months AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT (SELECT MIN(date_trunc('month', registration_date)) FROM "user") AS first_user_month,
+       (SELECT MIN(date_trunc('month', u.registration_date))
+        FROM "user" u JOIN instructor i ON i.id = u.id) AS first_instructor_month,
+       (SELECT MIN(date_trunc('month', creation_date)) FROM course) AS first_course_month
+) q;
+
+CREATE UNIQUE INDEX IF NOT EXISTS report_first_months_key ON report_first_months (refreshed_at);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS report_most_active_instructor AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT i.id,
+       u.first_name || ' ' || u.last_name AS full_name,
+       i.course_count AS total_courses
+FROM instructor i
+JOIN "user" u ON u.id=i.id
+ORDER BY i.course_count DESC LIMIT 1
+) q;
+
+CREATE UNIQUE INDEX IF NOT EXISTS report_most_active_instructor_key ON report_most_active_instructor (id);
+
+-- Instructor registrations per month, with the running instructor total
+CREATE MATERIALIZED VIEW IF NOT EXISTS report_instructor_monthly AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT TO_CHAR(m, 'YYYY-MM') AS month,
+       registration_count,
+       SUM(registration_count) OVER (ORDER BY m) AS total_instructors
+FROM (
+  SELECT date_trunc('month', u.registration_date) AS m, COUNT(*) AS registration_count
+  FROM "user" u
+  JOIN instructor i ON i.id = u.id
+  WHERE u.registration_date IS NOT NULL
+  GROUP BY m
+) stats
+) q;
+
+CREATE UNIQUE INDEX IF NOT EXISTS report_instructor_monthly_key ON report_instructor_monthly (month);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS report_top_instructors AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT i.id,
+       u.first_name || ' ' || u.last_name AS full_name,
+       i.i_rating AS rating
+FROM instructor i
+JOIN "user" u ON u.id=i.id
+ORDER BY i.i_rating DESC LIMIT 3
+) q;
+
+CREATE UNIQUE INDEX IF NOT EXISTS report_top_instructors_key ON report_top_instructors (id);
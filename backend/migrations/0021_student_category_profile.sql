@@ -0,0 +1,103 @@
+-- 0021: store per-student category profiles instead of recommendation lists
+--
+-- student_recommendation (0015) held every accepted course for every student:
+-- accepting or re-categorising a course rewrote one row per student, and
+-- dropping an enrollment rebuilt the student's whole list, even while the
+-- student was being deleted (which then failed on the foreign key).
+-- student_category keeps only the categories each student is enrolled in;
+-- recommendations are read from course with it (see student_home.py).
+
+DROP TRIGGER IF EXISTS trg_init_student_recommendations ON student;
+DROP TRIGGER IF EXISTS trg_update_recommendations_on_enroll ON enroll;
+DROP TRIGGER IF EXISTS trg_update_recommendations_on_course ON course;
+DROP FUNCTION IF EXISTS init_student_recommendations();
+DROP FUNCTION IF EXISTS update_recommendations_on_enroll();
+DROP FUNCTION IF EXISTS update_recommendations_on_course();
+DROP FUNCTION IF EXISTS refresh_student_recommendations(VARCHAR);
+DROP TABLE IF EXISTS student_recommendation;
+
+-- Categories each student is enrolled in, with how many of their courses are
+-- in each, kept up to date by the recommendation triggers below. A student's
+-- recommendations are every accepted course they are not enrolled in, with
+-- priority 1 if it is in one of these categories (see student_home.py); only
+-- this small per-student profile is stored, not the students x courses list.
+CREATE TABLE IF NOT EXISTS student_category (
+    student_id VARCHAR(8),
+    category VARCHAR(50),
+    course_count INTEGER NOT NULL CHECK (course_count > 0),
+    PRIMARY KEY (student_id, category),
+    FOREIGN KEY (student_id) REFERENCES student(id) ON DELETE CASCADE
+);
+
+-- Recount the category profile of the given students from their enrollments.
+-- Only students that still exist get rows: when a deleted user cascades to
+-- enroll, their profile is simply gone.
+CREATE OR REPLACE FUNCTION refresh_student_categories(p_student_ids VARCHAR[])
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM student_category WHERE student_id = ANY(p_student_ids);
+
+    INSERT INTO student_category (student_id, category, course_count)
+    SELECT e.student_id, c.category, COUNT(*)::INTEGER
+    FROM enroll e
+    JOIN student s ON s.id = e.student_id
+    JOIN course c ON c.course_id = e.course_id
+    WHERE e.student_id = ANY(p_student_ids)
+      AND c.category IS NOT NULL
+    GROUP BY e.student_id, c.category;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION update_student_categories_on_enroll_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_student_categories(ARRAY(SELECT DISTINCT student_id FROM new_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION update_student_categories_on_enroll_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_student_categories(ARRAY(SELECT DISTINCT student_id FROM old_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_student_categories_enroll_insert ON enroll;
+CREATE TRIGGER trg_student_categories_enroll_insert
+AFTER INSERT ON enroll
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION update_student_categories_on_enroll_insert();
+
+DROP TRIGGER IF EXISTS trg_student_categories_enroll_delete ON enroll;
+CREATE TRIGGER trg_student_categories_enroll_delete
+AFTER DELETE ON enroll
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION update_student_categories_on_enroll_delete();
+
+-- Re-categorising a course changes the profile of everyone enrolled in it
+CREATE OR REPLACE FUNCTION update_student_categories_on_course()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_student_categories(ARRAY(
+        SELECT DISTINCT e.student_id
+        FROM new_rows n
+        JOIN old_rows o ON o.course_id = n.course_id
+        JOIN enroll e ON e.course_id = n.course_id
+        WHERE n.category IS DISTINCT FROM o.category
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_student_categories_course ON course;
+CREATE TRIGGER trg_student_categories_course
+AFTER UPDATE ON course
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION update_student_categories_on_course();
+
+SELECT refresh_student_categories(ARRAY(SELECT id FROM student));
@@ -0,0 +1,47 @@
+-- 0022: rewrite progress_rate on content changes only where it changes
+--
+-- Adding or removing content updated progress_rate on every enrollment of
+-- the course, even when the value stayed the same. Each rewrite of a 100
+-- fired trg_course_completion_notification again and re-sent "course
+-- completed" to students and instructors who had already been told.
+
+-- Adding or removing content changes the denominator for everyone enrolled
+CREATE OR REPLACE FUNCTION count_content_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE course c
+    SET content_count = c.content_count + d.added
+    FROM (SELECT course_id, COUNT(*)::INTEGER AS added FROM new_rows GROUP BY course_id) d
+    WHERE c.course_id = d.course_id;
+
+    UPDATE enroll e
+    SET progress_rate = progress_from_counts(e.completed_count, c.content_count)
+    FROM course c
+    WHERE c.course_id = e.course_id
+      AND e.course_id IN (SELECT DISTINCT course_id FROM new_rows)
+      -- Only rows whose rate changes: rewriting an unchanged 100 would fire
+      -- the course completion notification again
+      AND e.progress_rate IS DISTINCT FROM progress_from_counts(e.completed_count, c.content_count);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION count_content_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE course c
+    SET content_count = GREATEST(c.content_count - d.removed, 0)
+    FROM (SELECT course_id, COUNT(*)::INTEGER AS removed FROM old_rows GROUP BY course_id) d
+    WHERE c.course_id = d.course_id;
+
+    UPDATE enroll e
+    SET progress_rate = progress_from_counts(e.completed_count, c.content_count)
+    FROM course c
+    WHERE c.course_id = e.course_id
+      AND e.course_id IN (SELECT DISTINCT course_id FROM old_rows)
+      -- Only rows whose rate changes: rewriting an unchanged 100 would fire
+      -- the course completion notification again
+      AND e.progress_rate IS DISTINCT FROM progress_from_counts(e.completed_count, c.content_count);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,32 @@
+-- 0023: enroll on financial aid approval only when the status changes
+--
+-- Since 0003 the update trigger enrolled every updated application whose
+-- status was 'approved', so any later edit of an approved application
+-- re-enrolled a student who had dropped the course. It now compares the old
+-- and new rows and acts only on a change to 'approved'.
+
+-- Updates enroll only applications whose status has just become 'approved',
+-- so editing an approved application later does not re-enroll a student
+-- who has since dropped the course. Transition tables cannot be combined
+-- with UPDATE OF <column>, so the trigger fires on any update and compares
+-- old and new rows here.
+CREATE OR REPLACE FUNCTION enroll_on_financial_aid_status_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO enroll (course_id, student_id, enroll_date, progress_rate)
+    SELECT n.course_id, n.student_id, CURRENT_DATE, 0
+    FROM new_rows n
+    LEFT JOIN old_rows o ON o.course_id = n.course_id AND o.student_id = n.student_id
+    WHERE n.status = 'approved'
+      AND o.status IS DISTINCT FROM 'approved'
+    ON CONFLICT (course_id, student_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_enroll_after_financial_aid_update ON apply_financial_aid;
+CREATE TRIGGER trg_enroll_after_financial_aid_update
+AFTER UPDATE ON apply_financial_aid
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION enroll_on_financial_aid_status_change();
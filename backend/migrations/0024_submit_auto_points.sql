@@ -0,0 +1,10 @@
+-- 0024: multiple-choice partial score of mixed assessments
+--
+-- An assessment with open-ended questions cannot be graded at submit time,
+-- but its multiple-choice part can. submit_task stores that part's points
+-- (and how many questions each part has) so the instructor only grades the
+-- open-ended answers; assign_grade combines the two into submit.grade.
+
+ALTER TABLE submit ADD COLUMN IF NOT EXISTS auto_points INTEGER CHECK (auto_points >= 0);
+ALTER TABLE submit ADD COLUMN IF NOT EXISTS auto_max_points INTEGER CHECK (auto_max_points >= 0);
+ALTER TABLE submit ADD COLUMN IF NOT EXISTS manual_max_points INTEGER CHECK (manual_max_points > 0);
@@ -0,0 +1,153 @@
+import json
+import os
+import queue
+import select
+import threading
+import time
+import psycopg2
+from db import connect_listener_db
+
+# Live notification delivery.
+#
+# The database announces every new receive row on the "notification_events"
+# channel (see NOTIFICATION EVENTS in schema.sql). One listener thread per
+# process holds a LISTEN connection and hands each event to the queues of
+# the users currently connected to GET /api/notifications/stream/<user_id>,
+# which relays them as server-sent events. Connected clients therefore learn
+# about new notifications as soon as they are committed, without polling.
+CHANNEL = "notification_events"
+NOTIFICATION_STREAM_HEARTBEAT = int(os.getenv("NOTIFICATION_STREAM_HEARTBEAT", "15"))  # seconds between keep-alives
+
+_subscribers = {}  # user_id -> set of queue.Queue
+_subscribers_lock = threading.Lock()
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def subscribe(user_id):
+    """Register a new stream for `user_id` and return the queue its events arrive on."""
+    _ensure_listener()
+    events = queue.Queue()
+    with _subscribers_lock:
+        _subscribers.setdefault(user_id, set()).add(events)
+    return events
+
+
+def unsubscribe(user_id, events):
+    with _subscribers_lock:
+        streams = _subscribers.get(user_id)
+        if streams is None:
+            return
+        streams.discard(events)
+        if not streams:
+            del _subscribers[user_id]
+
+
+def _publish(cursor, payloads):
+    """Resolve the recipients and unread counts of a batch of events and queue them."""
+    with _subscribers_lock:
+        connected = set(_subscribers)
+    if not connected:
+        return
+
+    deliveries = []  # (user_id, notification_id)
+    bulk_ids = []
+    for payload in payloads:
+        if payload.get("bulk"):
+            bulk_ids.append(payload["notification_id"])
+        elif payload.get("id") in connected:
+            deliveries.append((payload["id"], payload["notification_id"]))
+
+    if bulk_ids:
+        # Only look up the recipients that have a stream open here
+        cursor.execute(
+            """
+            SELECT id, notification_id
+            FROM receive
+            WHERE notification_id = ANY(%s) AND id = ANY(%s)
+            """,
+            (bulk_ids, list(connected)),
+        )
+        deliveries.extend(cursor.fetchall())
+    if not deliveries:
+        return
+
+    cursor.execute(
+        "SELECT id, unread_count FROM notification_counter WHERE id = ANY(%s)",
+        (list({user_id for user_id, _ in deliveries}),),
+    )
+    unread = dict(cursor.fetchall())
+
+    with _subscribers_lock:
+        for user_id, notification_id in deliveries:
+            event = {"notification_id": notification_id, "unread_count": unread.get(user_id, 0)}
+            for events in _subscribers.get(user_id, ()):
+                events.put(event)
+
+
+def _listen_forever():
+    while True:
+        try:
+            conn = connect_listener_db()
+        except psycopg2.Error as e:
+            print(f"[NOTIFICATION STREAM] cannot connect, retrying: {e}")
+            time.sleep(5)
+            continue
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"LISTEN {CHANNEL}")
+            while True:
+                if select.select([conn], [], [], 60) == ([], [], []):
+                    continue
+                conn.poll()
+                payloads = []
+                while conn.notifies:
+                    try:
+                        payloads.append(json.loads(conn.notifies.pop(0).payload))
+                    except ValueError:
+                        continue
+                if payloads:
+                    _publish(cursor, payloads)
+        except (psycopg2.Error, OSError) as e:
+            print(f"[NOTIFICATION STREAM] listener connection lost, reconnecting: {e}")
+        finally:
+            try:
+                conn.close()
+            except psycopg2.Error:
+                pass
+        time.sleep(1)
+
+
+def _ensure_listener():
+    global _listener
+    if _listener is not None:
+        return
+    with _listener_lock:
+        if _listener is None:
+            _listener = threading.Thread(target=_listen_forever, name="notification-listener", daemon=True)
+            _listener.start()
+
+
+def format_event(name, data):
+    """Encode one server-sent event."""
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+def event_stream(user_id, events, unread_count):
+    """
+    Generator behind the SSE response: the current unread count first, then
+    one "notification" event per new notification, with a comment line every
+    NOTIFICATION_STREAM_HEARTBEAT seconds so proxies keep the connection open
+    and a closed client is noticed.
+    """
+    try:
+        yield format_event("unread", {"unread_count": unread_count})
+        while True:
+            try:
+                event = events.get(timeout=NOTIFICATION_STREAM_HEARTBEAT)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_event("notification", event)
+    finally:
+        unsubscribe(user_id, events)
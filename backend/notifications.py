@@ -0,0 +1,178 @@
+import base64
+import binascii
+import datetime as dt
+import json
+import os
+import uuid
+
+# Bulk notification fan-out.
+#
+# A notification is one row in `notification` plus one `receive` row per
+# recipient. Recipients are either an explicit list of user ids (inserted
+# with a single INSERT ... SELECT over the array) or an audience resolved on
+# the server, e.g. every student enrolled in a course. Audiences are copied
+# into `receive` with INSERT ... SELECT in chunks of NOTIFICATION_FANOUT_CHUNK
+# recipients, walking the recipient ids in order and committing after each
+# chunk, so a site-wide announcement never holds one huge transaction and
+# recipients start seeing it before the last chunk is written.
+NOTIFICATION_FANOUT_CHUNK = int(os.getenv("NOTIFICATION_FANOUT_CHUNK", "5000"))
+
+# Inbox pages (newest first, keyset over receive.received_at / notification_id)
+INBOX_PAGE_SIZE = 20
+INBOX_MAX_PAGE_SIZE = 100
+
+# Read/archived state is per recipient (receive row), not per notification
+RECIPIENT_STATUS_SQL = """
+    CASE
+        WHEN r.archived_at IS NOT NULL THEN 'archived'
+        WHEN r.read_at IS NOT NULL THEN 'read'
+        ELSE 'unread'
+    END
+"""
+RECIPIENT_STATUS_FILTERS = {
+    "unread": "r.read_at IS NULL AND r.archived_at IS NULL",
+    "read": "r.read_at IS NOT NULL AND r.archived_at IS NULL",
+    "archived": "r.archived_at IS NOT NULL",
+}
+
+# audience name -> (recipient query selecting `id`, required parameters)
+AUDIENCES = {
+    "course_students": ("SELECT student_id AS id FROM enroll WHERE course_id = %(course_id)s", ("course_id",)),
+    "course_instructor": ("SELECT creator_id AS id FROM course WHERE course_id = %(course_id)s", ("course_id",)),
+    "students": ("SELECT id FROM student", ()),
+    "instructors": ("SELECT id FROM instructor", ()),
+    "admins": ("SELECT id FROM admin", ()),
+    "all_users": ('SELECT id FROM "user"', ()),
+}
+
+
+def _new_notification_id():
+    return f"N{uuid.uuid4().hex[:7].upper()}"
+
+
+def encode_inbox_cursor(received_at, notification_id):
+    """Opaque cursor pointing after the given inbox row."""
+    raw = json.dumps([received_at.isoformat(), notification_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_inbox_cursor(value):
+    """Inverse of encode_inbox_cursor. Raises ValueError for malformed cursors."""
+    try:
+        received_at, notification_id = json.loads(base64.urlsafe_b64decode(value.encode()))
+        return dt.datetime.fromisoformat(received_at), notification_id
+    except (TypeError, ValueError, binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError("malformed cursor") from e
+
+
+def unread_count(cursor, user_id):
+    """Unread notifications of a user, read from notification_counter."""
+    cursor.execute("SELECT unread_count FROM notification_counter WHERE id = %s", (user_id,))
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def insert_notification(cursor, type_, message, entity_type=None, entity_id=None):
+    """Insert the notification row itself and return its id."""
+    notification_id = _new_notification_id()
+    cursor.execute(
+        """
+        INSERT INTO notification (notification_id, type, entity_type, entity_id, message)
+        VALUES (%s, %s, %s, %s, %s)
+        """,
+        (notification_id, type_, entity_type, entity_id, message),
+    )
+    return notification_id
+
+
+def missing_users(cursor, user_ids):
+    """Return the ids in `user_ids` that do not belong to any user."""
+    cursor.execute(
+        """
+        SELECT requested.id
+        FROM unnest(%s::VARCHAR[]) AS requested(id)
+        WHERE NOT EXISTS (SELECT 1 FROM "user" u WHERE u.id = requested.id)
+        """,
+        (list(user_ids),),
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def deliver_to_users(cursor, notification_id, user_ids):
+    """Add one receive row per user id in a single statement. Returns the number of rows added."""
+    cursor.execute(
+        """
+        INSERT INTO receive (notification_id, id)
+        SELECT %s, recipient.id
+        FROM unnest(%s::VARCHAR[]) AS recipient(id)
+        ON CONFLICT (notification_id, id) DO NOTHING
+        """,
+        (notification_id, list(user_ids)),
+    )
+    return cursor.rowcount
+
+
+def audience_params(audience, params):
+    """
+    Check that `audience` exists and that `params` holds what its query needs.
+    Returns an error message, or None if the audience can be resolved.
+    """
+    if audience not in AUDIENCES:
+        return f"Unknown audience '{audience}', expected one of: {', '.join(sorted(AUDIENCES))}"
+    _, required = AUDIENCES[audience]
+    missing = [name for name in required if not params.get(name)]
+    if missing:
+        return f"Audience '{audience}' requires: {', '.join(missing)}"
+    return None
+
+
+def fan_out(conn, notification_id, audience, params=None, chunk_size=None):
+    """
+    Copy every recipient of `audience` into receive for `notification_id`.
+
+    Runs in chunks of `chunk_size` recipients (keyset over the recipient id)
+    and commits `conn` after each one, including the first, which also
+    commits the notification row inserted on the same connection. Recipients
+    that already have the notification are skipped, so a fan-out that failed
+    part way can simply be run again. Returns the number of rows added.
+    """
+    query, required = AUDIENCES[audience]
+    chunk_size = chunk_size or NOTIFICATION_FANOUT_CHUNK
+    query_params = {name: (params or {})[name] for name in required}
+    query_params["notification_id"] = notification_id
+    query_params["chunk_size"] = chunk_size
+
+    delivered = 0
+    last_id = ""
+    cursor = conn.cursor()
+    try:
+        while True:
+            query_params["last_id"] = last_id
+            cursor.execute(
+                f"""
+                WITH chunk AS (
+                    SELECT DISTINCT recipients.id
+                    FROM ({query}) AS recipients
+                    WHERE recipients.id > %(last_id)s
+                    ORDER BY recipients.id
+                    LIMIT %(chunk_size)s
+                ),
+                added AS (
+                    INSERT INTO receive (notification_id, id)
+                    SELECT %(notification_id)s, id FROM chunk
+                    ON CONFLICT (notification_id, id) DO NOTHING
+                    RETURNING 1
+                )
+                SELECT (SELECT MAX(id) FROM chunk), (SELECT COUNT(*) FROM added)
+                """,
+                query_params,
+            )
+            chunk_last_id, added = cursor.fetchone()
+            conn.commit()
+            if chunk_last_id is None:
+                break
+            delivered += added
+            last_id = chunk_last_id
+    finally:
+        cursor.close()
+    return delivered
@@ -0,0 +1,105 @@
+import threading
+
+# Registry of server-side prepared statements for hot-path queries.
+# Each entry is PREPAREd once per pooled connection (on first use) and
+# afterwards run with EXECUTE, so Postgres skips parsing/planning.
+#
+# SQL uses $1, $2, ... placeholders as required by PREPARE.
+STATEMENTS = {}
+
+_stats_lock = threading.Lock()
+_stats = {}  # name -> {"prepares": n, "hits": n}
+
+
+def register_statement(name, sql, param_count):
+    """Add a named statement to the registry."""
+    STATEMENTS[name] = (sql, param_count)
+    _stats.setdefault(name, {"prepares": 0, "hits": 0})
+
+
+def _count(name, key):
+    with _stats_lock:
+        _stats[name][key] += 1
+
+
+def execute_prepared(cursor, name, params=()):
+    """
+    Run a registered statement on the cursor's connection by name.
+    The statement is PREPAREd on that connection the first time it is used.
+    """
+    sql, param_count = STATEMENTS[name]
+    if len(params) != param_count:
+        raise ValueError(f"Statement '{name}' expects {param_count} parameters, got {len(params)}")
+
+    prepared = getattr(cursor.connection, "prepared", None)
+    if prepared is None:
+        # Connection opened outside the pool, just run the statement directly
+        cursor.execute(_to_pyformat(sql, param_count), {f"p{i}": v for i, v in enumerate(params, 1)})
+        return cursor
+
+    if name in prepared:
+        _count(name, "hits")
+    else:
+        cursor.execute(f"PREPARE {name} AS {sql}")
+        prepared.add(name)
+        _count(name, "prepares")
+
+    placeholders = ", ".join(["%s"] * param_count)
+    cursor.execute(f"EXECUTE {name} ({placeholders})" if param_count else f"EXECUTE {name}", params)
+    return cursor
+
+
+def _to_pyformat(sql, param_count):
+    # Highest numbers first so $1 doesn't clobber $10
+    for i in range(param_count, 0, -1):
+        sql = sql.replace(f"${i}", f"%(p{i})s")
+    return sql
+
+
+def statement_stats():
+    """Prepare (miss) and execute-by-name (hit) counts per registered statement."""
+    with _stats_lock:
+        return {name: dict(counts) for name, counts in _stats.items()}
+
+
+# ───── HOT-PATH STATEMENTS ─────
+register_statement("course_status", "SELECT status FROM course WHERE course_id = $1", 1)
+register_statement(
+    "course_rating_summary",
+    """
+    SELECT course_id, status,
+           ROUND(rating_sum::NUMERIC / NULLIF(rating_count, 0), 2) AS avg_rating,
+           rating_count AS total_reviews
+    FROM course
+    WHERE course_id = $1
+    """,
+    1,
+)
+register_statement("student_exists", "SELECT 1 FROM student WHERE id = $1", 1)
+register_statement("enrollment_exists", "SELECT 1 FROM enroll WHERE course_id = $1 AND student_id = $2", 2)
+register_statement("section_exists", "SELECT 1 FROM section WHERE course_id = $1 AND sec_id = $2", 2)
+register_statement(
+    "content_exists",
+    "SELECT 1 FROM content WHERE course_id = $1 AND sec_id = $2 AND content_id = $3",
+    3,
+)
+register_statement(
+    "content_context",
+    """
+    SELECT c.status,
+           s.sec_id IS NOT NULL      AS section_exists,
+           ct.content_id IS NOT NULL AS content_exists,
+           t.task_type,
+           st.id IS NOT NULL         AS student_exists,
+           e.student_id IS NOT NULL  AS enrolled,
+           e.progress_rate
+    FROM course c
+    LEFT JOIN section s  ON s.course_id = c.course_id AND s.sec_id = $2
+    LEFT JOIN content ct ON ct.course_id = c.course_id AND ct.sec_id = $2 AND ct.content_id = $3
+    LEFT JOIN task t     ON t.course_id = c.course_id AND t.sec_id = $2 AND t.content_id = $3
+    LEFT JOIN student st ON st.id = $4
+    LEFT JOIN enroll e   ON e.course_id = c.course_id AND e.student_id = $4
+    WHERE c.course_id = $1
+    """,
+    4,
+)
@@ -0,0 +1,212 @@
+# Bulk authoring of assessment questions.
+#
+# A question set is written with one statement: the incoming questions are
+# passed as arrays, compared with what is stored (question plus its
+# multiple_choice / open_ended row), and only the differences are inserted,
+# updated or deleted, together with assessment.question_count. Importing a
+# large question bank is one round trip, and re-saving an assessment leaves
+# unchanged rows (and their version stamp, see QUESTION VERSIONS in
+# schema.sql) untouched.
+QUESTION_TYPES = ("multiple_choice", "open_ended")
+CHOICES = ("A", "B", "C", "D", "E")
+DEFAULT_MAX_TIME = 300  # seconds
+
+_SYNC_SQL = """
+WITH incoming AS (
+    SELECT *
+    FROM unnest(%(ids)s::VARCHAR[], %(bodies)s::VARCHAR[], %(max_times)s::INTEGER[],
+                %(types)s::VARCHAR[], %(answers)s::TEXT[])
+        AS i(question_id, question_body, max_time, question_type, answer)
+),
+stored AS (
+    SELECT q.question_id, q.question_body, q.max_time,
+           mc.correct_answer::TEXT AS mc_answer, oe.answer AS oe_answer,
+           mc.question_id IS NOT NULL AS is_mc, oe.question_id IS NOT NULL AS is_oe
+    FROM question q
+    LEFT JOIN multiple_choice mc
+      ON mc.course_id = q.course_id AND mc.sec_id = q.sec_id
+     AND mc.content_id = q.content_id AND mc.question_id = q.question_id
+    LEFT JOIN open_ended oe
+      ON oe.course_id = q.course_id AND oe.sec_id = q.sec_id
+     AND oe.content_id = q.content_id AND oe.question_id = q.question_id
+    WHERE q.course_id = %(course_id)s AND q.sec_id = %(sec_id)s AND q.content_id = %(content_id)s
+),
+removed AS (
+    SELECT s.question_id
+    FROM stored s
+    WHERE %(replace)s AND NOT EXISTS (SELECT 1 FROM incoming i WHERE i.question_id = s.question_id)
+),
+-- Subtype rows of removed questions, and of questions whose type changes
+deleted_mc AS (
+    DELETE FROM multiple_choice mc
+    USING stored s
+    LEFT JOIN incoming i ON i.question_id = s.question_id
+    WHERE mc.course_id = %(course_id)s AND mc.sec_id = %(sec_id)s AND mc.content_id = %(content_id)s
+      AND mc.question_id = s.question_id AND s.is_mc
+      AND ((i.question_id IS NULL AND %(replace)s) OR i.question_type = 'open_ended')
+    RETURNING 1
+),
+deleted_oe AS (
+    DELETE FROM open_ended oe
+    USING stored s
+    LEFT JOIN incoming i ON i.question_id = s.question_id
+    WHERE oe.course_id = %(course_id)s AND oe.sec_id = %(sec_id)s AND oe.content_id = %(content_id)s
+      AND oe.question_id = s.question_id AND s.is_oe
+      AND ((i.question_id IS NULL AND %(replace)s) OR i.question_type = 'multiple_choice')
+    RETURNING 1
+),
+deleted AS (
+    DELETE FROM question q
+    USING removed r
+    WHERE q.course_id = %(course_id)s AND q.sec_id = %(sec_id)s AND q.content_id = %(content_id)s
+      AND q.question_id = r.question_id
+    RETURNING 1
+),
+upserted AS (
+    INSERT INTO question (course_id, sec_id, content_id, question_id, question_body, max_time)
+    SELECT %(course_id)s, %(sec_id)s, %(content_id)s, i.question_id, i.question_body, i.max_time
+    FROM incoming i
+    LEFT JOIN stored s ON s.question_id = i.question_id
+    WHERE s.question_id IS NULL
+       OR s.question_body IS DISTINCT FROM i.question_body
+       OR s.max_time IS DISTINCT FROM i.max_time
+    ON CONFLICT (course_id, sec_id, content_id, question_id)
+    DO UPDATE SET question_body = EXCLUDED.question_body, max_time = EXCLUDED.max_time
+    RETURNING (xmax = 0) AS inserted
+),
+upserted_mc AS (
+    INSERT INTO multiple_choice (course_id, sec_id, content_id, question_id, correct_answer)
+    SELECT %(course_id)s, %(sec_id)s, %(content_id)s, i.question_id, i.answer
+    FROM incoming i
+    LEFT JOIN stored s ON s.question_id = i.question_id
+    WHERE i.question_type = 'multiple_choice'
+      AND (s.mc_answer IS NULL OR s.mc_answer <> i.answer)
+    ON CONFLICT (course_id, sec_id, content_id, question_id)
+    DO UPDATE SET correct_answer = EXCLUDED.correct_answer
+    RETURNING 1
+),
+upserted_oe AS (
+    INSERT INTO open_ended (course_id, sec_id, content_id, question_id, answer)
+    SELECT %(course_id)s, %(sec_id)s, %(content_id)s, i.question_id, i.answer
+    FROM incoming i
+    LEFT JOIN stored s ON s.question_id = i.question_id
+    WHERE i.question_type = 'open_ended'
+      AND (NOT COALESCE(s.is_oe, FALSE) OR s.oe_answer IS DISTINCT FROM i.answer)
+    ON CONFLICT (course_id, sec_id, content_id, question_id)
+    DO UPDATE SET answer = EXCLUDED.answer
+    RETURNING 1
+),
+counts AS (
+    SELECT (SELECT COUNT(*) FROM upserted WHERE inserted) AS inserted,
+           (SELECT COUNT(*) FROM upserted WHERE NOT inserted) AS updated,
+           (SELECT COUNT(*) FROM deleted) AS deleted,
+           (SELECT COUNT(*) FROM stored)
+             - (SELECT COUNT(*) FROM deleted)
+             + (SELECT COUNT(*) FROM upserted WHERE inserted) AS question_count,
+           (SELECT COUNT(*) FROM deleted_mc) + (SELECT COUNT(*) FROM deleted_oe)
+             + (SELECT COUNT(*) FROM upserted_mc) + (SELECT COUNT(*) FROM upserted_oe) AS answers_changed
+),
+counted AS (
+    UPDATE assessment a
+    SET question_count = counts.question_count
+    FROM counts
+    WHERE a.course_id = %(course_id)s AND a.sec_id = %(sec_id)s AND a.content_id = %(content_id)s
+      AND a.question_count IS DISTINCT FROM counts.question_count
+    RETURNING 1
+)
+SELECT inserted, updated, deleted, question_count, answers_changed FROM counts
+"""
+
+
+def normalize_questions(questions, require_ids=True):
+    """
+    Check a list of question payloads and return (questions, error).
+
+    Each question needs question_body; question_id unless `require_ids` is
+    False; max_time defaults to DEFAULT_MAX_TIME. question_type is optional:
+    "multiple_choice" needs correct_answer (A-E), "open_ended" needs answer;
+    without a type the question's multiple_choice / open_ended row is left
+    as it is.
+    """
+    if not isinstance(questions, list):
+        return None, "questions must be a list"
+
+    normalized = []
+    seen = set()
+    for index, question in enumerate(questions):
+        if not isinstance(question, dict):
+            return None, f"Question {index} must be an object"
+        question_id = question.get("question_id")
+        if question_id is None or question_id == "":
+            if require_ids:
+                return None, f"Question {index} is missing question_id"
+        else:
+            question_id = str(question_id)
+            if len(question_id) > 8:
+                return None, f"Question {index}: question_id is longer than 8 characters"
+            if question_id in seen:
+                return None, f"Question {index}: duplicate question_id '{question_id}'"
+            seen.add(question_id)
+
+        if not question.get("question_body"):
+            return None, f"Question {index} is missing question_body"
+        try:
+            max_time = int(question.get("max_time", DEFAULT_MAX_TIME))
+        except (TypeError, ValueError):
+            return None, f"Question {index}: max_time must be an integer"
+        if max_time < 0:
+            return None, f"Question {index}: max_time must not be negative"
+
+        question_type = question.get("question_type")
+        answer = None
+        if question_type == "multiple_choice":
+            answer = str(question.get("correct_answer") or "").strip().upper()
+            if answer not in CHOICES:
+                return None, f"Question {index}: correct_answer must be one of {', '.join(CHOICES)}"
+        elif question_type == "open_ended":
+            if "answer" not in question:
+                return None, f"Question {index}: missing answer for open-ended question"
+            answer = question["answer"]
+        elif question_type is not None:
+            return None, f"Question {index}: question_type must be one of {', '.join(QUESTION_TYPES)}"
+
+        normalized.append({
+            "question_id": question_id,
+            "question_body": question["question_body"],
+            "max_time": max_time,
+            "question_type": question_type,
+            "answer": answer,
+        })
+    return normalized, None
+
+
+def sync_questions(cursor, course_id, sec_id, content_id, questions, replace=True):
+    """
+    Write normalized `questions` (see normalize_questions) to an assessment in
+    one statement, touching only rows that differ from what is stored.
+
+    With `replace`, stored questions missing from `questions` are deleted
+    (the list is the whole question set); otherwise they are kept and the
+    list is added or updated on top. Returns a dict with the number of
+    questions inserted, updated and deleted, the resulting question_count,
+    and how many multiple_choice / open_ended rows changed.
+    """
+    cursor.execute(_SYNC_SQL, {
+        "course_id": course_id,
+        "sec_id": sec_id,
+        "content_id": content_id,
+        "replace": replace,
+        "ids": [q["question_id"] for q in questions],
+        "bodies": [q["question_body"] for q in questions],
+        "max_times": [q["max_time"] for q in questions],
+        "types": [q["question_type"] for q in questions],
+        "answers": [q["answer"] for q in questions],
+    })
+    inserted, updated, deleted, question_count, answers_changed = cursor.fetchone()
+    return {
+        "inserted": inserted,
+        "updated": updated,
+        "deleted": deleted,
+        "question_count": question_count,
+        "answers_changed": answers_changed,
+    }
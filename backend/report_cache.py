@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+import psycopg2
+from db import borrow_connection, connect_listener_db
+
+# Materialized snapshots behind the admin "general" reports.
+#
+# Each cached view materializes one of the report queries so the report
+# endpoints read a handful of precomputed rows instead of scanning enroll,
+# student and course on every click. The views themselves are schema (REPORT
+# SNAPSHOTS in schema.sql, migrations 0013 and 0020). Every serving process
+# starts a refresher thread, but only the one holding a session advisory lock
+# on its own dedicated connection refreshes, with REFRESH MATERIALIZED VIEW
+# CONCURRENTLY so readers are never blocked. The others keep trying for the
+# lock and take over when the refreshing process goes away, so the snapshots
+# are rebuilt once per period whatever the number of workers.
+REPORT_CACHE_REFRESH_SECONDS = int(os.getenv("REPORT_CACHE_REFRESH_SECONDS", "300"))
+
+# pg_try_advisory_lock key held by the process that refreshes the snapshots
+REPORT_CACHE_LOCK_ID = 35302
+
+CACHED_VIEWS = []  # names of the materialized views to keep refreshed
+
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def register_cached_view(name):
+    """Register a materialized view (created by the schema) for periodic refresh."""
+    if name not in CACHED_VIEWS:
+        CACHED_VIEWS.append(name)
+
+
+def _refresh(conn, names):
+    with conn.cursor() as cursor:
+        for name in names:
+            cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {name}")
+
+
+def refresh_report_cache(names=None):
+    """Refresh the given cached views (all of them by default)."""
+    with borrow_connection() as conn:
+        conn.autocommit = True
+        _refresh(conn, names or CACHED_VIEWS)
+
+
+def read_cached(cursor, name, order_by=None):
+    """
+    Read all rows of a cached view with the given (dict) cursor.
+    Returns (rows, refreshed_at) with the refreshed_at column removed from rows.
+    """
+    query = f"SELECT * FROM {name}"
+    if order_by:
+        query += f" ORDER BY {order_by}"
+    cursor.execute(query)
+    rows = [dict(row) for row in cursor.fetchall()]
+    refreshed_at = None
+    for row in rows:
+        refreshed_at = row.pop("refreshed_at", None)
+    return rows, refreshed_at
+
+
+def _refresh_loop():
+    conn = None
+    leader = False
+    while True:
+        time.sleep(REPORT_CACHE_REFRESH_SECONDS)
+        try:
+            if conn is None:
+                conn = connect_listener_db()
+            if not leader:
+                # Held for the life of the connection; released if this process dies
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT pg_try_advisory_lock(%s)", (REPORT_CACHE_LOCK_ID,))
+                    leader = cursor.fetchone()[0]
+            if leader:
+                _refresh(conn, CACHED_VIEWS)
+        except psycopg2.Error as e:
+            print(f"[REPORT CACHE] refresh failed: {e}")
+            if conn is not None and conn.closed:
+                conn, leader = None, False
+
+
+def start_report_cache_refresher():
+    """Start the periodic refresher thread (once per process; one process refreshes at a time)."""
+    global _refresher
+    if REPORT_CACHE_REFRESH_SECONDS <= 0:
+        return
+    with _refresher_lock:
+        if _refresher is not None:
+            return
+        _refresher = threading.Thread(target=_refresh_loop, name="report-cache-refresher", daemon=True)
+        _refresher.start()
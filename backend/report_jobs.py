@@ -0,0 +1,214 @@
+import os
+import json
+import socket
+import uuid
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import psycopg2
+from flask import g, has_request_context
+from db import borrow_connection, get_db
+
+# Background report generation.
+#
+# A report endpoint called with ?async=true does not compute the report in the
+# request: a row is added to report_job, the job is handed to a small local
+# worker pool and the caller gets the job id back right away. The worker runs
+# the same view function in its own request context and records progress and
+# the resulting report_id on the job row, which clients poll through
+# GET /api/report/jobs/<job_id>.
+#
+# Every job row names the process that owns it, and that process refreshes
+# heartbeat_at on its unfinished jobs every REPORT_JOB_HEARTBEAT_SECONDS.
+# A queued or running job whose heartbeat is older than
+# REPORT_JOB_STALE_SECONDS belongs to a process that is gone (restarted or
+# crashed) and is marked failed by whichever process sweeps next; jobs of
+# live processes are never touched.
+REPORT_JOB_WORKERS = int(os.getenv("REPORT_JOB_WORKERS", "2"))
+REPORT_JOB_HEARTBEAT_SECONDS = int(os.getenv("REPORT_JOB_HEARTBEAT_SECONDS", "30"))
+REPORT_JOB_STALE_SECONDS = int(
+    os.getenv("REPORT_JOB_STALE_SECONDS", str(REPORT_JOB_HEARTBEAT_SECONDS * 4))
+)
+
+# Identifies this process's worker pool in report_job.owner
+OWNER_ID = f"{socket.gethostname()[:40]}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_executor = None
+_executor_lock = threading.Lock()
+_heartbeat = None
+_heartbeat_lock = threading.Lock()
+
+
+_NOW = object()  # marker for "set this column to CURRENT_TIMESTAMP"
+
+
+def _new_job_id():
+    return f"J{uuid.uuid4().hex[:7].upper()}"
+
+
+def _update_job(job_id, **fields):
+    """Write job fields on an independent autocommit connection so pollers see them at once."""
+    assignments = ", ".join(
+        f"{name} = CURRENT_TIMESTAMP" if value is _NOW else f"{name} = %({name})s"
+        for name, value in fields.items()
+    )
+    params = {name: value for name, value in fields.items() if value is not _NOW}
+    params["job_id"] = job_id
+    with borrow_connection() as conn:
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f"UPDATE report_job SET {assignments} WHERE job_id = %(job_id)s", params)
+
+
+def _fail_interrupted_jobs():
+    """Fail unfinished jobs whose owning process has stopped sending heartbeats."""
+    with borrow_connection() as conn:
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE report_job
+                SET status = 'failed',
+                    error = 'interrupted: the server running it stopped',
+                    finished_at = CURRENT_TIMESTAMP
+                WHERE status IN ('queued', 'running')
+                  AND owner IS DISTINCT FROM %s
+                  AND heartbeat_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                """,
+                (OWNER_ID, REPORT_JOB_STALE_SECONDS),
+            )
+
+
+def _send_heartbeats():
+    with borrow_connection() as conn:
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE report_job
+                SET heartbeat_at = CURRENT_TIMESTAMP
+                WHERE owner = %s AND status IN ('queued', 'running')
+                """,
+                (OWNER_ID,),
+            )
+
+
+def _heartbeat_loop():
+    while True:
+        try:
+            _send_heartbeats()
+            _fail_interrupted_jobs()
+        except psycopg2.Error as e:
+            print(f"[REPORT JOB] heartbeat failed: {e}")
+        time.sleep(max(REPORT_JOB_HEARTBEAT_SECONDS, 1))
+
+
+def start_report_job_heartbeat():
+    """
+    Start the thread that keeps this process's jobs alive and fails those of
+    dead processes (once per process). Started with the app, so jobs left
+    behind by a crashed server are cleaned up without waiting for a new one.
+    """
+    global _heartbeat
+    with _heartbeat_lock:
+        if _heartbeat is not None:
+            return
+        _heartbeat = threading.Thread(target=_heartbeat_loop, name="report-job-heartbeat", daemon=True)
+        _heartbeat.start()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                start_report_job_heartbeat()
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(REPORT_JOB_WORKERS, 1),
+                    thread_name_prefix="report-job",
+                )
+    return _executor
+
+
+def enqueue_report_job(app, endpoint, path, params, admin_id=None):
+    """
+    Record a queued job for the view `endpoint` (called with query `params`)
+    and submit it to the worker pool. Returns the new job id.
+    """
+    executor = _get_executor()
+    job_id = _new_job_id()
+    with borrow_connection() as conn:
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO report_job (job_id, admin_id, endpoint, params, owner, heartbeat_at)
+                VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+                """,
+                (job_id, admin_id, endpoint, json.dumps(params), OWNER_ID),
+            )
+    executor.submit(_run_job, app, job_id, endpoint, path, params)
+    return job_id
+
+
+def _run_job(app, job_id, endpoint, path, params):
+    try:
+        _update_job(job_id, status="running", progress=5, started_at=_NOW)
+        view = app.view_functions[endpoint]
+        with app.test_request_context(path, query_string=params):
+            g.report_job_id = job_id
+            response = app.make_response(view())
+            if response.status_code >= 400:
+                get_db().failed = True
+        body = response.get_json(silent=True) or {}
+
+        if response.status_code >= 400 or not body.get("success"):
+            _update_job(
+                job_id,
+                status="failed",
+                error=body.get("message") or f"report endpoint returned {response.status_code}",
+                finished_at=_NOW,
+            )
+        else:
+            _update_job(
+                job_id,
+                status="done",
+                progress=100,
+                report_id=body.get("report_id"),
+                finished_at=_NOW,
+            )
+    except Exception as e:
+        print(f"[REPORT JOB] {job_id} failed: {e}")
+        try:
+            _update_job(job_id, status="failed", error=str(e), finished_at=_NOW)
+        except psycopg2.Error as db_error:
+            print(f"[REPORT JOB] could not record failure of {job_id}: {db_error}")
+
+
+def report_progress(percent):
+    """
+    Record progress of the report job running in the current context.
+    Does nothing when the report is being generated synchronously.
+    """
+    job_id = g.get("report_job_id") if has_request_context() else None
+    if job_id is None:
+        return
+    try:
+        _update_job(job_id, progress=max(0, min(int(percent), 99)))
+    except psycopg2.Error as e:
+        print(f"[REPORT JOB] could not record progress of {job_id}: {e}")
+
+
+def get_report_job(cursor, job_id):
+    """Return the job row as a dict (read with the given cursor), or None if there is no such job."""
+    cursor.execute(
+        """
+        SELECT job_id, admin_id, endpoint, params, status, progress,
+               report_id, error, created_at, started_at, finished_at
+        FROM report_job
+        WHERE job_id = %s
+        """,
+        (job_id,),
+    )
+    row = cursor.fetchone()
+    return dict(row) if row else None
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from db import connect_project_db
+from prepared import execute_prepared
 import psycopg2.extras
 
 admin_bp = Blueprint("admin", __name__)
@@ -23,7 +24,7 @@ def evaluate_course(course_id, admin_id):
 
     try:
         # Check if course exists
-        cursor.execute("SELECT status FROM course WHERE course_id = %s", (course_id,))
+        execute_prepared(cursor, "course_status", (course_id,))
         course = cursor.fetchone()
         if course is None:
             return jsonify({"success": False, "message": "Course not found"}), 404
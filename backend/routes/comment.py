@@ -1,5 +1,7 @@
 from flask import Blueprint, request, jsonify
 from db import connect_project_db
+from prepared import execute_prepared
+from routes.guards import check_course_access
 import psycopg2.extras
 
 comment_bp = Blueprint("comment", __name__)
@@ -14,9 +16,7 @@ def add_comment(course_id, sec_id, content_id, user_id):
     cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
     try:
         # Check if course exists and is accepted
-        cursor.execute("""
-            SELECT status FROM course WHERE course_id = %s
-        """, (course_id,))
+        execute_prepared(cursor, "course_status", (course_id,))
         course = cursor.fetchone()
         if not course:
             return jsonify({"success": False, "message": "Course not found"}), 404
@@ -44,9 +44,7 @@ def add_comment(course_id, sec_id, content_id, user_id):
             allowed = cursor.fetchone() is not None
         # Allow if user is student and enrolled
         elif role == "student":
-            cursor.execute("""
-                SELECT 1 FROM enroll WHERE course_id = %s AND student_id = %s
-            """, (course_id, user_id))
+            execute_prepared(cursor, "enrollment_exists", (course_id, user_id))
             allowed = cursor.fetchone() is not None
         else:
             allowed = False
@@ -76,27 +74,10 @@ def get_comments_for_content(course_id, sec_id, content_id):
         conn = connect_project_db()
         cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
 
-        # Check if course exists and is accepted
-        cursor.execute("SELECT status FROM course WHERE course_id = %s", (course_id,))
-        course = cursor.fetchone()
-        if not course:
-            return jsonify({"success": False, "message": "Course not found"}), 404
-        if course[0] != "accepted":
-            return jsonify({"success": False, "message": "Course is not accepted"}), 403
-
-        # Check section exists
-        cursor.execute("""
-            SELECT 1 FROM section WHERE course_id = %s AND sec_id = %s
-        """, (course_id, sec_id))
-        if cursor.fetchone() is None:
-            return jsonify({"success": False, "message": "Section not found"}), 404
-
-        # Check content exists
-        cursor.execute("""
-            SELECT 1 FROM content WHERE course_id = %s AND sec_id = %s AND content_id = %s
-        """, (course_id, sec_id, content_id))
-        if cursor.fetchone() is None:
-            return jsonify({"success": False, "message": "Content not found"}), 404
+        # Check course, section and content in one query
+        ctx, error = check_course_access(cursor, course_id, sec_id, content_id)
+        if error:
+            return error
         
         # Fetch comments
         cursor.execute("""
@@ -124,27 +105,10 @@ def get_comment_count(course_id, sec_id, content_id):
         conn = connect_project_db()
         cursor = conn.cursor()
 
-        # Check if course exists and is accepted
-        cursor.execute("SELECT status FROM course WHERE course_id = %s", (course_id,))
-        course = cursor.fetchone()
-        if not course:
-            return jsonify({"success": False, "message": "Course not found"}), 404
-        if course[0] != "accepted":
-            return jsonify({"success": False, "message": "Course is not accepted"}), 403
-
-        # Check section exists
-        cursor.execute("""
-            SELECT 1 FROM section WHERE course_id = %s AND sec_id = %s
-        """, (course_id, sec_id))
-        if cursor.fetchone() is None:
-            return jsonify({"success": False, "message": "Section not found"}), 404
-
-        # Check content exists
-        cursor.execute("""
-            SELECT 1 FROM content WHERE course_id = %s AND sec_id = %s AND content_id = %s
-        """, (course_id, sec_id, content_id))
-        if cursor.fetchone() is None:
-            return jsonify({"success": False, "message": "Content not found"}), 404
+        # Check course, section and content in one query
+        ctx, error = check_course_access(cursor, course_id, sec_id, content_id)
+        if error:
+            return error
         
         # Fetch comment count
         cursor.execute("""
@@ -1,5 +1,10 @@
 from flask import Blueprint, request, jsonify, send_from_directory, abort
 from db import connect_project_db
+from prepared import execute_prepared
+from routes.guards import check_course_access
+from answer_keys import score_answers
+from assessment_cache import get_assessment, invalidate_assessment
+from question_bank import normalize_questions, sync_questions
 import psycopg2.extras
 from werkzeug.utils import secure_filename
 import os, json
@@ -14,43 +19,13 @@ def submit_task(course_id, sec_id, content_id, student_id):
     conn = connect_project_db()
     cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
     try:
-        # Check if course exists and is accepted
-        cursor.execute("SELECT status FROM course WHERE course_id = %s", (course_id,))
-        course = cursor.fetchone()
-        if not course:
-            return jsonify({"success": False, "message": "Course not found"}), 404
-        if course[0] != "accepted":
-            return jsonify({"success": False, "message": "Course is not accepted"}), 403
-
-        # Check section exists
-        cursor.execute("""
-            SELECT 1 FROM section WHERE course_id = %s AND sec_id = %s
-        """, (course_id, sec_id))
-        if cursor.fetchone() is None:
-            return jsonify({"success": False, "message": "Section not found"}), 404
-
-        # Check content exists
-        cursor.execute("""
-            SELECT 1 FROM content WHERE course_id = %s AND sec_id = %s AND content_id = %s
-        """, (course_id, sec_id, content_id))
-        if cursor.fetchone() is None:
-            return jsonify({"success": False, "message": "Content not found"}), 404
-        
-        # Check enrollment
-        cursor.execute("""
-            SELECT 1 FROM enroll WHERE course_id = %s AND student_id = %s
-        """, (course_id, student_id))
-        if cursor.fetchone() is None:
-            return jsonify({"success": False, "message": "User is not enrolled in the course"}), 403
-
-        # Get task_type
-        cursor.execute("""
-            SELECT task_type FROM task WHERE course_id = %s AND sec_id = %s AND content_id = %s
-        """, (course_id, sec_id, content_id))
-        task = cursor.fetchone()
-        if not task:
-            return jsonify({"success": False, "message": "Task not found"}), 404
-        task_type = task["task_type"]
+        # Check course, section, content, enrollment and task in one query
+        ctx, error = check_course_access(cursor, course_id, sec_id, content_id, student_id, require_task=True)
+        if error:
+            return error
+        task_type = ctx["task_type"]
+        grade = None
+        auto_points = auto_max_points = manual_max_points = None
 
         # Handle assignment file upload
         if task_type == "assignment":
@@ -80,18 +55,36 @@ def submit_task(course_id, sec_id, content_id, student_id):
 
             answers = json.dumps(data["answers"])
 
+            # Multiple-choice only assessments are graded right away against the
+            # cached answer key. With open-ended questions, the multiple-choice
+            # points are kept and the instructor only grades the open-ended part
+            assessment = get_assessment(cursor, course_id, sec_id, content_id)
+            if assessment:
+                grade, results = score_answers(assessment.answer_key, data["answers"])
+                if grade is None and results:
+                    auto_points = sum(results.values())
+                    auto_max_points = len(results)
+                    manual_max_points = len(assessment.answer_key.manual)
 
         else:
             return jsonify({"success": False, "message": f"Unsupported task_type: {task_type}"}), 400
 
         # Insert into submit table
         cursor.execute("""
-            INSERT INTO submit (course_id, sec_id, content_id, student_id, grade, submission_date, answers)
-            VALUES (%s, %s, %s, %s, NULL, CURRENT_DATE, %s)
-        """, (course_id, sec_id, content_id, student_id, answers))
+            INSERT INTO submit (course_id, sec_id, content_id, student_id, grade, submission_date, answers,
+                                auto_points, auto_max_points, manual_max_points)
+            VALUES (%s, %s, %s, %s, %s, CURRENT_DATE, %s, %s, %s, %s)
+        """, (course_id, sec_id, content_id, student_id, grade, answers,
+              auto_points, auto_max_points, manual_max_points))
 
         conn.commit()
-        return jsonify({"success": True}), 201
+        return jsonify({
+            "success": True,
+            "grade": grade,
+            "auto_graded": grade is not None,
+            "auto_points": auto_points,
+            "auto_max_points": auto_max_points,
+        }), 201
 
     except Exception as e:
         conn.rollback()
@@ -110,22 +103,10 @@ def complete_content(course_id, sec_id, content_id, student_id):
     conn = connect_project_db()
     cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
     try:
-        # Check if course exists and is accepted
-        cursor.execute("""
-            SELECT status FROM course WHERE course_id = %s
-        """, (course_id,))
-        course = cursor.fetchone()
-        if not course:
-            return jsonify({"success": False, "message": "Course not found"}), 404
-        if course[0] != "accepted":
-            return jsonify({"success": False, "message": "Course is not accepted"}), 403
-        
-        # Check if user is enrolled
-        cursor.execute("""
-            SELECT 1 FROM enroll WHERE course_id = %s AND student_id = %s
-        """, (course_id, student_id))
-        if cursor.fetchone() is None:
-            return jsonify({"success": False, "message": "User is not enrolled in the course"}), 403
+        # Check course status and enrollment in one query
+        ctx, error = check_course_access(cursor, course_id, student_id=student_id)
+        if error:
+            return error
         
         cursor.execute("""
             INSERT INTO complete (course_id, sec_id, content_id, student_id, is_completed)
@@ -194,7 +175,7 @@ def get_detailed_completion_status(course_id, student_id):
     
     try:
         # Check if course exists and is accepted
-        cursor.execute("SELECT status FROM course WHERE course_id = %s", (course_id,))
+        execute_prepared(cursor, "course_status", (course_id,))
         course = cursor.fetchone()
         if not course:
             return jsonify({"success": False, "message": "Course not found"}), 404
@@ -202,14 +183,12 @@ def get_detailed_completion_status(course_id, student_id):
             return jsonify({"success": False, "message": "Course is not accepted"}), 403
 
         # Check if student exists
-        cursor.execute("SELECT 1 FROM student WHERE id = %s", (student_id,))
+        execute_prepared(cursor, "student_exists", (student_id,))
         if not cursor.fetchone():
             return jsonify({"success": False, "message": "Student not found"}), 404
 
         # Check if student is enrolled
-        cursor.execute("""
-            SELECT 1 FROM enroll WHERE course_id = %s AND student_id = %s
-        """, (course_id, student_id))
+        execute_prepared(cursor, "enrollment_exists", (course_id, student_id))
         if not cursor.fetchone():
             return jsonify({"success": False, "message": "Student is not enrolled in this course"}), 403
 
@@ -302,24 +281,10 @@ def get_content_detail(course_id, sec_id, content_id):
     cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
     
     try:
-        # Check if course is accepted
-        cursor.execute("SELECT status FROM course WHERE course_id = %s", (course_id,))
-        course = cursor.fetchone()
-        if not course:
-            return jsonify({"success": False, "message": "Course not found"}), 404
-        if course["status"] != "accepted":
-            return jsonify({"success": False, "message": "Course is not accepted"}), 403
-
-        # Check if section exists
-        cursor.execute("SELECT 1 FROM section WHERE course_id = %s AND sec_id = %s", (course_id, sec_id))
-        if not cursor.fetchone():
-            return jsonify({"success": False, "message": "Section not found"}), 404
-
-        # Check if content exists
-        cursor.execute("SELECT 1 FROM content WHERE course_id = %s AND sec_id = %s AND content_id = %s",
-                       (course_id, sec_id, content_id))
-        if not cursor.fetchone():
-            return jsonify({"success": False, "message": "Content not found"}), 404
+        # Check course, section and content in one query
+        ctx, error = check_course_access(cursor, course_id, sec_id, content_id)
+        if error:
+            return error
 
         # Retrieve content details
         cursor.execute("""
@@ -327,7 +292,7 @@ def get_content_detail(course_id, sec_id, content_id):
                    d.body AS document_path,
                    vm.body AS video_path, vm.duration,
                    t.task_type, t.percentage, t.max_time, t.passing_grade,
-                   a.question_count,
+                   a.question_count, a.question_version,
                    asgn.start_date, asgn.end_date, asgn.upload_material, asgn.body AS assignment_path
             FROM content c
             LEFT JOIN document d ON (c.course_id, c.sec_id, c.content_id) = (d.course_id, d.sec_id, d.content_id)
@@ -344,6 +309,7 @@ def get_content_detail(course_id, sec_id, content_id):
 
         # Convert to dict
         content_info = dict(content)
+        question_version = content_info.pop("question_version")
 
         # Replace file paths with URLs (assuming files are served statically from /uploads/)
         if content_info.get("document_path"):
@@ -355,16 +321,14 @@ def get_content_detail(course_id, sec_id, content_id):
         if content_info.get("assignment_path"):
             content_info["assignment_file_url"] = f"/api/content/download/{os.path.basename(content_info['assignment_path'])}"
 
-        # If assessment, retrieve questions too
+        # If assessment, add its questions from the cached definition (the
+        # version read above tells whether the cached copy is current)
         if content_info.get("task_type") == "assessment":
-            cursor.execute("""
-                SELECT question_id, question_body, max_time
-                FROM question
-                WHERE course_id = %s AND sec_id = %s AND content_id = %s
-                ORDER BY question_id
-            """, (course_id, sec_id, content_id))
-            questions = cursor.fetchall()
-            content_info["questions"] = [dict(q) for q in questions]
+            assessment = get_assessment(cursor, course_id, sec_id, content_id, question_version)
+            content_info["questions"] = [
+                {"question_id": q["question_id"], "question_body": q["question_body"], "max_time": q["max_time"]}
+                for q in (assessment.questions if assessment else [])
+            ]
 
         return jsonify({"success": True, "content": content_info}), 200
 
@@ -424,41 +388,22 @@ def create_assessment_questions(course_id, sec_id, content_id):
         if not data or 'questions' not in data:
             return jsonify({"success": False, "message": "Questions data is required"}), 400
         
-        questions = data['questions']
-        
-        # Delete existing questions for this assessment (if any)
-        cursor.execute("""
-            DELETE FROM question 
-            WHERE course_id = %s AND sec_id = %s AND content_id = %s
-        """, (course_id, sec_id, content_id))
-        
-        # Insert new questions
-        for question in questions:
-            cursor.execute("""
-                INSERT INTO question (course_id, sec_id, content_id, question_id, question_body, max_time)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (
-                course_id,
-                sec_id, 
-                content_id,
-                question['question_id'],
-                question['question_body'],
-                question.get('max_time', 300)  # Default 5 minutes
-            ))
-        
-        # Update the question count in the assessment table
-        cursor.execute("""
-            UPDATE assessment 
-            SET question_count = %s 
-            WHERE course_id = %s AND sec_id = %s AND content_id = %s
-        """, (len(questions), course_id, sec_id, content_id))
-        
+        questions, error = normalize_questions(data['questions'])
+        if error:
+            return jsonify({"success": False, "message": error}), 400
+
+        # The list is the whole question set: insert, update or delete only what
+        # differs from the stored questions, in one statement
+        changes = sync_questions(cursor, course_id, sec_id, content_id, questions, replace=True)
+
         conn.commit()
-        
+        invalidate_assessment(course_id, sec_id, content_id)
+
         return jsonify({
-            "success": True, 
-            "message": f"Successfully created {len(questions)} questions",
-            "question_count": len(questions)
+            "success": True,
+            "message": f"Successfully saved {len(questions)} questions",
+            "question_count": changes["question_count"],
+            "changes": changes
         }), 201
         
     except Exception as e:
@@ -479,7 +424,7 @@ def get_completion_status(course_id, student_id):
     
     try:
         # Check if course exists and is accepted
-        cursor.execute("SELECT status FROM course WHERE course_id = %s", (course_id,))
+        execute_prepared(cursor, "course_status", (course_id,))
         course = cursor.fetchone()
         if not course:
             return jsonify({"success": False, "message": "Course not found"}), 404
@@ -487,14 +432,12 @@ def get_completion_status(course_id, student_id):
             return jsonify({"success": False, "message": "Course is not accepted"}), 403
 
         # Check if student exists
-        cursor.execute("SELECT 1 FROM student WHERE id = %s", (student_id,))
+        execute_prepared(cursor, "student_exists", (student_id,))
         if not cursor.fetchone():
             return jsonify({"success": False, "message": "Student not found"}), 404
 
         # Check if student is enrolled
-        cursor.execute("""
-            SELECT 1 FROM enroll WHERE course_id = %s AND student_id = %s
-        """, (course_id, student_id))
+        execute_prepared(cursor, "enrollment_exists", (course_id, student_id))
         if not cursor.fetchone():
             return jsonify({"success": False, "message": "Student is not enrolled in this course"}), 403
 
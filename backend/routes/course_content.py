@@ -1,5 +1,7 @@
 from flask import Blueprint, request, jsonify, session
 from db import connect_project_db
+from prepared import execute_prepared
+from course_page_cache import cached_course_page, course_stamp
 
 course_content_bp = Blueprint("course_content_bp", __name__)
 
@@ -56,7 +58,7 @@ def get_student_grades(course_id, student_id):
         cursor = conn.cursor()
 
         # Check if student exists
-        cursor.execute("SELECT 1 FROM student WHERE id = %s", (student_id,))
+        execute_prepared(cursor, "student_exists", (student_id,))
         if not cursor.fetchone():
             return jsonify({"success": False, "message": "Student not found"}), 404
 
@@ -118,32 +120,16 @@ def get_course_sections(course_id):
         # Get the current user from session
         current_user_id = session.get('user_id')
         
-        # Check if course exists and get status and creator
-        cursor.execute("""
-            SELECT status, creator_id FROM course WHERE course_id = %s
-        """, (course_id,))
-        
-        course_info = cursor.fetchone()
-        if not course_info:
+        # Check if course exists and get status, creator and version stamp
+        stamp = course_stamp(cursor, course_id)
+        if not stamp:
             return jsonify({"success": False, "message": "Course not found"}), 404
-            
-        status, creator_id = course_info
         
         # Allow access if the course is accepted OR if the current user is the creator
-        if status != "accepted" and (not current_user_id or str(current_user_id) != str(creator_id)):
+        if stamp.status != "accepted" and (not current_user_id or str(current_user_id) != str(stamp.creator_id)):
             return jsonify({"success": False, "message": "Course not accessible"}), 403
 
-        # Retrieve section list
-        cursor.execute("""
-            SELECT sec_id, title AS section_title, order_number
-            FROM section
-            WHERE course_id = %s
-            ORDER BY order_number
-        """, (course_id,))
-        rows = cursor.fetchall()
-
-        keys = [desc[0] for desc in cursor.description]
-        return jsonify([dict(zip(keys, row)) for row in rows])
+        return cached_course_page("sections", (course_id,), stamp, lambda: _course_sections(cursor, course_id))
 
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
@@ -154,6 +140,21 @@ def get_course_sections(course_id):
         if conn:
             conn.close()
 
+
+def _course_sections(cursor, course_id):
+    # Retrieve section list
+    cursor.execute("""
+        SELECT sec_id, title AS section_title, order_number
+        FROM section
+        WHERE course_id = %s
+        ORDER BY order_number
+    """, (course_id,))
+    rows = cursor.fetchall()
+
+    keys = [desc[0] for desc in cursor.description]
+    return [dict(zip(keys, row)) for row in rows], 200
+
+
 # Content list in a section
 @course_content_bp.route("/api/course-content/course/<course_id>/section/<section_id>/contents", methods=["GET"])
 def get_section_contents(course_id, section_id):
@@ -214,9 +215,7 @@ def get_section_incomplete_summary(course_id, section_id, student_id):
         cursor = conn.cursor()
 
         # Check if course exists and is accepted
-        cursor.execute("""
-            SELECT status FROM course WHERE course_id = %s
-        """, (course_id,))
+        execute_prepared(cursor, "course_status", (course_id,))
         course = cursor.fetchone()
         if not course:
             return jsonify({"success": False, "message": "Course not found"}), 404
@@ -232,7 +231,7 @@ def get_section_incomplete_summary(course_id, section_id, student_id):
             return jsonify({"success": False, "message": "Section not found"}), 404
         
         # Check if student exists
-        cursor.execute("SELECT 1 FROM student WHERE id = %s", (student_id,))
+        execute_prepared(cursor, "student_exists", (student_id,))
         if cursor.fetchone() is None:
             return jsonify({"success": False, "message": "Student not found"}), 404
         
@@ -282,16 +281,14 @@ def get_course_completion_summary(course_id, student_id):
         cursor = conn.cursor()
 
         # Check course and enrollment
-        cursor.execute("SELECT status FROM course WHERE course_id = %s", (course_id,))
+        execute_prepared(cursor, "course_status", (course_id,))
         course = cursor.fetchone()
         if not course:
             return jsonify({"success": False, "message": "Course not found"}), 404
         if course[0] != "accepted":
             return jsonify({"success": False, "message": "Course is not accepted"}), 403
 
-        cursor.execute("""
-            SELECT 1 FROM enroll WHERE course_id = %s AND student_id = %s
-        """, (course_id, student_id))
+        execute_prepared(cursor, "enrollment_exists", (course_id, student_id))
         if not cursor.fetchone():
             return jsonify({"success": False, "message": "Student is not enrolled"}), 403
 
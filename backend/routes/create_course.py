@@ -1,5 +1,8 @@
 from flask import Blueprint, request, jsonify, session
 from db import connect_project_db
+from assessment_cache import invalidate_assessment
+from question_bank import normalize_questions, sync_questions
+from course_page_cache import cached_course_page, course_stamp, invalidate_course_pages
 import psycopg2.extras
 import uuid
 import datetime
@@ -219,6 +222,7 @@ def add_section(course_id):
         )
 
         conn.commit()
+        invalidate_course_pages(course_id)
         return jsonify({"success": True, "section_id": sec_id, "course_id": course_id}), 201
 
     except Exception as e:
@@ -393,6 +397,7 @@ def add_content(course_id, sec_id):
         )
 
         conn.commit()
+        invalidate_course_pages(course_id)
         return jsonify({
             "success": True, 
             "course_id": course_id,
@@ -411,57 +416,45 @@ def add_content(course_id, sec_id):
 
 @course_bp.route("/api/add/course/<course_id>/section/<sec_id>/content/<content_id>/question", methods=["POST"])
 def add_question(course_id, sec_id, content_id):
-    data = request.json
-    question_type = data.get("question_type")  # "multiple_choice" or "open_ended"
-    question_id = f"Q{uuid.uuid4().hex[:6].upper()}"
+    # One question as the body, or {"questions": [...]} to add a whole batch
+    data = request.json or {}
+    batch = "questions" in data
+    questions = data["questions"] if batch else [data]
 
+    if not isinstance(questions, list) or not all(isinstance(q, dict) for q in questions):
+        return jsonify({"success": False, "message": "questions must be a list of objects"}), 400
     required_fields = ["question_body", "max_time", "question_type"]
-    if not all(field in data for field in required_fields):
+    if not all(field in question for question in questions for field in required_fields):
         return jsonify({"success": False, "message": "Missing required fields"}), 400
 
+    questions, error = normalize_questions(questions, require_ids=False)
+    if error:
+        return jsonify({"success": False, "message": error}), 400
+    for question in questions:
+        if question["question_id"] is None:
+            question["question_id"] = f"Q{uuid.uuid4().hex[:6].upper()}"
+
     conn = connect_project_db()
     cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
 
     try:
-        # Insert into `question`
-        cursor.execute("""
-            INSERT INTO question (
-                course_id, sec_id, content_id, question_id, question_body, max_time
-            ) VALUES (%s, %s, %s, %s, %s, %s)
-        """, (
-            course_id, sec_id, content_id, question_id,
-            data["question_body"], int(data["max_time"])
-        ))
-
-        if question_type == "multiple_choice":
-            if "correct_answer" not in data:
-                raise Exception("Missing correct_answer for multiple choice")
-            cursor.execute("""
-                INSERT INTO multiple_choice (
-                    course_id, sec_id, content_id, question_id, correct_answer
-                ) VALUES (%s, %s, %s, %s, %s)
-            """, (
-                course_id, sec_id, content_id, question_id, data["correct_answer"]
-            ))
-
-        elif question_type == "open_ended":
-            if "answer" not in data:
-                raise Exception("Missing answer for open-ended question")
-            cursor.execute("""
-                INSERT INTO open_ended (
-                    course_id, sec_id, content_id, question_id, answer
-                ) VALUES (%s, %s, %s, %s, %s)
-            """, (
-                course_id, sec_id, content_id, question_id, data["answer"]
-            ))
-        else:
-            raise Exception("Invalid question_type")
+        # Questions and their multiple_choice / open_ended rows in one statement;
+        # the rest of the assessment's questions are kept
+        changes = sync_questions(cursor, course_id, sec_id, content_id, questions, replace=False)
 
         conn.commit()
+        invalidate_assessment(course_id, sec_id, content_id)
+        if batch:
+            return jsonify({
+                "success": True,
+                "question_ids": [q["question_id"] for q in questions],
+                "question_count": changes["question_count"],
+                "changes": changes
+            }), 201
         return jsonify({
             "success": True,
-            "question_id": question_id,
-            "question_type": question_type
+            "question_id": questions[0]["question_id"],
+            "question_type": questions[0]["question_type"]
         }), 201
 
     except Exception as e:
@@ -533,59 +526,14 @@ def get_section_content(course_id, sec_id):
     cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
 
     try:
-        cursor.execute(
-            'SELECT * FROM "section" WHERE course_id = %s AND sec_id = %s', 
-            (course_id, sec_id)
-        )
-        section = cursor.fetchone()
-        
-        if not section:
+        # Served from the response cache while the course's version stamp is unchanged
+        stamp = course_stamp(cursor, course_id)
+        if not stamp:
             return jsonify({"success": False, "message": "Section not found"}), 404
-        
-        cursor.execute(
-            'SELECT * FROM "content" WHERE course_id = %s AND sec_id = %s ORDER BY allocated_time', 
-            (course_id, sec_id)
+
+        return cached_course_page(
+            "section_content", (course_id, sec_id), stamp, lambda: _section_content(cursor, course_id, sec_id)
         )
-        content = cursor.fetchall()
-        
-        # Convert DictRow objects to regular dicts
-        content_list = [dict(item) for item in content]
-        
-        # Get additional information based on content type
-        for item in content_list:
-            content_type = item['content_type']
-            content_id = item['content_id']
-            
-            if content_type == 'task':
-                cursor.execute(
-                    'SELECT * FROM "task" WHERE course_id = %s AND sec_id = %s AND content_id = %s',
-                    (course_id, sec_id, content_id)
-                )
-                task_info = cursor.fetchone()
-                if task_info:
-                    item['task_info'] = dict(task_info)
-                    
-                    # Get assessment or assignment specific info
-                    task_type = task_info['task_type']
-                    if task_type == 'assessment':
-                        cursor.execute(
-                            'SELECT * FROM "assessment" WHERE course_id = %s AND sec_id = %s AND content_id = %s',
-                            (course_id, sec_id, content_id)
-                        )
-                        assessment_info = cursor.fetchone()
-                        if assessment_info:
-                            item['assessment_info'] = dict(assessment_info)
-                    
-                    elif task_type == 'assignment':
-                        cursor.execute(
-                            'SELECT * FROM "assignment" WHERE course_id = %s AND sec_id = %s AND content_id = %s',
-                            (course_id, sec_id, content_id)
-                        )
-                        assignment_info = cursor.fetchone()
-                        if assignment_info:
-                            item['assignment_info'] = dict(assignment_info)
-        
-        return jsonify({"success": True, "content": content_list}), 200
     
     except Exception as e:
         print(f"[ERROR] {str(e)}")
@@ -595,6 +543,63 @@ def get_section_content(course_id, sec_id):
         cursor.close()
         conn.close()
 
+
+def _section_content(cursor, course_id, sec_id):
+    cursor.execute(
+        'SELECT * FROM "section" WHERE course_id = %s AND sec_id = %s', 
+        (course_id, sec_id)
+    )
+    section = cursor.fetchone()
+
+    if not section:
+        return {"success": False, "message": "Section not found"}, 404
+
+    cursor.execute(
+        'SELECT * FROM "content" WHERE course_id = %s AND sec_id = %s ORDER BY allocated_time', 
+        (course_id, sec_id)
+    )
+    content = cursor.fetchall()
+
+    # Convert DictRow objects to regular dicts
+    content_list = [dict(item) for item in content]
+
+    # Get additional information based on content type
+    for item in content_list:
+        content_type = item['content_type']
+        content_id = item['content_id']
+
+        if content_type == 'task':
+            cursor.execute(
+                'SELECT * FROM "task" WHERE course_id = %s AND sec_id = %s AND content_id = %s',
+                (course_id, sec_id, content_id)
+            )
+            task_info = cursor.fetchone()
+            if task_info:
+                item['task_info'] = dict(task_info)
+
+                # Get assessment or assignment specific info
+                task_type = task_info['task_type']
+                if task_type == 'assessment':
+                    cursor.execute(
+                        'SELECT * FROM "assessment" WHERE course_id = %s AND sec_id = %s AND content_id = %s',
+                        (course_id, sec_id, content_id)
+                    )
+                    assessment_info = cursor.fetchone()
+                    if assessment_info:
+                        item['assessment_info'] = dict(assessment_info)
+
+                elif task_type == 'assignment':
+                    cursor.execute(
+                        'SELECT * FROM "assignment" WHERE course_id = %s AND sec_id = %s AND content_id = %s',
+                        (course_id, sec_id, content_id)
+                    )
+                    assignment_info = cursor.fetchone()
+                    if assignment_info:
+                        item['assignment_info'] = dict(assignment_info)
+
+    return {"success": True, "content": content_list}, 200
+
+
 @course_bp.route("/api/instructor/<instructor_id>/courses", methods=["GET"])
 def get_instructor_courses(instructor_id):
     conn = connect_project_db()
@@ -1,5 +1,7 @@
 from flask import Blueprint, request, jsonify
 from db import connect_project_db
+from prepared import execute_prepared
+from routes.guards import check_course_access
 import psycopg2.extras
 
 feedback_bp = Blueprint("feedback", __name__)
@@ -23,38 +25,13 @@ def give_feedback(course_id, student_id):
     cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
     try:
 
-        # Check if course exists and is accepted
-        cursor.execute("""
-            SELECT status FROM course WHERE course_id = %s
-        """, (course_id,))
-        course = cursor.fetchone()
-        if not course:
-            return jsonify({"success": False, "message": "Course not found"}), 404
-        if course[0] != "accepted":
-            return jsonify({"success": False, "message": "Course is not accepted"}), 403
-        
-        # Check if student exists
-        cursor.execute("SELECT 1 FROM student WHERE id = %s", (student_id,))
-        if cursor.fetchone() is None:
-            return jsonify({"success": False, "message": "Student not found"}), 404
+        # Check course, student and enrollment in one query
+        ctx, error = check_course_access(cursor, course_id, student_id=student_id, require_student=True)
+        if error:
+            return error
 
-        # Check if user is enrolled
-        cursor.execute("""
-            SELECT 1 FROM enroll WHERE course_id = %s AND student_id = %s
-        """, (course_id, student_id))
-        if cursor.fetchone() is None:
-            return jsonify({"success": False, "message": "User is not enrolled in the course"}), 403
-        
         # Check if progress_rate is 100
-        cursor.execute("""
-            SELECT progress_rate FROM enroll
-            WHERE course_id = %s AND student_id = %s
-        """, (course_id, student_id))
-        result = cursor.fetchone()
-
-        if not result:
-            return jsonify({"success": False, "message": "Enrollment not found"}), 404
-        if result["progress_rate"] < 100:
+        if ctx["progress_rate"] is None or ctx["progress_rate"] < 100:
             return jsonify({"success": False, "message": "You must complete the course (100%) to give feedback"}), 403
 
         # Check if feedback already exists
@@ -88,9 +65,7 @@ def get_course_feedback(course_id):
         cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
 
         # Check if course exists and is accepted
-        cursor.execute("""
-            SELECT status FROM course WHERE course_id = %s
-        """, (course_id,))
+        execute_prepared(cursor, "course_status", (course_id,))
         course = cursor.fetchone()
         if not course:
             return jsonify({"success": False, "message": "Course not found"}), 404
@@ -122,28 +97,20 @@ def get_course_feedback_summary(course_id):
         conn = connect_project_db()
         cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
 
-        # Check if course exists and is accepted
-        cursor.execute("""
-            SELECT status FROM course WHERE course_id = %s
-        """, (course_id,))
+        # Status and running rating totals of the course in one lookup
+        execute_prepared(cursor, "course_rating_summary", (course_id,))
         course = cursor.fetchone()
         if not course:
             return jsonify({"success": False, "message": "Course not found"}), 404
-        if course[0] != "accepted":
+        if course["status"] != "accepted":
             return jsonify({"success": False, "message": "Course is not accepted"}), 403
 
-        cursor.execute("""
-            SELECT 
-                course_id, 
-                ROUND(AVG(rating), 2) AS avg_rating, 
-                COUNT(*) AS total_reviews
-            FROM feedback
-            WHERE course_id = %s
-            GROUP BY course_id
-        """, (course_id,))
-        result = cursor.fetchone()
-        if result:
-            return jsonify(dict(result))
+        if course["total_reviews"]:
+            return jsonify({
+                "course_id": course["course_id"],
+                "avg_rating": course["avg_rating"],
+                "total_reviews": course["total_reviews"],
+            })
         else:
             return jsonify({"course_id": course_id, "avg_rating": 0.0, "total_reviews": 0})
 
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from db import connect_project_db
+from prepared import execute_prepared
 import psycopg2.extras
 
 financial_aid_bp = Blueprint("financial_aid", __name__)
@@ -23,7 +24,7 @@ def apply_financial_aid(course_id, student_id):
             return jsonify({"success": False, "message": "Course not found!"}), 404
         
         # Check if student exists
-        cursor.execute("SELECT 1 FROM student WHERE id = %s", (student_id,))
+        execute_prepared(cursor, "student_exists", (student_id,))
         if cursor.fetchone() is None:
             return jsonify({"success": False, "message": "Student not found!"}), 404
 
@@ -84,7 +85,7 @@ def evaluate_financial_aid(course_id, student_id, instructor_id):
             return jsonify({"success": False, "message": "Course not found!"}), 404
         
         # Check if student exists
-        cursor.execute("SELECT 1 FROM student WHERE id = %s", (student_id,))
+        execute_prepared(cursor, "student_exists", (student_id,))
         if cursor.fetchone() is None:
             return jsonify({"success": False, "message": "Student not found!"}), 404
         
@@ -230,7 +231,7 @@ def get_student_financial_aid_applications(student_id):
     cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
     try:
         # Check if student exists
-        cursor.execute("SELECT 1 FROM student WHERE id = %s", (student_id,))
+        execute_prepared(cursor, "student_exists", (student_id,))
         if cursor.fetchone() is None:
             return jsonify({"success": False, "message": "Student not found!"}), 404
 
@@ -6,6 +6,10 @@ Available endpoints:
 * **GET /api/report/student/ranged**    - student metrics between selected months
 * **GET /api/report/course/general**     - site - wide course metrics
 * **GET /api/report/instructor/general** - site - wide instructor metrics
+* **GET /api/report/jobs/<job_id>**      - status of a background report job
+
+Any report endpoint above accepts ``async=true``: the report is then queued
+as a background job and the response (202) only carries the job id.
 
 Install with:
 python
@@ -14,7 +18,7 @@ app.register_blueprint(report_bp)
 
 """
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from .helpers import (
     new_report_id,
     first_day,
@@ -27,6 +31,8 @@ import datetime as dt
 
 
 from db import connect_project_db
+from report_cache import register_cached_view, read_cached, refresh_report_cache
+from report_jobs import enqueue_report_job, get_report_job, report_progress
 
 report_bp = Blueprint("report", __name__)
 
@@ -64,75 +70,34 @@ def _json_dumps(o):
 
 
 # ────────────────────────────────────────────────────────────────────────────────
-# SQL: Student general metrics
-# ────────────────────────────────────────────────────────────────────────────────
-STUDENT_GENERAL_SQL = """
-WITH base AS (
-    SELECT s.id,
-           DATE_PART('year', AGE(CURRENT_DATE, u.birth_date)) AS age,
-           s.major,
-           s.account_status,
-           s.certificate_count
-    FROM student s
-    JOIN "user" u ON u.id = s.id
-),
-enrolls AS (
-    SELECT student_id,
-           COUNT(*) AS enroll_cnt,
-           AVG(progress_rate) AS avg_progress
-    FROM enroll
-    GROUP BY student_id
-),
-majors AS (
-    SELECT major,
-           COUNT(*) AS cnt,
-           ROW_NUMBER() OVER(ORDER BY COUNT(*) DESC, major) AS rn
-    FROM student s
-    GROUP BY major
-)
-SELECT
-  (SELECT COUNT(*) FROM base)                                       AS total_students,
-  (SELECT COUNT(*) FROM base WHERE account_status = 'active')       AS active_student_count,
-  ROUND((SELECT AVG(enroll_cnt) FROM enrolls)::numeric,2)          AS avg_enroll_per_student,
-  ROUND((SELECT AVG(certificate_count) FROM base)::numeric,2)      AS avg_cert_per_student,
-  ROUND((SELECT AVG(avg_progress) FROM enrolls)::numeric,2)        AS avg_completion_rate,
-  (SELECT major FROM majors WHERE rn = 1)                          AS most_common_major,
-  (SELECT cnt FROM majors WHERE rn = 1)                            AS most_common_major_count,
-  ROUND((SELECT AVG(age) FROM base)::numeric,2)                    AS avg_age,
-  (SELECT MIN(age) FROM base)                                      AS youngest_age,
-  (SELECT MAX(age) FROM base)                                      AS oldest_age
-;"""
-
-STUDENT_MONTHLY_SQL = """
-SELECT TO_CHAR(date_trunc('month', u.registration_date),'YYYY-MM') AS month,
-       COUNT(*) AS registration_count
-FROM "user" u
-JOIN student s ON s.id = u.id
-GROUP BY month
-ORDER BY month;
-"""
-# ────────────────────────────────────────────────────────────────────────────────
-# SQL: Top-3 students overall (with name & major) students who have at least completed one course
+# SQL: Top-3 students for a given registration date range (with name & major)
 # ────────────────────────────────────────────────────────────────────────────────
-STUDENT_TOP_SQL = """
+STUDENT_RANGE_TOP_SQL = """
 WITH stats AS (
-    SELECT s.id,
-           s.certificate_count,
-           COUNT(e.course_id) AS enroll_cnt,
-           AVG(e.progress_rate) AS avg_progress
+    SELECT
+      s.id,
+      s.certificate_count,
+      COUNT(e.course_id)   AS enroll_cnt,
+      AVG(e.progress_rate) AS avg_progress
     FROM student s
+    JOIN "user" u ON u.id = s.id
     LEFT JOIN enroll e ON e.student_id = s.id
-    WHERE s.id IN (SELECT student_id FROM enroll WHERE progress_rate = 100) 
+    WHERE u.registration_date
+      BETWEEN %s
+      AND (%s + INTERVAL '1 month' - INTERVAL '1 day')
     GROUP BY s.id, s.certificate_count
 ),
 scores AS (
-    SELECT id,
-           ROUND(certificate_count*2 + enroll_cnt*0.5 + COALESCE(avg_progress,0)*0.1,2) AS achievement_score
+    SELECT
+      id,
+      ROUND(certificate_count*2 + enroll_cnt*0.5 + COALESCE(avg_progress,0)*0.1,2)
+        AS achievement_score
     FROM (
-      SELECT id,
-             certificate_count,
-             enroll_cnt,
-             COALESCE(ROUND(avg_progress::numeric,2),0) AS avg_progress
+      SELECT
+        id,
+        certificate_count,
+        enroll_cnt,
+        COALESCE(ROUND(avg_progress::numeric,2),0) AS avg_progress
       FROM stats
     ) t
 )
@@ -148,170 +113,138 @@ ORDER BY sc.achievement_score DESC
 LIMIT 3;
 """
 
+
 # ────────────────────────────────────────────────────────────────────────────────
-# SQL: Student ranged metrics (+ monthly major & age stats)
+# SQL: Student ranged metrics (+ major, age & top-3 stats), one row per month
+# in %(months)s. All requested months are computed in a single pass.
 # ────────────────────────────────────────────────────────────────────────────────
-STUDENT_RANGE_SQL = """
+STUDENT_MONTHS_SQL = """
 WITH months AS (
-  SELECT generate_series(
-    date_trunc('month', %s::date),
-    date_trunc('month', %s::date),
-    '1 month'
-  ) AS m
+  SELECT m::date AS m,
+         (m + INTERVAL '1 month' - INTERVAL '1 day')::date AS m_end
+  FROM unnest(%(months)s::date[]) AS m
 ),
 
 stats AS (
-  SELECT
-    date_trunc('month', u.registration_date) AS m,
-    COUNT(*) AS registration_count
-  FROM "user" u
+  SELECT months.m, COUNT(*) AS registration_count
+  FROM months
+  JOIN "user" u ON u.registration_date BETWEEN months.m AND months.m_end
   JOIN student s ON s.id = u.id
-  WHERE u.registration_date BETWEEN %s
-        AND (%s + INTERVAL '1 month' - INTERVAL '1 day')
-  GROUP BY m
+  GROUP BY months.m
 ),
 
 active_stats AS (
-  SELECT
-    m.m AS m,
-    COUNT(*) AS active_students
-  FROM months m
-  CROSS JOIN student s
-  WHERE s.account_status = 'active'
-  GROUP BY m.m
+  SELECT COUNT(*) AS active_students
+  FROM student
+  WHERE account_status = 'active'
 ),
 
 cumulative AS (
-  SELECT
-    months.m AS m,
-    (SELECT COUNT(*) FROM "user" ux JOIN student sx ON sx.id = ux.id
-     WHERE ux.registration_date <= months.m + INTERVAL '1 month' - INTERVAL '1 day')
-      AS total_students
+  SELECT months.m, COUNT(u.id) AS total_students
   FROM months
+  LEFT JOIN ("user" u JOIN student s ON s.id = u.id)
+         ON u.registration_date <= months.m_end
+  GROUP BY months.m
+),
+
+enroll_months AS (
+  SELECT
+    student_id,
+    date_trunc('month', enroll_date)::date AS m,
+    COUNT(*) AS enroll_cnt,
+    AVG(progress_rate) AS avg_progress
+  FROM enroll
+  WHERE enroll_date BETWEEN (SELECT MIN(m) FROM months)
+                        AND (SELECT MAX(m_end) FROM months)
+  GROUP BY student_id, 2
 ),
 
 enrolls AS (
   SELECT
-    sub.m,
-    ROUND(AVG(sub.enroll_cnt)::numeric, 2) AS avg_enroll_per_student,
+    months.m,
+    ROUND(AVG(em.enroll_cnt)::numeric, 2) AS avg_enroll_per_student,
     ROUND(AVG(s.certificate_count)::numeric, 2) AS avg_cert_per_student,
-    ROUND(AVG(sub.avg_progress)::numeric, 2) AS avg_completion_rate
-  FROM student s
-  JOIN "user" u ON u.id = s.id
-  LEFT JOIN (
-    SELECT
-      student_id,
-      date_trunc('month', enroll_date) AS m,
-      COUNT(*) AS enroll_cnt,
-      AVG(progress_rate) AS avg_progress
-    FROM enroll
-    WHERE enroll_date BETWEEN %s
-          AND (%s + INTERVAL '1 month' - INTERVAL '1 day')
-    GROUP BY student_id, m
-  ) sub ON sub.student_id = s.id
-  WHERE u.registration_date BETWEEN %s
-        AND (%s + INTERVAL '1 month' - INTERVAL '1 day')
-  GROUP BY sub.m
+    ROUND(AVG(em.avg_progress)::numeric, 2) AS avg_completion_rate
+  FROM months
+  JOIN "user" u ON u.registration_date BETWEEN months.m AND months.m_end
+  JOIN student s ON s.id = u.id
+  JOIN enroll_months em ON em.student_id = s.id AND em.m = months.m
+  GROUP BY months.m
 ),
 
 major_stats AS (
-  SELECT
-    m.m AS m,
-    s.major,
-    COUNT(*) AS major_count,
-    ROW_NUMBER() OVER (
-      PARTITION BY m.m
-      ORDER BY COUNT(*) DESC, s.major
-    ) AS rn
-  FROM months m
-  CROSS JOIN student s
-  GROUP BY m.m, s.major
-  HAVING COUNT(*) >= 1
+  SELECT major, COUNT(*) AS major_count
+  FROM student
+  GROUP BY major
+  ORDER BY COUNT(*) DESC, major
+  LIMIT 1
 ),
 
 age_stats AS (
   SELECT
-    date_trunc('month', u.registration_date) AS m,
+    months.m,
     ROUND(AVG(DATE_PART('year', AGE(CURRENT_DATE, u.birth_date)))::numeric,2)
       AS avg_age,
     MIN(DATE_PART('year', AGE(CURRENT_DATE, u.birth_date))) AS youngest_age,
     MAX(DATE_PART('year', AGE(CURRENT_DATE, u.birth_date))) AS oldest_age
-  FROM "user" u
-  WHERE u.registration_date BETWEEN %s
-        AND (%s + INTERVAL '1 month' - INTERVAL '1 day')
-  GROUP BY m
+  FROM months
+  JOIN "user" u ON u.registration_date BETWEEN months.m AND months.m_end
+  GROUP BY months.m
 ),
 
-out AS (
+scores AS (
   SELECT
-    TO_CHAR(months.m, 'YYYY-MM')                     AS month,
-    COALESCE(stats.registration_count, 0)             AS registration_count,
-    COALESCE(cumulative.total_students, 0)            AS total_students,
-    COALESCE(active_stats.active_students, 0)         AS active_students,
-    COALESCE(enrolls.avg_enroll_per_student, 0)       AS avg_enroll_per_student,
-    COALESCE(enrolls.avg_cert_per_student, 0)         AS avg_cert_per_student,
-    COALESCE(enrolls.avg_completion_rate, 0)          AS avg_completion_rate,
-    COALESCE(ms.major, '')                            AS most_common_major,
-    COALESCE(ms.major_count, 0)                       AS most_common_major_count,
-    COALESCE(a.avg_age, 0)                            AS avg_age,
-    COALESCE(a.youngest_age, 0)                       AS youngest_age,
-    COALESCE(a.oldest_age, 0)                         AS oldest_age
+    months.m,
+    s.id,
+    ROUND(
+      s.certificate_count*2 + COUNT(e.course_id)*0.5
+        + COALESCE(ROUND(AVG(e.progress_rate)::numeric,2),0)*0.1, 2
+    ) AS achievement_score
   FROM months
-  LEFT JOIN stats       ON stats.m       = months.m
-  LEFT JOIN cumulative  ON cumulative.m  = months.m
-  LEFT JOIN enrolls     ON enrolls.m     = months.m
-  LEFT JOIN active_stats ON active_stats.m = months.m
-  LEFT JOIN major_stats ms ON ms.m = months.m AND ms.rn = 1
-  LEFT JOIN age_stats   a  ON a.m = months.m
-)
-
-SELECT * FROM out
-ORDER BY month;
-"""
-
-
-# ────────────────────────────────────────────────────────────────────────────────
-# SQL: Top-3 students for a given registration date range (with name & major)
-# ────────────────────────────────────────────────────────────────────────────────
-STUDENT_RANGE_TOP_SQL = """
-WITH stats AS (
-    SELECT
-      s.id,
-      s.certificate_count,
-      COUNT(e.course_id)   AS enroll_cnt,
-      AVG(e.progress_rate) AS avg_progress
-    FROM student s
-    JOIN "user" u ON u.id = s.id
-    LEFT JOIN enroll e ON e.student_id = s.id
-    WHERE u.registration_date
-      BETWEEN %s
-      AND (%s + INTERVAL '1 month' - INTERVAL '1 day')
-    GROUP BY s.id, s.certificate_count
+  JOIN "user" u ON u.registration_date BETWEEN months.m AND months.m_end
+  JOIN student s ON s.id = u.id
+  LEFT JOIN enroll e ON e.student_id = s.id
+  GROUP BY months.m, s.id, s.certificate_count
 ),
-scores AS (
-    SELECT
-      id,
-      ROUND(certificate_count*2 + enroll_cnt*0.5 + COALESCE(avg_progress,0)*0.1,2)
-        AS achievement_score
-    FROM (
-      SELECT
-        id,
-        certificate_count,
-        enroll_cnt,
-        COALESCE(ROUND(avg_progress::numeric,2),0) AS avg_progress
-      FROM stats
-    ) t
+
+tops AS (
+  SELECT m,
+         MAX(id) FILTER (WHERE rn = 1) AS top1,
+         MAX(id) FILTER (WHERE rn = 2) AS top2,
+         MAX(id) FILTER (WHERE rn = 3) AS top3
+  FROM (
+    SELECT m, id,
+           ROW_NUMBER() OVER (PARTITION BY m ORDER BY achievement_score DESC) AS rn
+    FROM scores
+  ) ranked
+  WHERE rn <= 3
+  GROUP BY m
 )
+
 SELECT
-  sc.id,
-  u.first_name || ' ' || u.last_name AS full_name,
-  s.major,
-  sc.achievement_score
-FROM scores sc
-JOIN student s ON s.id = sc.id
-JOIN "user" u    ON u.id = sc.id
-ORDER BY sc.achievement_score DESC
-LIMIT 3;
+  months.m                                          AS month_start,
+  TO_CHAR(months.m, 'YYYY-MM')                      AS month,
+  COALESCE(stats.registration_count, 0)             AS registration_count,
+  COALESCE(cumulative.total_students, 0)            AS total_students,
+  COALESCE(active_stats.active_students, 0)         AS active_students,
+  COALESCE(enrolls.avg_enroll_per_student, 0)       AS avg_enroll_per_student,
+  COALESCE(enrolls.avg_cert_per_student, 0)         AS avg_cert_per_student,
+  COALESCE(enrolls.avg_completion_rate, 0)          AS avg_completion_rate,
+  COALESCE(ms.major, '')                            AS most_common_major,
+  COALESCE(ms.major_count, 0)                       AS most_common_major_count,
+  COALESCE(a.avg_age, 0)                            AS avg_age,
+  COALESCE(a.youngest_age, 0)                       AS youngest_age,
+  COALESCE(a.oldest_age, 0)                         AS oldest_age,
+  tops.top1, tops.top2, tops.top3
+FROM months
+CROSS JOIN active_stats
+LEFT JOIN major_stats ms ON TRUE
+LEFT JOIN stats       ON stats.m      = months.m
+LEFT JOIN cumulative  ON cumulative.m = months.m
+LEFT JOIN enrolls     ON enrolls.m    = months.m
+LEFT JOIN age_stats a ON a.m          = months.m
+LEFT JOIN tops        ON tops.m       = months.m
+ORDER BY months.m;
 """
 
 
@@ -400,166 +333,6 @@ LEFT JOIN (
 ORDER BY months.m;
 """
 
-COURSE_GENERAL_SQL = """
-WITH base AS (
-    SELECT course_id,
-           price,
-           COALESCE(enrollment_count,0) AS enrollment_count
-    FROM course
-),
-freepaid AS (
-    SELECT COUNT(*) FILTER(WHERE price=0) AS free_course_count,
-           COUNT(*) FILTER(WHERE price>0) AS paid_course_count
-    FROM base
-),
-popular AS (
-    SELECT c.course_id,
-           c.enrollment_count,
-           c.price,
-           c.creator_id
-    FROM course c
-    ORDER BY c.enrollment_count DESC
-    LIMIT 1
-),
-completed_raw AS (
-    SELECT b.course_id,
-           COALESCE(c.completion_count,0) AS completion_count,
-           b.enrollment_count,
-           CASE WHEN b.enrollment_count>0
-                THEN ROUND(COALESCE(c.completion_count,0)*100.0/b.enrollment_count,2)
-                ELSE 0 END AS completion_ratio,
-           b.price,
-           cr.creator_id
-    FROM base b
-    LEFT JOIN (
-      SELECT course_id, COUNT(*) AS completion_count
-      FROM enroll
-      WHERE progress_rate = 100
-      GROUP BY course_id
-    ) c USING(course_id)
-    JOIN course cr USING(course_id)
-    ORDER BY COALESCE(c.completion_count,0) DESC
-    LIMIT 1
-)
-SELECT
-  (SELECT COUNT(*) FROM base)                                        AS total_courses,
-
-  -- most popular
-  popular.course_id                                                 AS most_popular_course_id,
-  (SELECT title FROM course WHERE course_id = popular.course_id)    AS most_popular_course_title,
-  popular.enrollment_count                                          AS most_popular_enrollment_count,
-  popular.price                                                     AS most_popular_price,
-  popular.creator_id                                                AS most_popular_instructor_id,
-  (SELECT u.first_name || ' ' || u.last_name
-   FROM "user" u WHERE u.id = popular.creator_id)                   AS most_popular_instructor_name,
-
-  ROUND((SELECT AVG(enrollment_count)::numeric FROM base),2)        AS avg_enroll_per_course,
-  COALESCE((SELECT SUM(price*enrollment_count) FROM base),0)         AS total_revenue,
-  freepaid.free_course_count                                        AS free_course_count,
-  freepaid.paid_course_count                                        AS paid_course_count,
-
-  -- most completed
-  completed_raw.course_id                                           AS most_completed_course_id,
-  (SELECT title FROM course WHERE course_id = completed_raw.course_id) 
-                                                                    AS most_completed_course_title,
-  completed_raw.enrollment_count                                    AS most_completed_enrollment_count,
-  completed_raw.completion_ratio                                    AS most_completed_completion_ratio,
-  completed_raw.price                                               AS most_completed_price,
-  completed_raw.creator_id                                          AS most_completed_instructor_id,
-  (SELECT u.first_name || ' ' || u.last_name
-   FROM "user" u WHERE u.id = completed_raw.creator_id)            AS most_completed_instructor_name
-
-FROM popular
-CROSS JOIN freepaid
-CROSS JOIN completed_raw;
-"""
-
-
-CATEGORY_ENROLL_SQL = """
-SELECT category, SUM(COALESCE(enrollment_count,0)) AS total_enrollments
-FROM course GROUP BY category ORDER BY total_enrollments DESC;
-"""
-
-DIFFICULTY_STATS_SQL = """
-SELECT c.difficulty_level,
-       SUM(COALESCE(c.enrollment_count,0)) AS total_enrollments,
-       ROUND(COALESCE(AVG(e.progress_rate),0)::numeric,2) AS avg_completion_rate
-FROM course c LEFT JOIN enroll e ON e.course_id=c.course_id
-GROUP BY c.difficulty_level ORDER BY c.difficulty_level;
-"""
-
-MONTHLY_COURSES_SQL = """
-SELECT TO_CHAR(date_trunc('month', creation_date),'YYYY-MM') AS month,
-       COUNT(*) AS course_count
-FROM course WHERE creation_date>=CURRENT_DATE-INTERVAL '1 year'
-GROUP BY month ORDER BY month;
-"""
-
-STATUS_COUNTS_SQL = """
-SELECT status, COUNT(*) AS count FROM (
-  SELECT status FROM course WHERE creation_date>=CURRENT_DATE-INTERVAL '1 year'
-) sub GROUP BY status;
-"""
-
-TOTAL_INSTR_SQL = """
-SELECT COUNT(*) AS total_instructors FROM instructor;
-"""
-
-PAID_FREE_INSTR_SQL = """
-SELECT COUNT(DISTINCT c.creator_id) FILTER(WHERE c.price=0) AS instructors_with_free_course,
-       COUNT(DISTINCT c.creator_id) FILTER(WHERE c.price>0) AS instructors_with_paid_course
-FROM course c;
-"""
-
-AVG_COURSES_SQL = """
-SELECT ROUND(AVG(course_count)::numeric,2) AS avg_courses_per_instructor FROM instructor;
-"""
-
-MOST_POP_INSTR_SQL = """
-SELECT i.id,
-       u.first_name || ' ' || u.last_name AS full_name,
-       COALESCE(SUM(c.enrollment_count),0) AS total_enrollments
-FROM instructor i
-JOIN "user" u ON u.id=i.id
-LEFT JOIN course c ON c.creator_id=i.id
-GROUP BY i.id,u.first_name,u.last_name
-ORDER BY total_enrollments DESC LIMIT 1;
-"""
-
-MOST_ACTIVE_INSTR_SQL = """
-SELECT i.id,
-       u.first_name || ' ' || u.last_name AS full_name,
-       i.course_count AS total_courses
-FROM instructor i
-JOIN "user" u ON u.id=i.id
-ORDER BY i.course_count DESC LIMIT 1;
-"""
-
-INSTR_AGE_SQL = """
-SELECT ROUND(AVG(DATE_PART('year', AGE(CURRENT_DATE, u.birth_date)))::numeric,2) AS avg_age,
-       MIN(DATE_PART('year', AGE(CURRENT_DATE, u.birth_date))) AS youngest_age,
-       MAX(DATE_PART('year', AGE(CURRENT_DATE, u.birth_date))) AS oldest_age
-FROM instructor i
-JOIN "user" u ON u.id=i.id;
-"""
-
-INSTR_MONTHLY_SQL = """
-SELECT TO_CHAR(date_trunc('month', registration_date),'YYYY-MM') AS month,
-       COUNT(*) AS registrations
-FROM "user" u
-JOIN instructor i ON u.id=i.id
-WHERE registration_date>=CURRENT_DATE-INTERVAL '1 year'
-GROUP BY month ORDER BY month;
-"""
-
-TOP_INSTR_SQL = """
-SELECT i.id,
-       u.first_name || ' ' || u.last_name AS full_name,
-       i.i_rating AS rating
-FROM instructor i
-JOIN "user" u ON u.id=i.id
-ORDER BY i.i_rating DESC LIMIT 3;
-"""
 # ────────────────────────────────────────────────────────────────────────────────
 # SQL: Instructor ranged metrics (monthly + summary)
 # ────────────────────────────────────────────────────────────────────────────────
@@ -636,29 +409,6 @@ FROM months
 LEFT JOIN new_regs ON new_regs.m = months.m
 ORDER BY months.m;
 """
-INSTR_MONTHLY_SQL = """
-WITH stats AS (
-  SELECT
-    date_trunc('month', u.registration_date) AS m,
-    COUNT(*) AS registration_count
-  FROM "user" u
-  JOIN instructor i ON i.id = u.id
-  WHERE u.registration_date BETWEEN %s
-        AND (%s + INTERVAL '1 month' - INTERVAL '1 day')
-  GROUP BY m
-)
-SELECT
-  TO_CHAR(s.m, 'YYYY-MM') AS month,
-  s.registration_count,
-  (
-    SELECT COUNT(*)
-    FROM instructor ix
-    JOIN "user" ux ON ux.id = ix.id
-    WHERE ux.registration_date <= s.m + INTERVAL '1 month' - INTERVAL '1 day'
-  ) AS total_instructors
-FROM stats s
-ORDER BY s.m;
-"""
 
 INSTR_RANGE_SUMMARY_SQL = """
 SELECT
@@ -721,6 +471,162 @@ ORDER BY total_enrollments DESC
 LIMIT 1;
 """
 
+# ────────────────────────────────────────────────────────────────────────────────
+# Materialized snapshots for the general reports (see report_cache.py and
+# REPORT SNAPSHOTS in schema.sql, which holds their queries). The general
+# endpoints read these instead of re-running the full scans; pass
+# ?refresh=true to refresh them before reading.
+# ────────────────────────────────────────────────────────────────────────────────
+STUDENT_CACHED_VIEWS = [
+    "report_student_general",
+    "report_student_top",
+    "report_student_monthly",
+    "report_first_months",
+]
+COURSE_CACHED_VIEWS = [
+    "report_course_general",
+    "report_course_enroll_stats",
+    "report_category_enrollments",
+    "report_difficulty_stats",
+    "report_course_status_counts",
+    "report_course_monthly",
+    "report_first_months",
+]
+INSTRUCTOR_CACHED_VIEWS = [
+    "report_instructor_general",
+    "report_most_popular_instructor",
+    "report_most_active_instructor",
+    "report_instructor_monthly",
+    "report_top_instructors",
+    "report_first_months",
+]
+
+for _name in STUDENT_CACHED_VIEWS + COURSE_CACHED_VIEWS + INSTRUCTOR_CACHED_VIEWS:
+    register_cached_view(_name)
+
+
+def _first_month(cur, column):
+    """First month with data from the report_first_months snapshot, or this month."""
+    rows, _ = read_cached(cur, "report_first_months")
+    first = rows[0][column] if rows else None
+    return first.date() if first else dt.date.today().replace(day=1)
+
+
+def _wants_refresh():
+    return (request.args.get("refresh") or "").lower() == "true"
+
+
+# Report endpoints that may run as background jobs (?async=true)
+JOB_ENDPOINTS = {
+    "report.student_general_report",
+    "report.student_ranged_report",
+    "report.course_general_report",
+    "report.course_ranged_report",
+    "report.instructor_general_report",
+    "report.instructor_ranged_report",
+}
+
+
+@report_bp.before_request
+def _enqueue_if_async():
+    if (request.args.get("async") or "").lower() != "true":
+        return None
+    if request.endpoint not in JOB_ENDPOINTS:
+        return None
+
+    admin_id = (request.args.get("admin_id") or "").strip()
+    if not admin_id:
+        return jsonify({"success": False, "message": "missing admin_id"}), 400
+    if len(admin_id) > 8:
+        return jsonify({"success": False, "message": "admin_id too long"}), 400
+
+    params = {k: v for k, v in request.args.items() if k != "async"}
+    try:
+        job_id = enqueue_report_job(
+            current_app._get_current_object(),
+            request.endpoint,
+            request.path,
+            params,
+            admin_id,
+        )
+    except Exception as e:
+        print(f"[ERROR] could not queue report job: {e}", flush=True)
+        return jsonify({"success": False, "message": str(e)}), 500
+
+    return (
+        jsonify(
+            {
+                "success": True,
+                "job_id": job_id,
+                "status": "queued",
+                "status_url": f"/api/report/jobs/{job_id}",
+            }
+        ),
+        202,
+    )
+
+
+@report_bp.route("/api/report/jobs/<job_id>", methods=["GET"])
+def report_job_status(job_id: str):
+    conn = connect_project_db()
+    cur = conn.cursor(cursor_factory=psql.RealDictCursor)
+    try:
+        job = get_report_job(cur, job_id)
+        if job is None:
+            return jsonify({"success": False, "message": "job not found"}), 404
+        for key in ("created_at", "started_at", "finished_at"):
+            if job[key] is not None:
+                job[key] = job[key].isoformat()
+        return jsonify({"success": True, "job": job}), 200
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+    finally:
+        cur.close()
+        conn.close()
+
+
+def _upsert_month_reports(cur, report_type, prefix, label, parent_id, admin_id, months):
+    """
+    Insert (or re-parent) the monthly child `report` rows for `months` in one
+    statement and link them to the admin. Returns {month_start: report_id}.
+    """
+    if not months:
+        return {}
+    rows = psql.execute_values(
+        cur,
+        """
+        INSERT INTO report (
+            report_id, report_type,
+            time_range_start, time_range_end,
+            parent_report_id, description
+        )
+        VALUES %s
+        ON CONFLICT (report_type, time_range_start, time_range_end)
+          DO UPDATE SET parent_report_id = EXCLUDED.parent_report_id
+        RETURNING time_range_start, report_id
+        """,
+        [
+            (
+                new_report_id(prefix),
+                report_type,
+                m,
+                last_day(m),
+                parent_id,
+                f"monthly {label} {m:%Y-%m}",
+            )
+            for m in months
+        ],
+        fetch=True,
+    )
+    child_ids = {r["time_range_start"]: r["report_id"] for r in rows}
+
+    psql.execute_values(
+        cur,
+        "INSERT INTO admin_report (admin_id, report_id) VALUES %s ON CONFLICT DO NOTHING",
+        [(admin_id, rid) for rid in child_ids.values()],
+    )
+    return child_ids
+
 
 # In routes/generate_report.py, replace your six generate‐endpoints with these:
 
@@ -738,29 +644,24 @@ def student_general_report():
     cur = conn.cursor(cursor_factory=psql.RealDictCursor)
 
     try:
-        # 1) snapshot metrics
-        cur.execute(STUDENT_GENERAL_SQL)
-        summary = cur.fetchone() or {}
-
-        cur.execute(STUDENT_MONTHLY_SQL)
-        rows = cur.fetchall()
+        # 1) snapshot metrics (materialized, refreshed periodically)
+        if _wants_refresh():
+            refresh_report_cache(STUDENT_CACHED_VIEWS)
+        rows, refreshed_at = read_cached(cur, "report_student_general")
+        summary = rows[0] if rows else {}
+        summary["as_of"] = refreshed_at.isoformat() if refreshed_at else None
+
+        rows, _ = read_cached(cur, "report_student_monthly", order_by="month")
         summary["monthly_registrations"] = {
             r["month"]: r["registration_count"] for r in rows
         }
 
-        cur.execute(STUDENT_TOP_SQL)
-        summary["top_students"] = cur.fetchall()
+        summary["top_students"], _ = read_cached(
+            cur, "report_student_top", order_by="achievement_score DESC"
+        )
 
         # 2) determine & sort report range
-        cur.execute(
-            """SELECT MIN(date_trunc('month', registration_date)) AS min_month FROM "user";"""
-        )
-        earliest_row = cur.fetchone()
-        raw_start = (
-            earliest_row["min_month"].date()
-            if earliest_row and earliest_row["min_month"]
-            else dt.date.today().replace(day=1)
-        )
+        raw_start = _first_month(cur, "first_user_month")
         raw_end = last_completed_month()
         start_month, end_month = sorted((raw_start, raw_end))
 
@@ -984,81 +885,53 @@ def student_ranged_report():
         cached = {r["month_start"]: r for r in cur.fetchall()}
         print(f"[INFO] Loaded {len(cached)} cached monthly reports", flush=True)
 
-        month_rows = []
-        for m in months_needed:
-            if m in cached:
-                print(
-                    f"[SKIP] Using cached report for {m.strftime('%Y-%m')}", flush=True
-                )
-                month_rows.append(cached[m])
-                continue
+        missing = [m for m in months_needed if m not in cached]
+        print(
+            "[PROCESS] Creating reports for",
+            [m.strftime("%Y-%m") for m in missing],
+            flush=True,
+        )
 
-            print(f"[PROCESS] Creating report for {m.strftime('%Y-%m')}", flush=True)
+        # All missing months in one query, then one bulk insert per table
+        computed = {}
+        if missing:
+            cur.execute(STUDENT_MONTHS_SQL, {"months": missing})
+            computed = {r["month_start"]: r for r in cur.fetchall()}
+        report_progress(60)
 
-            cur.execute(STUDENT_RANGE_SQL, (m, m, m, m, m, m, m, m, m, m))
+        child_ids = _upsert_month_reports(
+            cur, "student_ranged", "SR", "student", parent_id, admin_id, missing
+        )
 
-            one = cur.fetchone()
+        student_rows = []
+        for m in missing:
+            one = computed[m]
+            one.pop("month_start")
             one["active_student_count"] = one.pop("active_students")
-
-            cur.execute(STUDENT_RANGE_TOP_SQL, (m, m))
-            tops = cur.fetchall()
-
-            child_id = new_report_id("SR")
-            cur.execute(
-                """
-                WITH ins AS (
-                    INSERT INTO report (
-                        report_id, report_type,
-                        time_range_start, time_range_end,
-                        parent_report_id, description
-                    )
-                    VALUES (%s, 'student_ranged', %s, %s, %s, %s)
-                    ON CONFLICT (report_type, time_range_start, time_range_end)
-                      DO UPDATE SET parent_report_id = EXCLUDED.parent_report_id
-                    RETURNING report_id
-                ), chosen AS (
-                    SELECT report_id FROM ins
-                    UNION ALL
-                    SELECT report_id FROM report
-                     WHERE report_type = 'student_ranged'
-                       AND time_range_start = %s
-                       AND time_range_end   = %s
-                    LIMIT 1
-                )
-                SELECT report_id FROM chosen;
-                """,
+            one["report_id"] = child_ids[m]
+            student_rows.append(
                 (
-                    child_id,
-                    m,
-                    last_day(m),
-                    parent_id,
-                    f"monthly student {m:%Y-%m}",
-                    m,
-                    last_day(m),
-                ),
-            )
-            child_id = cur.fetchone()["report_id"]
-
-            cur.execute(
-                "INSERT INTO admin_report (admin_id, report_id) VALUES (%s, %s) ON CONFLICT DO NOTHING",
-                (admin_id, child_id),
-            )
-
-            print(
-                "\n--- Inserting student_report for",
-                m.strftime("%Y-%m"),
-                "---",
-                flush=True,
-            )
-            print("Report ID:", child_id, flush=True)
-            print("Metrics:", one, flush=True)
-            print(
-                "Top Students:",
-                [tops[i]["id"] if i < len(tops) else None for i in range(3)],
-                flush=True,
+                    one["report_id"],
+                    one["total_students"],
+                    one["avg_cert_per_student"],
+                    one["avg_enroll_per_student"],
+                    one["avg_completion_rate"],
+                    one["active_student_count"],
+                    one["most_common_major"],
+                    one["most_common_major_count"],
+                    one["avg_age"],
+                    one["youngest_age"],
+                    one["oldest_age"],
+                    one["registration_count"],
+                    one.pop("top1"),
+                    one.pop("top2"),
+                    one.pop("top3"),
+                )
             )
 
-            cur.execute(
+        if student_rows:
+            psql.execute_values(
+                cur,
                 """
                 INSERT INTO student_report (
                     report_id,
@@ -1070,29 +943,14 @@ def student_ranged_report():
                     registration_count,
                     top1_id, top2_id, top3_id
                 )
-                VALUES (
-                    %(rid)s,
-                    %(total_students)s, %(avg_cert_per_student)s,
-                    %(avg_enroll_per_student)s, %(avg_completion_rate)s,
-                    %(active_student_count)s,
-                    %(most_common_major)s, %(most_common_major_count)s,
-                    %(avg_age)s, %(youngest_age)s, %(oldest_age)s,
-                    %(registration_count)s,
-                    %(top1)s, %(top2)s, %(top3)s
-                )
+                VALUES %s
                 ON CONFLICT DO NOTHING
                 """,
-                {
-                    **one,
-                    "rid": child_id,
-                    "top1": tops[0]["id"] if tops else None,
-                    "top2": tops[1]["id"] if len(tops) > 1 else None,
-                    "top3": tops[2]["id"] if len(tops) > 2 else None,
-                },
+                student_rows,
             )
+            print(f"[INFO] Inserted {len(student_rows)} monthly student reports", flush=True)
 
-            one["report_id"] = child_id
-            month_rows.append(one)
+        month_rows = [cached[m] if m in cached else computed[m] for m in months_needed]
 
         cur.execute(STUDENT_RANGE_TOP_SQL, (sdt, edt))
         overall_top = cur.fetchall()
@@ -1145,43 +1003,37 @@ def course_general_report() -> tuple:
     conn = connect_project_db()
     cur = conn.cursor(cursor_factory=psql.RealDictCursor)
     try:
-        # 1a) core snapshot
-        cur.execute(COURSE_GENERAL_SQL)
-        summary = cur.fetchone() or {}
+        if _wants_refresh():
+            refresh_report_cache(COURSE_CACHED_VIEWS)
 
-        # 1b) live enroll extras
-        cur.execute(
-            """
-            SELECT
-              ROUND(AVG(e.progress_rate)::numeric,2) AS avg_completion_rate,
-              COUNT(*) FILTER (WHERE c.price=0)   AS free_enroll_count,
-              COUNT(*) FILTER (WHERE c.price>0)   AS paid_enroll_count
-            FROM enroll e
-            JOIN course c ON c.course_id=e.course_id
-        """
-        )
-        summary.update(cur.fetchone() or {})
+        # 1a) core snapshot (materialized, refreshed periodically)
+        rows, refreshed_at = read_cached(cur, "report_course_general")
+        summary = rows[0] if rows else {}
+
+        # 1b) enroll extras
+        rows, _ = read_cached(cur, "report_course_enroll_stats")
+        summary.update(rows[0] if rows else {})
 
         # 1c) status counts
-        cur.execute(STATUS_COUNTS_SQL)
-        status_counts = {r["status"]: r["count"] for r in cur.fetchall()}
+        rows, _ = read_cached(cur, "report_course_status_counts")
+        status_counts = {r["status"]: r["count"] for r in rows}
         for st in ("accepted", "rejected"):
             status_counts.setdefault(st, 0)
 
         # 1d) category & difficulty stats
-        cur.execute(CATEGORY_ENROLL_SQL)
-        category_enrollments = cur.fetchall()
-        cur.execute(DIFFICULTY_STATS_SQL)
-        difficulty_stats = cur.fetchall()
+        category_enrollments, _ = read_cached(
+            cur, "report_category_enrollments", order_by="total_enrollments DESC"
+        )
+        difficulty_stats, _ = read_cached(
+            cur, "report_difficulty_stats", order_by="difficulty_level"
+        )
 
         # 1e) courses created in the last year
-        cur.execute(MONTHLY_COURSES_SQL)
-        courses_last_year = {r["month"]: r["course_count"] for r in cur.fetchall()}
+        rows, _ = read_cached(cur, "report_course_monthly", order_by="month")
+        courses_last_year = {r["month"]: r["course_count"] for r in rows}
 
         # 1f) figure out the time‐range
-        cur.execute("SELECT MIN(date_trunc('month', creation_date)) AS mn FROM course;")
-        mn = cur.fetchone()["mn"]
-        start_month = mn.date() if mn else dt.date.today().replace(day=1)
+        start_month = _first_month(cur, "first_course_month")
         end_month = last_completed_month()
 
         # 2) prepare ext_stats
@@ -1276,6 +1128,7 @@ def course_general_report() -> tuple:
                         "category_enrollments": _dec2py(category_enrollments),
                         "difficulty_stats": _dec2py(difficulty_stats),
                         "courses_created_last_year": courses_last_year,
+                        "as_of": refreshed_at.isoformat() if refreshed_at else None,
                         "range": {
                             "start": start_month.strftime("%Y-%m"),
                             "end": end_month.strftime("%Y-%m"),
@@ -1420,12 +1273,15 @@ def course_ranged_report() -> tuple:
         # 5) Monthly stats
         cur.execute(COURSE_RANGE_SQL, (sdt, edt) * 5)
         monthly_metrics = cur.fetchall()
+        report_progress(70)
 
         # 6) Category & difficulty stats
-        cur.execute(CATEGORY_ENROLL_SQL)
-        category_stats = cur.fetchall()
-        cur.execute(DIFFICULTY_STATS_SQL)
-        difficulty_stats = cur.fetchall()
+        category_stats, _ = read_cached(
+            cur, "report_category_enrollments", order_by="total_enrollments DESC"
+        )
+        difficulty_stats, _ = read_cached(
+            cur, "report_difficulty_stats", order_by="difficulty_level"
+        )
 
         conn.commit()
 
@@ -1467,57 +1323,39 @@ def instructor_general_report():
     conn = connect_project_db()
     cur = conn.cursor(cursor_factory=psql.RealDictCursor)
     try:
+        if _wants_refresh():
+            refresh_report_cache(INSTRUCTOR_CACHED_VIEWS)
+
         # 1) Determine time range
-        cur.execute(
-            """
-            SELECT MIN(date_trunc('month', u.registration_date)) AS min_month
-            FROM "user" u
-            JOIN instructor i ON i.id = u.id
-        """
-        )
-        r0 = cur.fetchone()
-        raw_start = (
-            r0["min_month"].date()
-            if r0 and r0["min_month"]
-            else dt.date.today().replace(day=1)
-        )
+        raw_start = _first_month(cur, "first_instructor_month")
         raw_end = last_completed_month()
         start_month, end_month = sorted((raw_start, raw_end))
 
-        # 2) Build snapshot summary
-        summary = {}
-
-        cur.execute(TOTAL_INSTR_SQL)
-        summary.update(cur.fetchone() or {})
-
-        cur.execute(PAID_FREE_INSTR_SQL)
-        summary.update(cur.fetchone() or {})
+        # 2) Build snapshot summary (every figure is read from a snapshot)
+        rows, refreshed_at = read_cached(cur, "report_instructor_general")
+        summary = rows[0] if rows else {}
+        summary["as_of"] = refreshed_at.isoformat() if refreshed_at else None
 
-        cur.execute(AVG_COURSES_SQL)
-        summary.update(cur.fetchone() or {})
-
-        cur.execute(MOST_POP_INSTR_SQL)
-        mp = cur.fetchone() or {}
+        rows, _ = read_cached(cur, "report_most_popular_instructor")
+        mp = rows[0] if rows else {}
         summary["most_popular_instructor_id"] = mp.get("id")
         summary["most_popular_instructor"] = mp
 
-        cur.execute(MOST_ACTIVE_INSTR_SQL)
-        ma = cur.fetchone() or {}
+        rows, _ = read_cached(cur, "report_most_active_instructor")
+        ma = rows[0] if rows else {}
         summary["most_active_instructor_id"] = ma.get("id")
         summary["most_active_instructor"] = ma
 
-        cur.execute(INSTR_AGE_SQL)
-        summary.update(cur.fetchone() or {})
-
-        cur.execute(INSTR_MONTHLY_SQL, (start_month, end_month))
-        regs = cur.fetchall()
+        regs, _ = read_cached(cur, "report_instructor_monthly", order_by="month")
         summary["monthly_registrations"] = {
-            r["month"]: r.get("registrations", r.get("registration_count", 0))
+            r["month"]: r["registration_count"]
             for r in regs
+            if month_label(start_month) <= r["month"] <= month_label(end_month)
         }
 
-        cur.execute(TOP_INSTR_SQL)
-        summary["top_instructors"] = cur.fetchall()
+        summary["top_instructors"], _ = read_cached(
+            cur, "report_top_instructors", order_by="rating DESC"
+        )
 
         summary["range"] = {
             "start": month_label(start_month),
@@ -1724,49 +1562,31 @@ def instructor_ranged_report() -> tuple:
         )
         parent_id = cur.fetchone()["report_id"]
 
-        # 2) for each month, insert child header + metrics
-        monthly_rows = []
-        for m in months:
-            cur.execute(INSTRUCTOR_RANGE_SQL, (m, m, m, m))
-            one = cur.fetchone()
+        # 2) metrics for every month in one query, then bulk insert the
+        #    child headers and their instructor_report rows
+        cur.execute(INSTRUCTOR_RANGE_SQL, (sdt, edt, sdt, edt))
+        monthly_rows = cur.fetchall()
+        report_progress(60)
 
-            # child report header
-            child_id = new_report_id("IR")
-            cur.execute(
-                """
-                INSERT INTO report
-                  (report_id, report_type,
-                   time_range_start, time_range_end,
-                   parent_report_id, description)
-                VALUES (%s, 'instructor_ranged', %s, %s, %s, %s)
-                ON CONFLICT (report_type, time_range_start, time_range_end)
-                  DO UPDATE SET parent_report_id = EXCLUDED.parent_report_id
-                RETURNING report_id;
-                """,
-                (
-                    child_id,
-                    m,
-                    last_day(m),
-                    parent_id,
-                    f"monthly instructor {m:%Y-%m}",
-                ),
-            )
-            child_id = cur.fetchone()["report_id"]
+        child_ids = _upsert_month_reports(
+            cur, "instructor_ranged", "IR", "instructor", parent_id, admin_id, months
+        )
 
-            # insert metrics
-            cur.execute(
-                """
-                INSERT INTO instructor_report
-                  (report_id, registration_count, total_instructors,
-                   avg_courses_per_instructor,
-                   instructors_with_free_course,
-                   instructors_with_paid_course,
-                   avg_age, youngest_age, oldest_age)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (report_id) DO NOTHING;
-                """,
+        psql.execute_values(
+            cur,
+            """
+            INSERT INTO instructor_report
+              (report_id, registration_count, total_instructors,
+               avg_courses_per_instructor,
+               instructors_with_free_course,
+               instructors_with_paid_course,
+               avg_age, youngest_age, oldest_age)
+            VALUES %s
+            ON CONFLICT (report_id) DO NOTHING;
+            """,
+            [
                 (
-                    child_id,
+                    child_ids[m],
                     one["registration_count"],
                     one["total_instructors"],
                     one["avg_courses_per_instructor"],
@@ -1775,18 +1595,17 @@ def instructor_ranged_report() -> tuple:
                     one["avg_age"],
                     one["youngest_age"],
                     one["oldest_age"],
-                ),
-            )
-
-            monthly_rows.append(one)
+                )
+                for m, one in zip(months, monthly_rows)
+            ],
+        )
 
         # 3) overall highlights
         cur.execute(MOST_ACTIVE_IN_RANGE_SQL, (sdt, edt))
         most_active = cur.fetchone() or {}
         cur.execute(MOST_POPULAR_IN_RANGE_SQL, (sdt, edt))
         most_popular = cur.fetchone() or {}
-        cur.execute(TOP_INSTR_SQL)
-        top_rated = cur.fetchall()
+        top_rated, _ = read_cached(cur, "report_top_instructors", order_by="rating DESC")
 
         conn.commit()
 
@@ -1962,8 +1781,7 @@ def get_student_report(rid: str):
                 top_students.append(stud)
 
         # fetch full monthly registrations for the snapshot case
-        cur.execute(STUDENT_MONTHLY_SQL)
-        regs = cur.fetchall()
+        regs, _ = read_cached(cur, "report_student_monthly", order_by="month")
         monthly_regs = {r["month"]: r["registration_count"] for r in regs}
 
         # assemble
@@ -2056,8 +1874,7 @@ def get_instructor_report(rid: str):
             most_active = cur.fetchone() or {}
             cur.execute(MOST_POPULAR_IN_RANGE_SQL, (start, end))
             most_popular = cur.fetchone() or {}
-            cur.execute(TOP_INSTR_SQL)
-            top3 = cur.fetchall()
+            top3, _ = read_cached(cur, "report_top_instructors", order_by="rating DESC")
 
             data = {
                 "parent_report_id": hdr["report_id"],
@@ -2101,19 +1918,21 @@ def get_instructor_report(rid: str):
             )
 
         # monthly registrations
-        cur.execute(INSTR_MONTHLY_SQL, (start, end))
-        regs = cur.fetchall()
-        monthly_regs = {r["month"]: r["registration_count"] for r in regs}
+        regs, _ = read_cached(cur, "report_instructor_monthly", order_by="month")
+        monthly_regs = {
+            r["month"]: r["registration_count"]
+            for r in regs
+            if month_label(start) <= r["month"] <= month_label(end)
+        }
 
         # top-3 overall
-        cur.execute(TOP_INSTR_SQL)
-        top3 = cur.fetchall()
+        top3, _ = read_cached(cur, "report_top_instructors", order_by="rating DESC")
 
         # most-popular & most-active overall
-        cur.execute(MOST_POP_INSTR_SQL)
-        mp = cur.fetchone() or {}
-        cur.execute(MOST_ACTIVE_INSTR_SQL)
-        ma = cur.fetchone() or {}
+        rows, _ = read_cached(cur, "report_most_popular_instructor")
+        mp = rows[0] if rows else {}
+        rows, _ = read_cached(cur, "report_most_active_instructor")
+        ma = rows[0] if rows else {}
 
         data = {
             **row,
@@ -2249,12 +2068,13 @@ def get_course_report(rid: str):
                     }
                 )
 
-            # b) re-run category & difficulty stats
-            cur.execute(CATEGORY_ENROLL_SQL)
-            category_stats = cur.fetchall()
-
-            cur.execute(DIFFICULTY_STATS_SQL)
-            difficulty_stats = cur.fetchall()
+            # b) category & difficulty stats (snapshots)
+            category_stats, _ = read_cached(
+                cur, "report_category_enrollments", order_by="total_enrollments DESC"
+            )
+            difficulty_stats, _ = read_cached(
+                cur, "report_difficulty_stats", order_by="difficulty_level"
+            )
 
             return (
                 jsonify(
@@ -2277,35 +2097,27 @@ def get_course_report(rid: str):
             )
 
         # ─── GENERAL or CHILD MONTH ─────────────────────────────
-        # a) re-run general snapshot
-        cur.execute(COURSE_GENERAL_SQL)
-        summary = cur.fetchone() or {}
+        # a) general snapshot
+        rows, _ = read_cached(cur, "report_course_general")
+        summary = rows[0] if rows else {}
 
-        # b) re-run extras
-        cur.execute(
-            """
-            SELECT
-              ROUND(AVG(e.progress_rate)::numeric,2) AS avg_completion_rate,
-              COUNT(*) FILTER (WHERE c.price=0)   AS free_enroll_count,
-              COUNT(*) FILTER (WHERE c.price>0)   AS paid_enroll_count
-            FROM enroll e
-            JOIN course c ON c.course_id = e.course_id
-            """
-        )
-        summary.update(cur.fetchone() or {})
+        # b) enroll extras
+        rows, _ = read_cached(cur, "report_course_enroll_stats")
+        summary.update(rows[0] if rows else {})
 
         # c) status_counts, category, difficulty, last_year
-        cur.execute(STATUS_COUNTS_SQL)
-        status_counts = {r["status"]: r["count"] for r in cur.fetchall()}
-
-        cur.execute(CATEGORY_ENROLL_SQL)
-        category_enrollments = cur.fetchall()
+        rows, _ = read_cached(cur, "report_course_status_counts")
+        status_counts = {r["status"]: r["count"] for r in rows}
 
-        cur.execute(DIFFICULTY_STATS_SQL)
-        difficulty_stats = cur.fetchall()
+        category_enrollments, _ = read_cached(
+            cur, "report_category_enrollments", order_by="total_enrollments DESC"
+        )
+        difficulty_stats, _ = read_cached(
+            cur, "report_difficulty_stats", order_by="difficulty_level"
+        )
 
-        cur.execute(MONTHLY_COURSES_SQL)
-        courses_last_year = {r["month"]: r["course_count"] for r in cur.fetchall()}
+        rows, _ = read_cached(cur, "report_course_monthly", order_by="month")
+        courses_last_year = {r["month"]: r["course_count"] for r in rows}
 
         data = {
             **summary,
@@ -1,5 +1,8 @@
 from flask import Blueprint, request, jsonify, send_from_directory, abort
 from db import connect_project_db
+from routes.guards import check_course_access
+from answer_keys import score_answers, combine_grade
+from assessment_cache import get_assessments
 import psycopg2.extras
 import os
 
@@ -7,37 +10,147 @@ grading_bp = Blueprint("grading", __name__)
 
 @grading_bp.route("/api/grade/<course_id>/<sec_id>/<content_id>/<student_id>", methods=["PUT"])
 def assign_grade(course_id, sec_id, content_id, student_id):
+    """
+    Body: {"grade"} sets the final grade, or {"open_ended_grade"} (0-100)
+    grades only the open-ended part of an assessment whose multiple-choice
+    part was scored at submit time; the two are combined into the grade.
+    """
     data = request.json
-    if "grade" not in data:
+    if "grade" not in data and "open_ended_grade" not in data:
         return jsonify({"success": False, "message": "Missing grade"}), 400
 
     conn = connect_project_db()
     cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
     try:
 
-        # Check if course exists and is accepted
-        cursor.execute("""
-            SELECT status FROM course WHERE course_id = %s
-        """, (course_id,))
-        course = cursor.fetchone()
-        if not course:
-            return jsonify({"success": False, "message": "Course not found"}), 404
-        if course[0] != "accepted":
-            return jsonify({"success": False, "message": "Course is not accepted"}), 403
-        
-        # Check if user is enrolled
-        cursor.execute("""
-            SELECT 1 FROM enroll WHERE course_id = %s AND student_id = %s
-        """, (course_id, student_id))
-        if cursor.fetchone() is None:
-            return jsonify({"success": False, "message": "User is not enrolled in the course"}), 403
-        
+        # Check course status and enrollment in one query
+        ctx, error = check_course_access(cursor, course_id, student_id=student_id)
+        if error:
+            return error
+
+        if "grade" in data:
+            grade = int(data["grade"])
+        else:
+            open_ended_grade = int(data["open_ended_grade"])
+            if open_ended_grade < 0 or open_ended_grade > 100:
+                return jsonify({"success": False, "message": "Grade must be between 0 and 100"}), 400
+            cursor.execute("""
+                SELECT auto_points, auto_max_points, manual_max_points FROM submit
+                WHERE course_id = %s AND sec_id = %s AND content_id = %s AND student_id = %s
+            """, (course_id, sec_id, content_id, student_id))
+            submission = cursor.fetchone()
+            if not submission or submission["auto_points"] is None:
+                return jsonify({"success": False, "message": "Submission has no automatically graded part"}), 400
+            grade = combine_grade(submission["auto_points"], submission["auto_max_points"],
+                                  submission["manual_max_points"], open_ended_grade)
+
         cursor.execute("""
             UPDATE submit SET grade = %s 
             WHERE course_id = %s AND sec_id = %s AND content_id = %s AND student_id = %s
-        """, (int(data["grade"]), course_id, sec_id, content_id, student_id))
+        """, (grade, course_id, sec_id, content_id, student_id))
+        conn.commit()
+        return jsonify({"success": True, "grade": grade}), 200
+    except Exception as e:
+        conn.rollback()
+        return jsonify({"success": False, "message": str(e)}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@grading_bp.route("/api/grade/<course_id>/bulk", methods=["POST"])
+def assign_grades_bulk(course_id):
+    """
+    Grade many submissions of one course at once.
+
+    Body: {"grades": [{"sec_id", "content_id", "student_id", "grade"}, ...]}
+    Valid items are applied with a single UPDATE in one transaction (so the
+    completion and notification triggers run once for the whole batch);
+    invalid ones are skipped. Returns one result per item, in request order.
+    """
+    data = request.json or {}
+    items = data.get("grades")
+    if not isinstance(items, list) or not items:
+        return jsonify({"success": False, "message": "grades must be a non-empty list"}), 400
+
+    results = []
+    valid = {}  # submission key -> index of the item grading it
+    for index, item in enumerate(items):
+        result = {"index": index, "success": False}
+        results.append(result)
+        if not isinstance(item, dict) or not all(item.get(field) for field in ("sec_id", "content_id", "student_id")):
+            result["message"] = "Missing sec_id, content_id or student_id"
+            continue
+        # Ids come back from the database as strings; compare them the same way
+        key = (str(item["sec_id"]), str(item["content_id"]), str(item["student_id"]))
+        result.update(sec_id=key[0], content_id=key[1], student_id=key[2])
+        try:
+            grade = int(item.get("grade"))
+        except (TypeError, ValueError):
+            result["message"] = "Grade must be an integer"
+            continue
+        if grade < 0 or grade > 100:
+            result["message"] = "Grade must be between 0 and 100"
+            continue
+        if key in valid:
+            result["message"] = "Duplicate submission in request"
+            continue
+        valid[key] = index
+        result["grade"] = grade
+
+    conn = connect_project_db()
+    cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+    try:
+        # Course guard once for the whole batch
+        ctx, error = check_course_access(cursor, course_id)
+        if error:
+            return error
+
+        if valid:
+            keys = list(valid)
+            sec_ids = [key[0] for key in keys]
+            content_ids = [key[1] for key in keys]
+            student_ids = [key[2] for key in keys]
+
+            # Enrollment and submission checks for every item in one query
+            cursor.execute("""
+                SELECT k.sec_id, k.content_id, k.student_id,
+                       e.student_id IS NOT NULL AS enrolled,
+                       s.student_id IS NOT NULL AS submitted
+                FROM unnest(%s::VARCHAR[], %s::VARCHAR[], %s::VARCHAR[]) AS k(sec_id, content_id, student_id)
+                LEFT JOIN enroll e ON e.course_id = %s AND e.student_id = k.student_id
+                LEFT JOIN submit s ON s.course_id = %s AND s.sec_id = k.sec_id
+                                  AND s.content_id = k.content_id AND s.student_id = k.student_id
+            """, (sec_ids, content_ids, student_ids, course_id, course_id))
+            for row in cursor.fetchall():
+                key = (row["sec_id"], row["content_id"], row["student_id"])
+                if not row["enrolled"]:
+                    results[valid.pop(key)]["message"] = "User is not enrolled in the course"
+                elif not row["submitted"]:
+                    results[valid.pop(key)]["message"] = "Submission not found"
+
+        if valid:
+            keys = list(valid)
+            cursor.execute("""
+                UPDATE submit s
+                SET grade = k.grade
+                FROM unnest(%s::VARCHAR[], %s::VARCHAR[], %s::VARCHAR[], %s::INTEGER[])
+                     AS k(sec_id, content_id, student_id, grade)
+                WHERE s.course_id = %s AND s.sec_id = k.sec_id
+                  AND s.content_id = k.content_id AND s.student_id = k.student_id
+            """, (
+                [key[0] for key in keys],
+                [key[1] for key in keys],
+                [key[2] for key in keys],
+                [results[valid[key]]["grade"] for key in keys],
+                course_id,
+            ))
+            for key in keys:
+                results[valid[key]]["success"] = True
+
         conn.commit()
-        return jsonify({"success": True}), 200
+        graded = sum(1 for result in results if result["success"])
+        return jsonify({"success": True, "graded": graded, "failed": len(results) - graded, "results": results}), 200
     except Exception as e:
         conn.rollback()
         return jsonify({"success": False, "message": str(e)}), 500
@@ -46,6 +159,47 @@ def assign_grade(course_id, sec_id, content_id, student_id):
         conn.close()
 
 
+def _content_keys(submissions, task_type):
+    """Distinct (course_id, sec_id, content_id) of the submissions of one task type, as three arrays."""
+    keys = sorted({
+        (item["course_id"], item["sec_id"], item["content_id"])
+        for item in submissions
+        if item.get("task_type") == task_type
+    })
+    return [list(column) for column in zip(*keys)] if keys else None
+
+
+def _fetch_assignments(cursor, keys):
+    """Assignment rows for the given content keys, by key."""
+    if not keys:
+        return {}
+    cursor.execute("""
+        SELECT a.course_id, a.sec_id, a.content_id,
+               a.start_date, a.end_date, a.upload_material, a.body
+        FROM assignment a
+        JOIN unnest(%s::VARCHAR[], %s::VARCHAR[], %s::VARCHAR[]) AS k(course_id, sec_id, content_id)
+          ON a.course_id = k.course_id AND a.sec_id = k.sec_id AND a.content_id = k.content_id
+    """, keys)
+    return {(row["course_id"], row["sec_id"], row["content_id"]): row for row in cursor.fetchall()}
+
+
+def _fetch_assessments(cursor, keys):
+    """(question_count, Assessment definition) for the given assessment content keys, by key."""
+    if not keys:
+        return {}
+    cursor.execute("""
+        SELECT a.course_id, a.sec_id, a.content_id, a.question_count, a.question_version
+        FROM assessment a
+        JOIN unnest(%s::VARCHAR[], %s::VARCHAR[], %s::VARCHAR[]) AS k(course_id, sec_id, content_id)
+          ON a.course_id = k.course_id AND a.sec_id = k.sec_id AND a.content_id = k.content_id
+    """, keys)
+    rows = {(row["course_id"], row["sec_id"], row["content_id"]): row for row in cursor.fetchall()}
+
+    # Questions come from the definition cache; only outdated ones are re-read
+    definitions = get_assessments(cursor, rows, {key: row["question_version"] for key, row in rows.items()})
+    return {key: (row["question_count"], definitions[key]) for key, row in rows.items()}
+
+
 @grading_bp.route("/api/instructor/<instructor_id>/ungraded-submissions", methods=["GET"])
 def get_ungraded_submissions(instructor_id):
     sort = request.args.get("sort", "newest")
@@ -70,7 +224,7 @@ def get_ungraded_submissions(instructor_id):
                    c.title AS content_title,
                    co.title AS course_title,
                    c.content_type, t.task_type,
-                   s.grade, s.answers
+                   s.grade, s.answers, s.auto_points, s.auto_max_points, s.manual_max_points
             FROM submit s
             JOIN course co ON co.course_id = s.course_id
             JOIN content c ON c.course_id = s.course_id AND c.sec_id = s.sec_id AND c.content_id = s.content_id
@@ -83,9 +237,15 @@ def get_ungraded_submissions(instructor_id):
             LIMIT %s OFFSET %s
         """, (instructor_id, limit, offset))
 
-        submissions = []
-        for row in cursor.fetchall():
-            item = dict(row)
+        submissions = [dict(row) for row in cursor.fetchall()]
+
+        # Metadata of every task on the page, fetched once per distinct content
+        # rather than once per submission
+        assignments = _fetch_assignments(cursor, _content_keys(submissions, "assignment"))
+        assessments = _fetch_assessments(cursor, _content_keys(submissions, "assessment"))
+
+        for item in submissions:
+            key = (item["course_id"], item["sec_id"], item["content_id"])
 
             if item["task_type"] == "assignment" and item.get("answers"):
                 filename = os.path.basename(item["answers"])
@@ -94,12 +254,7 @@ def get_ungraded_submissions(instructor_id):
 
             # If it's an assignment:
             if item.get("task_type") == "assignment":
-                cursor.execute("""
-                    SELECT start_date, end_date, upload_material, body
-                    FROM assignment
-                    WHERE course_id = %s AND sec_id = %s AND content_id = %s
-                """, (item["course_id"], item["sec_id"], item["content_id"]))
-                assgn = cursor.fetchone()
+                assgn = assignments.get(key)
                 if assgn:
                     item["start_date"] = assgn["start_date"]
                     item["end_date"] = assgn["end_date"]
@@ -108,35 +263,15 @@ def get_ungraded_submissions(instructor_id):
 
             # Add assessment fields if task_type is assessment
             elif item.get("task_type") == "assessment":
-                cursor.execute("""
-                    SELECT question_count FROM assessment
-                    WHERE course_id = %s AND sec_id = %s AND content_id = %s
-                """, (item["course_id"], item["sec_id"], item["content_id"]))
-                ass_row = cursor.fetchone()
-                item["question_count"] = ass_row["question_count"] if ass_row else 0
-
-                cursor.execute("""
-                    SELECT q.question_id, q.question_body, q.max_time,
-                        mc.correct_answer AS mc_answer,
-                        oe.answer AS oe_answer
-                    FROM question q
-                    LEFT JOIN multiple_choice mc ON mc.course_id = q.course_id AND mc.sec_id = q.sec_id AND mc.content_id = q.content_id AND mc.question_id = q.question_id
-                    LEFT JOIN open_ended oe ON oe.course_id = q.course_id AND oe.sec_id = q.sec_id AND oe.content_id = q.content_id AND oe.question_id = q.question_id
-                    WHERE q.course_id = %s AND q.sec_id = %s AND q.content_id = %s
-                    ORDER BY q.question_id
-                """, (item["course_id"], item["sec_id"], item["content_id"]))
-
-                questions = []
-                for q in cursor.fetchall():
-                    questions.append({
-                        "question_id": q["question_id"],
-                        "question_body": q["question_body"],
-                        "max_time": q["max_time"],
-                        "correct_answer": q["mc_answer"] if q["mc_answer"] else q["oe_answer"]
-                    })
-                item["questions"] = questions
-
-            submissions.append(item)
+                question_count, assessment = assessments.get(key, (0, None))
+                item["question_count"] = question_count
+                item["questions"] = [
+                    {name: q[name] for name in ("question_id", "question_body", "max_time", "correct_answer")}
+                    for q in (assessment.questions if assessment else [])
+                ]
+                # Multiple-choice part is already scored, the instructor only grades the rest
+                if assessment:
+                    _, item["auto_results"] = score_answers(assessment.answer_key, item.get("answers"))
 
         return jsonify({"success": True, "ungraded_contents": submissions}), 200
 
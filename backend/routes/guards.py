@@ -0,0 +1,51 @@
+# routes/guards.py
+
+from flask import jsonify
+from prepared import execute_prepared
+
+
+def resolve_course_context(cursor, course_id, sec_id=None, content_id=None, student_id=None):
+    """
+    Fetch course status, section/content/task existence, student existence and
+    enrollment for the given ids in a single round trip.
+    Returns a dict, or None if the course does not exist.
+    """
+    execute_prepared(cursor, "content_context", (course_id, sec_id, content_id, student_id))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    keys = [desc[0] for desc in cursor.description]
+    return dict(zip(keys, row))
+
+
+def check_course_access(cursor, course_id, sec_id=None, content_id=None, student_id=None,
+                        require_task=False, require_student=False):
+    """
+    Run the usual course → section → content → student → enrollment → task guards
+    with one query. Only the levels whose ids are given are checked.
+
+    Returns (context, None) when everything passes, or (None, error_response)
+    with the same 403/404 responses the individual checks used to return.
+    """
+    ctx = resolve_course_context(cursor, course_id, sec_id, content_id, student_id)
+
+    if ctx is None:
+        return None, (jsonify({"success": False, "message": "Course not found"}), 404)
+    if ctx["status"] != "accepted":
+        return None, (jsonify({"success": False, "message": "Course is not accepted"}), 403)
+
+    if sec_id is not None and not ctx["section_exists"]:
+        return None, (jsonify({"success": False, "message": "Section not found"}), 404)
+    if content_id is not None and not ctx["content_exists"]:
+        return None, (jsonify({"success": False, "message": "Content not found"}), 404)
+
+    if student_id is not None:
+        if require_student and not ctx["student_exists"]:
+            return None, (jsonify({"success": False, "message": "Student not found"}), 404)
+        if not ctx["enrolled"]:
+            return None, (jsonify({"success": False, "message": "User is not enrolled in the course"}), 403)
+
+    if require_task and ctx["task_type"] is None:
+        return None, (jsonify({"success": False, "message": "Task not found"}), 404)
+
+    return ctx, None
@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, request
-import psycopg2.extras
-from db import connect_project_db
+from db import get_db
+from assessment_cache import invalidate_course_assessments
+from course_page_cache import invalidate_course_pages
 import uuid
 
 instructor_bp = Blueprint('instructor', __name__)
@@ -11,8 +12,7 @@ instructor_bp = Blueprint('instructor', __name__)
 def get_instructor_courses(instructor_id):
     """Get all courses created by a specific instructor"""
     try:
-        conn = connect_project_db()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+        cursor = get_db().cursor()
         
         # Query to get all courses created by the instructor
         cursor.execute("""
@@ -57,9 +57,6 @@ def get_instructor_courses(instructor_id):
             }
             courses.append(course)
         
-        cursor.close()
-        conn.close()
-        
         return jsonify({
             'success': True,
             'courses': courses
@@ -78,8 +75,7 @@ def get_instructor_courses(instructor_id):
 def get_instructor_stats(instructor_id):
     """Get statistics for an instructor (published courses, total students, ratings, revenue)"""
     try:
-        conn = connect_project_db()
-        cursor = conn.cursor()
+        cursor = get_db().cursor(dict_cursor=False)
         
         # Query for published course count
         cursor.execute("""
@@ -98,14 +94,14 @@ def get_instructor_stats(instructor_id):
         """, (instructor_id,))
         total_students = cursor.fetchone()[0]
         
-        # Query for average rating
+        # Average rating from the running totals kept on instructor
         cursor.execute("""
-            SELECT COALESCE(AVG(f.rating), 0)
-            FROM feedback f
-            JOIN course c ON f.course_id = c.course_id
-            WHERE c.creator_id = %s
+            SELECT COALESCE(rating_sum::FLOAT / NULLIF(rating_count, 0), 0)
+            FROM instructor
+            WHERE id = %s
         """, (instructor_id,))
-        avg_rating = cursor.fetchone()[0]
+        row = cursor.fetchone()
+        avg_rating = row[0] if row else 0
         
         # Query for monthly revenue (assuming enrollment = payment)
         cursor.execute("""
@@ -124,9 +120,6 @@ def get_instructor_stats(instructor_id):
             'monthlyRevenue': float(monthly_revenue) if monthly_revenue else 0.0
         }
         
-        cursor.close()
-        conn.close()
-        
         return jsonify(stats)
     
     except Exception as e:
@@ -145,8 +138,7 @@ def get_instructor_stats(instructor_id):
 def get_course_students(instructor_id, course_id):
     """Get all students enrolled in a specific course with their progress"""
     try:
-        conn = connect_project_db()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+        cursor = get_db().cursor()
         
         # First verify this course belongs to the instructor
         cursor.execute("""
@@ -196,9 +188,6 @@ def get_course_students(instructor_id, course_id):
                 'completedContent': row['completed_content']
             })
         
-        cursor.close()
-        conn.close()
-        
         return jsonify({
             'success': True,
             'students': students
@@ -217,8 +206,7 @@ def get_course_students(instructor_id, course_id):
 def get_course_feedback(instructor_id, course_id):
     """Get all feedback for a specific course"""
     try:
-        conn = connect_project_db()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+        cursor = get_db().cursor()
         
         # First verify this course belongs to the instructor
         cursor.execute("""
@@ -269,9 +257,6 @@ def get_course_feedback(instructor_id, course_id):
                 'feedbackDate': row['feedback_date'].isoformat() if row['feedback_date'] else None
             })
         
-        cursor.close()
-        conn.close()
-        
         return jsonify({
             'success': True,
             'averageRating': float(stats['avg_rating']) if stats and stats['avg_rating'] else 0.0,
@@ -289,8 +274,8 @@ def get_course_feedback(instructor_id, course_id):
 # 4.5 Edit an Existing Course
 @instructor_bp.route('/api/instructor/<instructor_id>/course/<course_id>/edit', methods=['PUT'])
 def edit_course(instructor_id, course_id):
-    conn = connect_project_db()
-    cursor = conn.cursor()
+    db = get_db()
+    cursor = db.cursor(dict_cursor=False)
     
     # Verify course exists and belongs to the instructor
     cursor.execute(
@@ -305,9 +290,7 @@ def edit_course(instructor_id, course_id):
     data = request.json
     
     try:
-        # Start a transaction
-        cursor.execute("BEGIN")
-
+        # Everything below runs in the request's transaction
         # Update course table
         cursor.execute(
             """UPDATE course 
@@ -622,9 +605,11 @@ def edit_course(instructor_id, course_id):
             cursor.execute("DELETE FROM section WHERE course_id = %s AND sec_id = %s", (course_id, sec_id_del))
             print(f"Deleted section {sec_id_del}")
 
-        conn.commit()
+        db.commit()
+        # Questions of any assessment in the course may have changed
+        invalidate_course_assessments(course_id)
+        invalidate_course_pages(course_id)
         return jsonify({"success": True, "message": "Course updated successfully"})
     except Exception as e:
-        cursor.execute("ROLLBACK")
-        conn.close()
+        db.rollback()
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
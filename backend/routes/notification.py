@@ -1,21 +1,48 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from db import connect_project_db
+from notification_stream import event_stream, subscribe, unsubscribe
+from notifications import (
+    INBOX_MAX_PAGE_SIZE,
+    INBOX_PAGE_SIZE,
+    RECIPIENT_STATUS_FILTERS,
+    RECIPIENT_STATUS_SQL,
+    audience_params,
+    decode_inbox_cursor,
+    deliver_to_users,
+    encode_inbox_cursor,
+    fan_out,
+    insert_notification,
+    missing_users,
+    unread_count,
+)
 import psycopg2.extras
-import uuid
 from datetime import datetime
 
 notification_bp = Blueprint("notification", __name__)
 
-# Get user's notifications
+# Get user's notifications, newest first, one page at a time.
+# ?limit=N (default 20, at most 100) and ?cursor=<next_cursor of the previous page>
 @notification_bp.route("/api/notifications/<user_id>", methods=["GET"])
 def get_user_notifications(user_id):
 
     status = request.args.get("status", None)  # Statuse göre filter
-    allowed_statuses = {"unread", "read", "archived"}
     
-    if status and status not in allowed_statuses:
+    if status and status not in RECIPIENT_STATUS_FILTERS:
         return jsonify({"success": False, "message": "Invalid status value"}), 400
 
+    try:
+        limit = int(request.args.get("limit", INBOX_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"success": False, "message": "limit must be an integer"}), 400
+    limit = max(1, min(limit, INBOX_MAX_PAGE_SIZE))
+
+    after = None
+    if request.args.get("cursor"):
+        try:
+            after = decode_inbox_cursor(request.args["cursor"])
+        except ValueError:
+            return jsonify({"success": False, "message": "Invalid cursor"}), 400
+
     conn = connect_project_db()
     cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
     
@@ -26,25 +53,36 @@ def get_user_notifications(user_id):
             return jsonify({"success": False, "message": "User not found"}), 404
         
         # Build the query based on status filter
-        query = """
+        query = f"""
             SELECT n.notification_id, n.type, n.entity_type, n.entity_id, n.message,
-                   n.timestamp, n.status, r.read_at
-            FROM notification n
-            JOIN receive r ON n.notification_id = r.notification_id
+                   n.timestamp, {RECIPIENT_STATUS_SQL} AS status, r.read_at, r.received_at
+            FROM receive r
+            JOIN notification n ON n.notification_id = r.notification_id
             WHERE r.id = %s
         """
         params = [user_id]
         
         if status:
-            query += " AND n.status = %s"
-            params.append(status)
+            query += f" AND {RECIPIENT_STATUS_FILTERS[status]}"
+
+        if after:
+            query += " AND (r.received_at, r.notification_id) < (%s, %s)"
+            params.extend(after)
             
-        query += " ORDER BY n.timestamp DESC"
+        # One extra row tells whether there is a next page
+        query += " ORDER BY r.received_at DESC, r.notification_id DESC LIMIT %s"
+        params.append(limit + 1)
         
         cursor.execute(query, tuple(params))
+        rows = cursor.fetchall()
         
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_inbox_cursor(rows[-1]["received_at"], rows[-1]["notification_id"])
+
         notifications = []
-        for row in cursor.fetchall():
+        for row in rows:
             notifications.append({
                 "notification_id": row["notification_id"],
                 "type": row["type"],
@@ -59,7 +97,8 @@ def get_user_notifications(user_id):
         return jsonify({
             "success": True,
             "notifications": notifications,
-            "unread_count": len([n for n in notifications if n["status"] == "unread"])
+            "unread_count": unread_count(cursor, user_id),
+            "next_cursor": next_cursor
         }), 200
         
     except Exception as e:
@@ -70,6 +109,57 @@ def get_user_notifications(user_id):
         cursor.close()
         conn.close()
 
+# Unread notification count (for the bell icon), a single-row read
+@notification_bp.route("/api/notifications/unread-count/<user_id>", methods=["GET"])
+def get_unread_count(user_id):
+
+    conn = connect_project_db()
+    cursor = conn.cursor()
+
+    try:
+        return jsonify({"success": True, "unread_count": unread_count(cursor, user_id)}), 200
+
+    except Exception as e:
+        print(f"Error fetching unread count: {e}")
+        return jsonify({"success": False, "message": str(e)}), 500
+
+    finally:
+        cursor.close()
+        conn.close()
+
+# Live notifications as server-sent events (fed by LISTEN/NOTIFY, see notification_stream.py).
+# Sends an "unread" event with the current count, then a "notification" event per new notification.
+@notification_bp.route("/api/notifications/stream/<user_id>", methods=["GET"])
+def stream_notifications(user_id):
+
+    # Subscribe before reading the count so nothing committed in between is missed
+    events = subscribe(user_id)
+    conn = connect_project_db()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute('SELECT 1 FROM "user" WHERE id = %s', (user_id,))
+        if not cursor.fetchone():
+            unsubscribe(user_id, events)
+            return jsonify({"success": False, "message": "User not found"}), 404
+        count = unread_count(cursor, user_id)
+
+    except Exception as e:
+        unsubscribe(user_id, events)
+        print(f"Error opening notification stream: {e}")
+        return jsonify({"success": False, "message": str(e)}), 500
+
+    finally:
+        cursor.close()
+        conn.close()
+
+    # The request's connection goes back to the pool before streaming starts
+    return Response(
+        event_stream(user_id, events, count),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # Mark notification as read
 @notification_bp.route("/api/notifications/<notification_id>/read/<user_id>", methods=["PUT"])
 def mark_notification_read(notification_id, user_id):
@@ -78,30 +168,17 @@ def mark_notification_read(notification_id, user_id):
     cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
     
     try:
-        # Check if the notification exists and is associated with the user
+        # Mark this user's copy as read (and take it out of the archive)
         cursor.execute("""
-            SELECT 1 FROM notification n
-            JOIN receive r ON n.notification_id = r.notification_id
-            WHERE n.notification_id = %s AND r.id = %s
+            UPDATE receive
+            SET read_at = COALESCE(read_at, CURRENT_TIMESTAMP),
+                archived_at = NULL
+            WHERE notification_id = %s AND id = %s
         """, (notification_id, user_id))
         
-        if not cursor.fetchone():
+        if cursor.rowcount == 0:
             return jsonify({"success": False, "message": "Notification not found or not associated with this user"}), 404
         
-        # Mark notification as read
-        cursor.execute("""
-            UPDATE notification
-            SET status = 'read'
-            WHERE notification_id = %s
-        """, (notification_id,))
-        
-        # Set read timestamp if not already set
-        cursor.execute("""
-            UPDATE receive
-            SET read_at = CURRENT_TIMESTAMP
-            WHERE notification_id = %s AND id = %s AND read_at IS NULL
-        """, (notification_id, user_id))
-        
         conn.commit()
         return jsonify({"success": True, "message": "Notification marked as read"}), 200
         
@@ -127,37 +204,21 @@ def mark_all_notifications_read(user_id):
         if not cursor.fetchone():
             return jsonify({"success": False, "message": "User not found"}), 404
         
-        # Get all unread notifications for this user
-        cursor.execute("""
-            SELECT n.notification_id
-            FROM notification n
-            JOIN receive r ON n.notification_id = r.notification_id
-            WHERE r.id = %s AND n.status = 'unread'
-        """, (user_id,))
-        
-        notifications = [row["notification_id"] for row in cursor.fetchall()]
-        
-        if not notifications:
+        # Nothing to scan when the counter says there is nothing unread
+        if unread_count(cursor, user_id) == 0:
             return jsonify({"success": True, "message": "No unread notifications"}), 200
         
-        # Update notification status
-        cursor.execute("""
-            UPDATE notification
-            SET status = 'read'
-            WHERE notification_id = ANY(%s)
-        """, (notifications,))
-        
-        # Update read timestamps
         cursor.execute("""
             UPDATE receive
             SET read_at = CURRENT_TIMESTAMP
-            WHERE notification_id = ANY(%s) AND id = %s AND read_at IS NULL
-        """, (notifications, user_id))
+            WHERE id = %s AND read_at IS NULL AND archived_at IS NULL
+        """, (user_id,))
+        updated = cursor.rowcount
         
         conn.commit()
         return jsonify({
             "success": True, 
-            "message": f"{len(notifications)} notifications marked as read"
+            "message": f"{updated} notifications marked as read"
         }), 200
         
     except Exception as e:
@@ -177,23 +238,16 @@ def archive_notification(notification_id, user_id):
     cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
     
     try:
-        # Check if the notification exists and is associated with the user
+        # Archive this user's copy only
         cursor.execute("""
-            SELECT 1 FROM notification n
-            JOIN receive r ON n.notification_id = r.notification_id
-            WHERE n.notification_id = %s AND r.id = %s
+            UPDATE receive
+            SET archived_at = COALESCE(archived_at, CURRENT_TIMESTAMP)
+            WHERE notification_id = %s AND id = %s
         """, (notification_id, user_id))
         
-        if not cursor.fetchone():
+        if cursor.rowcount == 0:
             return jsonify({"success": False, "message": "Notification not found or not associated with this user"}), 404
         
-        # Archive notification
-        cursor.execute("""
-            UPDATE notification
-            SET status = 'archived'
-            WHERE notification_id = %s
-        """, (notification_id,))
-        
         conn.commit()
         return jsonify({"success": True, "message": "Notification archived"}), 200
         
@@ -220,16 +274,16 @@ def get_notification_stats(user_id):
             return jsonify({"success": False, "message": "User not found"}), 404
         
         # Get counts by status and type
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT 
-                n.status,
+                {RECIPIENT_STATUS_SQL} AS status,
                 n.type,
                 COUNT(*) as count
-            FROM notification n
-            JOIN receive r ON n.notification_id = r.notification_id
+            FROM receive r
+            JOIN notification n ON n.notification_id = r.notification_id
             WHERE r.id = %s
-            GROUP BY n.status, n.type
-            ORDER BY n.status, n.type
+            GROUP BY 1, n.type
+            ORDER BY 1, n.type
         """, (user_id,))
         
         stats = {
@@ -253,10 +307,10 @@ def get_notification_stats(user_id):
         # Get most recent notification
         cursor.execute("""
             SELECT n.message, n.timestamp
-            FROM notification n
-            JOIN receive r ON n.notification_id = r.notification_id
+            FROM receive r
+            JOIN notification n ON n.notification_id = r.notification_id
             WHERE r.id = %s
-            ORDER BY n.timestamp DESC
+            ORDER BY r.received_at DESC, r.notification_id DESC
             LIMIT 1
         """, (user_id,))
         
@@ -283,58 +337,52 @@ def get_notification_stats(user_id):
         conn.close()
 
 # Create a custom notification (for creating manual notifications eksik kalan functionalitylerde buradan esinlenilebiliriz)
+# Recipients are either "user_ids" (a list) or an "audience" resolved on the
+# server (see notifications.AUDIENCES), e.g. {"audience": "course_students", "course_id": "C0000001"}
 @notification_bp.route("/api/notifications/create", methods=["POST"])
 def create_notification():
 
-    data = request.json
-    required_fields = ["type", "message", "user_ids"]
+    data = request.json or {}
+    required_fields = ["type", "message"]
     
-    if not all(field in data for field in required_fields):
+    if not all(field in data for field in required_fields) or ("user_ids" not in data and "audience" not in data):
         return jsonify({"success": False, "message": "Missing required fields"}), 400
-    
-    if not data["user_ids"] or not isinstance(data["user_ids"], list):
+
+    audience = data.get("audience")
+    if audience is None and (not data["user_ids"] or not isinstance(data["user_ids"], list)):
         return jsonify({"success": False, "message": "user_ids must be a non-empty list"}), 400
+    if audience is not None:
+        error = audience_params(audience, data)
+        if error:
+            return jsonify({"success": False, "message": error}), 400
     
     conn = connect_project_db()
     cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
     
     try:
-        # Verify all users exist
-        user_ids_str = ",".join([f"'{uid}'" for uid in data["user_ids"]])
-        cursor.execute(f'SELECT id FROM "user" WHERE id IN ({user_ids_str})')
-        found_users = [row["id"] for row in cursor.fetchall()]
-        
-        if len(found_users) != len(data["user_ids"]):
-            return jsonify({"success": False, "message": "One or more users not found"}), 404
-        
-        # Generate a notification ID
-        notification_id = f"N{uuid.uuid4().hex[:7].upper()}"
-        
-        # Create notification
-        cursor.execute("""
-            INSERT INTO notification (
-                notification_id, type, entity_type, entity_id, message
-            ) VALUES (%s, %s, %s, %s, %s)
-        """, (
-            notification_id,
-            data["type"],
-            data.get("entity_type"),
-            data.get("entity_id"),
-            data["message"]
-        ))
-        
-        # Create receive entries for all users
-        for user_id in data["user_ids"]:
-            cursor.execute("""
-                INSERT INTO receive (notification_id, id)
-                VALUES (%s, %s)
-            """, (notification_id, user_id))
-        
-        conn.commit()
+        if audience is None:
+            # Verify all users exist
+            user_ids = list(dict.fromkeys(data["user_ids"]))
+            if missing_users(cursor, user_ids):
+                return jsonify({"success": False, "message": "One or more users not found"}), 404
+
+            notification_id = insert_notification(
+                cursor, data["type"], data["message"], data.get("entity_type"), data.get("entity_id")
+            )
+            delivered = deliver_to_users(cursor, notification_id, user_ids)
+            conn.commit()
+        else:
+            # Chunked INSERT ... SELECT, committed chunk by chunk
+            notification_id = insert_notification(
+                cursor, data["type"], data["message"], data.get("entity_type"), data.get("entity_id")
+            )
+            delivered = fan_out(conn, notification_id, audience, data)
+
         return jsonify({
             "success": True, 
-            "message": f"Notification sent to {len(data['user_ids'])} users",
-            "notification_id": notification_id
+            "message": f"Notification sent to {delivered} users",
+            "notification_id": notification_id,
+            "recipient_count": delivered
         }), 201
         
     except Exception as e:
@@ -344,4 +392,4 @@ def create_notification():
     
     finally:
         cursor.close()
-        conn.close()
\ No newline at end of file
+        conn.close()
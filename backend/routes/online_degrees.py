@@ -1,16 +1,101 @@
+import base64
+import binascii
+import datetime as dt
+import json
+import re
+from decimal import Decimal
 from flask import Blueprint, request, jsonify
-from db import connect_project_db
+from db import get_db
 
 online_degrees_bp = Blueprint("online_degrees_bp", __name__)
 
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# sort option -> (key expression over the catalog row q, direction, SQL type of the key)
+# NULLs are folded into a constant so keys are totally ordered; the
+# course.idx_course_catalog_* indexes are built on the same expressions.
+SORT_KEYS = {
+    "newest": ("COALESCE(q.creation_date, DATE '0001-01-01')", "DESC", "date"),
+    "most_enrolled": ("COALESCE(q.enrollment_count, 0)", "DESC", "integer"),
+    "price_low_to_high": ("COALESCE(q.price, 0)", "ASC", "integer"),
+    "price_high_to_low": ("COALESCE(q.price, 0)", "DESC", "integer"),
+    # enrollment_count * 0.5 - days since creation * 0.1, scaled by 10 and shifted
+    # by a constant so it no longer depends on CURRENT_DATE (same order, indexable)
+    "relevance": (
+        "(COALESCE(q.enrollment_count, 0) * 5"
+        " + (COALESCE(q.creation_date, DATE '1970-01-01') - DATE '1970-01-01'))",
+        "DESC",
+        "integer",
+    ),
+}
+
+# Internal: what "relevance" becomes when there is a search term. Only then is
+# q.search_rank selected, so it is not one of the client-facing SORT_KEYS.
+SEARCH_RANK_SORT = ("q.search_rank", "DESC", "float8")
+
+
+def encode_cursor(sort, last_key, last_id):
+    """Opaque page cursor holding the sort option and the last row's sort key and course_id."""
+    if isinstance(last_key, (dt.date, dt.datetime)):
+        last_key = last_key.isoformat()
+    elif isinstance(last_key, Decimal):
+        last_key = float(last_key)
+    raw = json.dumps([sort, last_key, last_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(value):
+    """Inverse of encode_cursor. Raises ValueError for malformed cursors."""
+    try:
+        sort, last_key, last_id = json.loads(base64.urlsafe_b64decode(value.encode()))
+    except (TypeError, binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("malformed cursor") from e
+    return sort, last_key, last_id
+
+
+def estimate_row_count(cursor, query, values):
+    """Planner's row estimate for `query` (cheap, unlike COUNT(*) over the whole catalog)."""
+    cursor.execute("EXPLAIN (FORMAT JSON) " + query, values)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def build_search_query(search_term):
+    """
+    Turn free text into a prefix-matching tsquery string, e.g. "data sci" ->
+    "data:* & sci:*". Returns None if the text has no searchable words.
+    """
+    words = re.findall(r"\w+", search_term.lower())
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+
 @online_degrees_bp.route("/api/degrees", methods=["GET"])
 def get_online_degrees():
     try:
-        conn = connect_project_db()
-        cursor = conn.cursor()
+        cursor = get_db().cursor(dict_cursor=False)
+
+        values = []
+
+        # General search term: full-text match on course.search_vector (title,
+        # category, description, instructor name) with prefix matching, plus
+        # trigram similarity on the title to tolerate typos
+        search_term = request.args.get("search", "").strip()
+        ts_query = build_search_query(search_term) if search_term else None
+        search_rank = ""
+        if ts_query:
+            search_rank = """,
+                (ts_rank_cd(c.search_vector, to_tsquery('simple', %s))
+                    + word_similarity(%s, c.title))::float8 AS search_rank"""
+            values.extend([ts_query, search_term])
 
         # Base query
-        base_query = """
+        base_query = f"""
             SELECT 
                 c.course_id,
                 c.title,
@@ -21,7 +106,7 @@ def get_online_degrees():
                 c.difficulty_level,
                 c.creation_date,
                 c.last_update_date,
-                c.enrollment_count
+                c.enrollment_count{search_rank}
             FROM course c
             JOIN instructor i ON c.creator_id = i.id
             JOIN "user" u ON u.id = i.id
@@ -29,7 +114,6 @@ def get_online_degrees():
         """
 
         filters = []
-        values = []
 
         # Title
         search_title = request.args.get("title")
@@ -88,46 +172,92 @@ def get_online_degrees():
             filters.append("c.difficulty_level = %s")
             values.append(level)
 
-        # General search term (searches title, category, description, instructor name)
-        search_term = request.args.get("search", "")
-        if search_term:
-            filters.append("""
-                (
-                    c.title ILIKE %s OR
-                    c.category ILIKE %s OR
-                    c.description ILIKE %s OR
-                    CONCAT_WS(' ', u.first_name, u.middle_name, u.last_name) ILIKE %s
-                )
-            """)
-            values.extend([f"%{search_term}%"] * 4)
+        if ts_query:
+            filters.append("(c.search_vector @@ to_tsquery('simple', %s) OR %s <%% c.title)")
+            values.extend([ts_query, search_term])
 
         # Append filters
         if filters:
             base_query += " AND " + " AND ".join(filters)
 
-        # Sorting
+        # Sorting: every option orders by a stable (sort key, course_id) pair
+        # so results can be paged with a keyset cursor
         sort = request.args.get("sort", "relevance")
-        if sort == "newest":
-            base_query += " ORDER BY c.creation_date DESC"
-        elif sort == "most_enrolled":
-            base_query += " ORDER BY c.enrollment_count DESC"
-        elif sort == "price_low_to_high":
-            base_query += " ORDER BY c.price ASC"
-        elif sort == "price_high_to_low":
-            base_query += " ORDER BY c.price DESC"
-        else:  # default: relevance
-            base_query += " ORDER BY (c.enrollment_count * 0.5 + (CURRENT_DATE - c.creation_date) * -0.1) DESC"
-
-        cursor.execute(base_query, values)
+        if sort not in SORT_KEYS:
+            sort = "relevance"
+        if sort == "relevance" and ts_query:
+            sort = "search_rank"  # best text match first
+            key_sql, direction, key_type = SEARCH_RANK_SORT
+        else:
+            key_sql, direction, key_type = SORT_KEYS[sort]
+
+        limit = min(max(request.args.get("limit", DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+
+        query = f"SELECT q.*, {key_sql} AS sort_key FROM ({base_query}) q"
+        query_values = list(values)
+
+        after = request.args.get("cursor")
+        if after:
+            try:
+                cursor_sort, last_key, last_id = decode_cursor(after)
+            except ValueError:
+                return jsonify({"success": False, "message": "Invalid cursor"}), 400
+            if cursor_sort != sort:
+                return jsonify({"success": False, "message": "Cursor does not match the sort option"}), 400
+            comparison = "<" if direction == "DESC" else ">"
+            query += f" WHERE ({key_sql}, q.course_id) {comparison} (%s::{key_type}, %s)"
+            query_values.extend([last_key, last_id])
+
+        query += f" ORDER BY {key_sql} {direction}, q.course_id {direction} LIMIT %s"
+        query_values.append(limit + 1)  # one extra row tells us whether there is a next page
+
+        cursor.execute(query, query_values)
         rows = cursor.fetchall()
         keys = [desc[0] for desc in cursor.description]
-        return jsonify([dict(zip(keys, row)) for row in rows])
+        courses = [dict(zip(keys, row)) for row in rows]
+
+        next_cursor = None
+        if len(courses) > limit:
+            courses = courses[:limit]
+            next_cursor = encode_cursor(sort, courses[-1]["sort_key"], courses[-1]["course_id"])
+        for course in courses:
+            course.pop("sort_key")
+
+        response = {"success": True, "courses": courses, "next_cursor": next_cursor}
+        if request.args.get("include_total", "false").lower() == "true":
+            response["total_estimate"] = estimate_row_count(cursor, base_query, values)
+        return jsonify(response)
 
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
 
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+
+@online_degrees_bp.route("/api/degrees/facets", methods=["GET"])
+def get_online_degree_facets():
+    """Filter choices for the catalog: categories, instructor names and levels of accepted courses."""
+    try:
+        cursor = get_db().cursor(dict_cursor=False)
+        cursor.execute("""
+            SELECT
+                ARRAY(SELECT DISTINCT category FROM course
+                      WHERE status = 'accepted' AND category IS NOT NULL
+                      ORDER BY category) AS categories,
+                ARRAY(SELECT DISTINCT CONCAT_WS(' ', u.first_name, u.middle_name, u.last_name)
+                      FROM course c
+                      JOIN "user" u ON u.id = c.creator_id
+                      WHERE c.status = 'accepted'
+                      ORDER BY 1) AS instructors,
+                ARRAY(SELECT DISTINCT difficulty_level FROM course
+                      WHERE status = 'accepted' AND difficulty_level IS NOT NULL
+                      ORDER BY difficulty_level) AS levels
+        """)
+        categories, instructors, levels = cursor.fetchone()
+        return jsonify({
+            "success": True,
+            "categories": categories,
+            "instructors": instructors,
+            "levels": levels,
+        })
+
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
@@ -1,9 +1,149 @@
 from flask import Blueprint, request, jsonify
 from db import connect_project_db
 import psycopg2.extras
+import base64
+import binascii
+import datetime as dt
+import json
 
 profile_bp = Blueprint("profile", __name__, url_prefix="/api/profile")
 
+# Instructor feedback pages (newest first, keyset over date / course / student)
+FEEDBACK_PAGE_SIZE = 10
+FEEDBACK_MAX_PAGE_SIZE = 100
+
+# One page of an instructor's feedback, as JSON objects. Reads one row more
+# than the page so the caller knows whether another page follows.
+FEEDBACK_PAGE_SQL = """
+    SELECT COALESCE(json_agg(fb ORDER BY fb.feedback_date DESC NULLS LAST, fb.course_id DESC, fb.student_id DESC), '[]'::json)
+    FROM (
+        SELECT f.rating, f.comment, f.feedback_date, c.title AS course_title, f.course_id, f.student_id
+        FROM feedback f
+        JOIN course c ON f.course_id = c.course_id
+        WHERE c.creator_id = %(user_id)s
+          AND (%(after_date)s::DATE IS NULL
+               OR (COALESCE(f.feedback_date, DATE '0001-01-01'), f.course_id, f.student_id)
+                  < (%(after_date)s::DATE, %(after_course)s, %(after_student)s))
+        ORDER BY COALESCE(f.feedback_date, DATE '0001-01-01') DESC, f.course_id DESC, f.student_id DESC
+        LIMIT %(feedback_limit)s + 1
+    ) fb
+"""
+
+# The whole profile in one statement: the user row plus a JSON document with
+# everything its role shows, built by the branch of the CASE matching the role
+PROFILE_SQL = f"""
+    SELECT u.id, u.first_name, u.middle_name, u.last_name,
+           u.email, u.phone_no, u.birth_date, u.registration_date,
+           uwa.age, u.role,
+           CASE u.role
+           WHEN 'admin' THEN (
+               SELECT json_build_object(
+                   'report_count', a.report_count,
+                   'approved_courses', COALESCE(json_agg(ac) FILTER (WHERE ac.status = 'accepted'), '[]'::json),
+                   'rejected_courses', COALESCE(json_agg(ac) FILTER (WHERE ac.status = 'rejected'), '[]'::json)
+               )
+               FROM admin a
+               LEFT JOIN LATERAL (
+                   SELECT c.course_id, c.title, c.description, c.category, c.price,
+                          c.creation_date, c.difficulty_level, c.status
+                   FROM course c
+                   WHERE c.approver_id = a.id AND c.status IN ('accepted', 'rejected')
+               ) ac ON TRUE
+               WHERE a.id = u.id
+               GROUP BY a.id, a.report_count
+           )
+           WHEN 'instructor' THEN (
+               SELECT json_build_object(
+                   'i_rating', i.i_rating,
+                   'course_count', i.course_count,
+                   'experience_year', iwe.experience_year,
+                   'courses', COALESCE((
+                       SELECT json_agg(json_build_object(
+                           'course_id', c.course_id, 'title', c.title, 'category', c.category,
+                           'price', c.price, 'creation_date', c.creation_date,
+                           'difficulty_level', c.difficulty_level
+                       ))
+                       FROM course c
+                       WHERE c.creator_id = i.id
+                   ), '[]'::json),
+                   'feedback_count', i.rating_count,
+                   'feedbacks', ({FEEDBACK_PAGE_SQL})
+               )
+               FROM instructor i
+               JOIN instructor_with_experience_year iwe ON i.id = iwe.id
+               WHERE i.id = u.id
+           )
+           WHEN 'student' THEN (
+               SELECT json_build_object(
+                   'major', s.major,
+                   'certificate_count', s.certificate_count,
+                   'certificates', COALESCE((
+                       SELECT json_agg(c.title)
+                       FROM earn_certificate ec
+                       JOIN certificate c ON ec.certificate_id = c.certificate_id
+                       WHERE ec.student_id = s.id
+                   ), '[]'::json),
+                   -- one pass over the enrollments, split by progress
+                   'enrolled_courses', COALESCE(json_agg(ec) FILTER (WHERE ec.progress_rate < 100), '[]'::json),
+                   'completed_courses', COALESCE(json_agg(ec) FILTER (WHERE ec.progress_rate = 100), '[]'::json)
+               )
+               FROM student s
+               LEFT JOIN LATERAL (
+                   SELECT co.course_id, co.title, co.category, co.difficulty_level,
+                          u_inst.first_name || ' ' || u_inst.last_name AS instructor_name,
+                          e.progress_rate
+                   FROM enroll e
+                   JOIN course co       ON e.course_id = co.course_id
+                   JOIN instructor i    ON co.creator_id = i.id
+                   JOIN "user" u_inst   ON i.id = u_inst.id
+                   WHERE e.student_id = s.id
+               ) ec ON TRUE
+               WHERE s.id = u.id
+               GROUP BY s.id, s.major, s.certificate_count
+           )
+           END AS role_info
+    FROM "user" u
+    JOIN user_with_age uwa ON u.id = uwa.id
+    WHERE u.id = %(user_id)s
+"""
+
+ROLE_INFO_KEYS = {"admin": "admin_info", "instructor": "instructor_info", "student": "student_info"}
+
+
+def encode_feedback_cursor(feedback):
+    """Opaque cursor pointing after the given feedback item."""
+    raw = json.dumps([feedback["feedback_date"] or "0001-01-01", feedback["course_id"], feedback["student_id"]])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_feedback_cursor(value):
+    """Inverse of encode_feedback_cursor. Raises ValueError for malformed cursors."""
+    try:
+        feedback_date, course_id, student_id = json.loads(base64.urlsafe_b64decode(value.encode()))
+        return dt.date.fromisoformat(feedback_date), str(course_id), str(student_id)
+    except (TypeError, ValueError, binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError("malformed cursor") from e
+
+
+def _feedback_params(user_id, after=None, limit=FEEDBACK_PAGE_SIZE):
+    after_date, after_course, after_student = after or (None, None, None)
+    return {
+        "user_id": user_id,
+        "after_date": after_date,
+        "after_course": after_course,
+        "after_student": after_student,
+        "feedback_limit": limit,
+    }
+
+
+def _feedback_page(items, limit):
+    """Trim the look-ahead row off a feedback page. Returns (items, next_cursor)."""
+    next_cursor = encode_feedback_cursor(items[limit - 1]) if len(items) > limit else None
+    items = items[:limit]
+    for item in items:
+        del item["student_id"]
+    return items, next_cursor
+
 
 @profile_bp.route("", methods=["POST"])
 def get_profile():
@@ -17,17 +157,7 @@ def get_profile():
     cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
 
     try:
-        cursor.execute(
-            """
-            SELECT u.id, u.first_name, u.middle_name, u.last_name, 
-                   u.email, u.phone_no, u.birth_date, u.registration_date, 
-                   uwa.age, u.role
-            FROM "user" u
-            JOIN user_with_age uwa ON u.id = uwa.id
-            WHERE u.id = %s
-        """,
-            (user_id,),
-        )
+        cursor.execute(PROFILE_SQL, _feedback_params(user_id))
         user = cursor.fetchone()
 
         if not user:
@@ -49,224 +179,20 @@ def get_profile():
             "role": user["role"],
         }
 
-        if user["role"] == "admin":
-            cursor.execute(
-                """
-                SELECT report_count
-                FROM admin
-                WHERE id = %s
-                """,
-                (user_id,),
-            )
-            admin = cursor.fetchone()
-
-            if not admin:
+        role_key = ROLE_INFO_KEYS.get(user["role"])
+        if role_key:
+            role_info = user["role_info"]
+            if role_info is None:
                 return (
-                    jsonify({"success": False, "message": "Admin record not found"}),
+                    jsonify({"success": False, "message": f"{user['role'].capitalize()} record not found"}),
                     404,
                 )
-
-            cursor.execute(
-                """
-                SELECT course_id, title, description, category, price, creation_date, difficulty_level
-                FROM course
-                WHERE approver_id = %s AND status = 'accepted'
-                """,
-                (user_id,),
-            )
-            approved_courses = [
-                {
-                    "course_id": row["course_id"],
-                    "title": row["title"],
-                    "description": row["description"],
-                    "category": row["category"],
-                    "price": row["price"],
-                    "creation_date": row["creation_date"],
-                    "difficulty_level": row["difficulty_level"],
-                }
-                for row in cursor.fetchall()
-            ]
-
-            cursor.execute(
-                """
-                SELECT course_id, title, description, category, price, creation_date, difficulty_level
-                FROM course
-                WHERE approver_id = %s AND status = 'rejected'
-                """,
-                (user_id,),
-            )
-            rejected_courses = [
-                {
-                    "course_id": row["course_id"],
-                    "title": row["title"],
-                    "description": row["description"],
-                    "category": row["category"],
-                    "price": row["price"],
-                    "creation_date": row["creation_date"],
-                    "difficulty_level": row["difficulty_level"],
-                }
-                for row in cursor.fetchall()
-            ]
-
-            profile_data["admin_info"] = {
-                "report_count": admin["report_count"],
-                "approved_courses": approved_courses,
-                "rejected_courses": rejected_courses,
-            }
-
-        if user["role"] == "instructor":
-            cursor.execute(
-                """
-                SELECT i.i_rating, i.course_count, iwe.experience_year
-                FROM instructor i
-                JOIN instructor_with_experience_year iwe ON i.id = iwe.id
-                WHERE i.id = %s
-                """,
-                (user_id,),
-            )
-            instructor = cursor.fetchone()
-
-            cursor.execute(
-                """
-                SELECT course_id, title, category, price, creation_date, difficulty_level
-                FROM course
-                WHERE creator_id = %s
-                """,
-                (user_id,),
-            )
-            instructor_courses = [
-                {
-                    "course_id": row["course_id"],
-                    "title": row["title"],
-                    "category": row["category"],
-                    "price": row["price"],
-                    "creation_date": row["creation_date"],
-                    "difficulty_level": row["difficulty_level"],
-                }
-                for row in cursor.fetchall()
-            ]
-
-            cursor.execute(
-                """
-                SELECT f.rating, f.comment, f.feedback_date, c.title AS course_title
-                FROM feedback f
-                JOIN course c ON f.course_id = c.course_id
-                WHERE c.creator_id = %s
-                """,
-                (user_id,),
-            )
-            instructor_feedbacks = [
-                {
-                    "rating": row["rating"],
-                    "comment": row["comment"],
-                    "feedback_date": row["feedback_date"],
-                    "course_title": row["course_title"],
-                }
-                for row in cursor.fetchall()
-            ]
-
-            profile_data["instructor_info"] = {
-                "i_rating": instructor["i_rating"],
-                "course_count": instructor["course_count"],
-                "experience_year": instructor["experience_year"],
-                "courses": instructor_courses,
-                "feedbacks": instructor_feedbacks,
-            }
-
-        if user["role"] == "student":
-
-            # basic student info
-            cursor.execute(
-                """
-            SELECT major, certificate_count
-            FROM student
-            WHERE id = %s
-            """,
-                (user_id,),
-            )
-            student = cursor.fetchone()
-
-            # certificates…
-            cursor.execute(
-                """
-                SELECT c.title
-                FROM earn_certificate ec
-                JOIN certificate c ON ec.certificate_id = c.certificate_id
-                WHERE ec.student_id = %s
-                """,
-                (user_id,),
-            )
-            certificates = [r["title"] for r in cursor.fetchall()]
-
-            # continuing courses (<100%)
-            cursor.execute(
-                """
-                SELECT
-                  co.course_id,
-                  co.title,
-                  co.category,
-                  co.difficulty_level,
-                  u_inst.first_name || ' ' || u_inst.last_name AS instructor_name,
-                  e.progress_rate
-                FROM enroll e
-                JOIN course co       ON e.course_id = co.course_id
-                JOIN instructor i    ON co.creator_id = i.id
-                JOIN "user" u_inst   ON i.id = u_inst.id
-                WHERE e.student_id = %s
-                  AND e.progress_rate < 100
-                """,
-                (user_id,),
-            )
-            enrolled_courses = [
-                {
-                    "course_id": r["course_id"],
-                    "title": r["title"],
-                    "category": r["category"],
-                    "difficulty_level": r["difficulty_level"],
-                    "instructor_name": r["instructor_name"],
-                    "progress_rate": r["progress_rate"],
-                }
-                for r in cursor.fetchall()
-            ]
-
-            # completed courses (==100%)
-            cursor.execute(
-                """
-                SELECT
-                  co.course_id,
-                  co.title,
-                  co.category,
-                  co.difficulty_level,
-                  u_inst.first_name || ' ' || u_inst.last_name AS instructor_name,
-                  e.progress_rate
-                FROM enroll e
-                JOIN course co       ON e.course_id = co.course_id
-                JOIN instructor i    ON co.creator_id = i.id
-                JOIN "user" u_inst   ON i.id = u_inst.id
-                WHERE e.student_id = %s
-                  AND e.progress_rate = 100
-                """,
-                (user_id,),
-            )
-            completed_courses = [
-                {
-                    "course_id": r["course_id"],
-                    "title": r["title"],
-                    "category": r["category"],
-                    "difficulty_level": r["difficulty_level"],
-                    "instructor_name": r["instructor_name"],
-                    "progress_rate": r["progress_rate"],
-                }
-                for r in cursor.fetchall()
-            ]
-
-            profile_data["student_info"] = {
-                "major": student["major"],
-                "certificate_count": student["certificate_count"],
-                "certificates": certificates,
-                "enrolled_courses": enrolled_courses,
-                "completed_courses": completed_courses,
-            }
+            if user["role"] == "instructor":
+                # First page only; the rest comes from GET /api/profile/<id>/feedback
+                role_info["feedbacks"], role_info["feedback_next_cursor"] = _feedback_page(
+                    role_info["feedbacks"], FEEDBACK_PAGE_SIZE
+                )
+            profile_data[role_key] = role_info
 
         return jsonify({"success": True, "profile": profile_data}), 200
 
@@ -278,6 +204,34 @@ def get_profile():
         cursor.close()
         conn.close()
 
+
+@profile_bp.route("/<user_id>/feedback", methods=["GET"])
+def get_profile_feedback(user_id):
+    limit = request.args.get("limit", type=int, default=FEEDBACK_PAGE_SIZE)
+    limit = max(1, min(limit, FEEDBACK_MAX_PAGE_SIZE))
+    after = None
+    if request.args.get("cursor"):
+        try:
+            after = decode_feedback_cursor(request.args["cursor"])
+        except ValueError:
+            return jsonify({"success": False, "message": "Invalid cursor"}), 400
+
+    conn = connect_project_db()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(FEEDBACK_PAGE_SQL, _feedback_params(user_id, after, limit))
+        feedbacks, next_cursor = _feedback_page(cursor.fetchone()[0], limit)
+        return jsonify({"success": True, "feedbacks": feedbacks, "next_cursor": next_cursor}), 200
+
+    except Exception as e:
+        print("Profile feedback fetch error:", e)
+        return jsonify({"success": False, "message": "Internal server error"}), 500
+
+    finally:
+        cursor.close()
+        conn.close()
+
 @profile_bp.route("/basic", methods=["POST"])
 def get_basic_profile():
     data = request.json
@@ -1,16 +1,34 @@
 from flask import Blueprint, request, jsonify
-from db import connect_project_db
+from db import get_db
+from prepared import execute_prepared
 
 student_home_bp = Blueprint("student_home_bp", __name__)
 
+# Recommendations are every accepted course the student is not enrolled in,
+# priority 1 when it is in one of the student's categories. The categories
+# are precomputed per student in student_category (maintained by triggers on
+# enroll and course), so this is one pass over the accepted courses with
+# indexed lookups. Takes the student id twice.
+RECOMMENDED_COURSES_SQL = """
+    SELECT c.course_id, c.title, c.category, c.difficulty_level, c.enrollment_count,
+           CASE WHEN sc.category IS NULL THEN 2 ELSE 1 END AS priority
+    FROM course c
+    LEFT JOIN student_category sc ON sc.student_id = %s AND sc.category = c.category
+    WHERE c.status = 'accepted'
+      AND NOT EXISTS (
+          SELECT 1 FROM enroll e WHERE e.student_id = %s AND e.course_id = c.course_id
+      )
+"""
+RECOMMENDED_COURSES_ORDER = "ORDER BY priority, c.enrollment_count DESC, c.course_id"
+
+
 @student_home_bp.route("/api/student/<student_id>/info", methods=["GET"])
 def get_student_info(student_id):
     try:
-        conn = connect_project_db()
-        cursor = conn.cursor()
+        cursor = get_db().cursor(dict_cursor=False)
 
         # Check if this is a student
-        cursor.execute('SELECT 1 FROM student WHERE id = %s', (student_id,))
+        execute_prepared(cursor, "student_exists", (student_id,))
         if cursor.fetchone() is None:
             return jsonify({"success": False, "message": "Student not found"}), 404
 
@@ -28,44 +46,19 @@ def get_student_info(student_id):
     
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
-    
-    finally:
-        cursor.close()
-        conn.close()
 
 
 @student_home_bp.route("/api/student/<student_id>/recommended-courses/all", methods=["GET"])
 def get_all_recommended_courses(student_id):
     try:
-        conn = connect_project_db()
-        cursor = conn.cursor()
+        cursor = get_db().cursor(dict_cursor=False)
 
         # Check student exists
-        cursor.execute("SELECT 1 FROM student WHERE id = %s", (student_id,))
+        execute_prepared(cursor, "student_exists", (student_id,))
         if not cursor.fetchone():
             return jsonify({"success": False, "message": "Student not found"}), 404
 
-        cursor.execute("""
-            (
-                SELECT *, 1 AS priority
-                FROM recommended_course_base
-                WHERE category IN (
-                    SELECT category FROM enrolled_course_categories WHERE student_id = %s
-                )
-                AND course_id NOT IN (
-                    SELECT course_id FROM enroll WHERE student_id = %s
-                )
-            )
-            UNION
-            (
-                SELECT *, 2 AS priority
-                FROM recommended_course_base
-                WHERE course_id NOT IN (
-                    SELECT course_id FROM enroll WHERE student_id = %s
-                )
-            )
-            ORDER BY priority, enrollment_count DESC, course_id
-        """, (student_id, student_id, student_id))
+        cursor.execute(RECOMMENDED_COURSES_SQL + RECOMMENDED_COURSES_ORDER, (student_id, student_id))
 
         rows = cursor.fetchall()
         keys = [desc[0] for desc in cursor.description]
@@ -74,43 +67,17 @@ def get_all_recommended_courses(student_id):
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
 
-    finally:
-        cursor.close()
-        conn.close()
-
 
 @student_home_bp.route("/api/student/<student_id>/recommended-courses/top10", methods=["GET"])
 def get_top10_recommended_courses(student_id):
     try:
-        conn = connect_project_db()
-        cursor = conn.cursor()
+        cursor = get_db().cursor(dict_cursor=False)
 
-        cursor.execute("SELECT 1 FROM student WHERE id = %s", (student_id,))
+        execute_prepared(cursor, "student_exists", (student_id,))
         if not cursor.fetchone():
             return jsonify({"success": False, "message": "Student not found"}), 404
 
-        cursor.execute("""
-            (
-                SELECT *, 1 AS priority
-                FROM recommended_course_base
-                WHERE category IN (
-                    SELECT category FROM enrolled_course_categories WHERE student_id = %s
-                )
-                AND course_id NOT IN (
-                    SELECT course_id FROM enroll WHERE student_id = %s
-                )
-            )
-            UNION
-            (
-                SELECT *, 2 AS priority
-                FROM recommended_course_base
-                WHERE course_id NOT IN (
-                    SELECT course_id FROM enroll WHERE student_id = %s
-                )
-            )
-            ORDER BY priority, enrollment_count DESC, course_id
-            LIMIT 10
-        """, (student_id, student_id, student_id))
+        cursor.execute(RECOMMENDED_COURSES_SQL + RECOMMENDED_COURSES_ORDER + " LIMIT 10", (student_id, student_id))
 
         rows = cursor.fetchall()
         keys = [desc[0] for desc in cursor.description]
@@ -119,70 +86,39 @@ def get_top10_recommended_courses(student_id):
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
 
-    finally:
-        cursor.close()
-        conn.close()
-
 
 @student_home_bp.route("/api/student/<student_id>/recommended-courses/search", methods=["GET"])
 def search_recommended_courses(student_id):
     search_term = request.args.get("q", "")
     try:
-        conn = connect_project_db()
-        cursor = conn.cursor()
+        cursor = get_db().cursor(dict_cursor=False)
 
-        cursor.execute("SELECT 1 FROM student WHERE id = %s", (student_id,))
+        execute_prepared(cursor, "student_exists", (student_id,))
         if not cursor.fetchone():
             return jsonify({"success": False, "message": "Student not found"}), 404
 
-        query = f"""
-            (
-                SELECT *, 1 AS priority
-                FROM recommended_course_base
-                WHERE category IN (
-                    SELECT category FROM enrolled_course_categories WHERE student_id = %s
-                )
-                AND course_id NOT IN (
-                    SELECT course_id FROM enroll WHERE student_id = %s
-                )
-            )
-            UNION
-            (
-                SELECT *, 2 AS priority
-                FROM recommended_course_base
-                WHERE course_id NOT IN (
-                    SELECT course_id FROM enroll WHERE student_id = %s
-                )
-            )
-        """
-        cursor.execute(query, (student_id, student_id, student_id))
+        # Case-insensitive substring match on title or category, done in SQL
+        pattern = "%" + search_term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        cursor.execute(
+            RECOMMENDED_COURSES_SQL
+            + " AND (c.title ILIKE %s OR c.category ILIKE %s) "
+            + RECOMMENDED_COURSES_ORDER,
+            (student_id, student_id, pattern, pattern),
+        )
         rows = cursor.fetchall()
         keys = [desc[0] for desc in cursor.description]
-
-        filtered = []
-        for row in rows:
-            course = dict(zip(keys, row))
-            if search_term.lower() in course["title"].lower() or search_term.lower() in course["category"].lower():
-                filtered.append(course)
-
-        filtered = sorted(filtered, key=lambda x: (x["priority"], -x["enrollment_count"], x["course_id"]))
-        return jsonify(filtered)
+        return jsonify([dict(zip(keys, row)) for row in rows])
 
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
 
-    finally:
-        cursor.close()
-        conn.close()
-
 
 @student_home_bp.route("/api/student/<student_id>/recommended-categories/all", methods=["GET"])
 def get_all_recommended_categories(student_id):
     try:
-        conn = connect_project_db()
-        cursor = conn.cursor()
+        cursor = get_db().cursor(dict_cursor=False)
 
-        cursor.execute("SELECT 1 FROM student WHERE id = %s", (student_id,))
+        execute_prepared(cursor, "student_exists", (student_id,))
         if not cursor.fetchone():
             return jsonify({"success": False, "message": "Student not found"}), 404
 
@@ -218,18 +154,14 @@ def get_all_recommended_categories(student_id):
     
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
-    finally:
-        cursor.close()
-        conn.close()
 
 
 @student_home_bp.route("/api/student/<student_id>/recommended-categories/top5", methods=["GET"])
 def get_top5_recommended_categories(student_id):
     try:
-        conn = connect_project_db()
-        cursor = conn.cursor()
+        cursor = get_db().cursor(dict_cursor=False)
 
-        cursor.execute("SELECT 1 FROM student WHERE id = %s", (student_id,))
+        execute_prepared(cursor, "student_exists", (student_id,))
         if not cursor.fetchone():
             return jsonify({"success": False, "message": "Student not found"}), 404
 
@@ -266,18 +198,14 @@ def get_top5_recommended_categories(student_id):
     
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
-    finally:
-        cursor.close()
-        conn.close()
 
 @student_home_bp.route("/api/student/<student_id>/enrolled-courses", methods=["GET"])
 def get_enrolled_courses(student_id):
     try:
-        conn = connect_project_db()
-        cursor = conn.cursor()
+        cursor = get_db().cursor(dict_cursor=False)
 
         # Check if the student exists
-        cursor.execute('SELECT 1 FROM student WHERE id = %s', (student_id,))
+        execute_prepared(cursor, "student_exists", (student_id,))
         if cursor.fetchone() is None:
             return jsonify({"success": False, "message": "Student not found"}), 404
 
@@ -304,8 +232,4 @@ def get_enrolled_courses(student_id):
         return jsonify(course_list)
 
     except Exception as e:
-        return jsonify({"success": False, "message": str(e)}), 500
-
-    finally:
-        cursor.close()
-        conn.close()
\ No newline at end of file
+        return jsonify({"success": False, "message": str(e)}), 500
\ No newline at end of file
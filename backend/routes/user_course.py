@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from db import connect_project_db
+from prepared import execute_prepared
 import psycopg2.extras
 from datetime import datetime
 
@@ -11,9 +12,7 @@ def enroll(course_id, student_id):
     cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
     try:
         # Check if course is accepted
-        cursor.execute("""
-            SELECT status FROM course WHERE course_id = %s
-        """, (course_id,))
+        execute_prepared(cursor, "course_status", (course_id,))
         course = cursor.fetchone()
 
         if course is None:
@@ -46,9 +45,7 @@ def check_enrollment(course_id, student_id):
     conn = connect_project_db()
     cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
     try:
-        cursor.execute("""
-            SELECT 1 FROM enroll WHERE course_id = %s AND student_id = %s
-        """, (course_id, student_id))
+        execute_prepared(cursor, "enrollment_exists", (course_id, student_id))
         enrolled = cursor.fetchone() is not None
         return jsonify({"enrolled": enrolled})
     except Exception as e:
@@ -1,3 +1,7 @@
+-- EXTENSIONS
+-- Trigram indexes for catalog search (see SEARCH section)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- USER TABLES
 CREATE TABLE "user" (
     id VARCHAR(8),
@@ -30,11 +34,21 @@ CREATE TABLE receive(
     notification_id VARCHAR(8),
     id VARCHAR(8),
     read_at TIMESTAMP,
+    received_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    archived_at TIMESTAMP,
     PRIMARY KEY (notification_id, id),
     FOREIGN KEY (notification_id) REFERENCES notification(notification_id) ON DELETE CASCADE,
     FOREIGN KEY (id) REFERENCES "user"(id) ON DELETE CASCADE
 );
 
+-- Unread notifications per user (read_at and archived_at both NULL), kept by the INBOX COUNTERS triggers
+CREATE TABLE notification_counter(
+    id VARCHAR(8),
+    unread_count INTEGER NOT NULL DEFAULT 0 CHECK (unread_count >= 0),
+    PRIMARY KEY (id),
+    FOREIGN KEY (id) REFERENCES "user"(id) ON DELETE CASCADE
+);
+
 CREATE TABLE student (
     id VARCHAR(8),
     major VARCHAR(50),
@@ -56,6 +70,8 @@ CREATE TABLE instructor (
     id VARCHAR(8),
     i_rating FLOAT CHECK (i_rating BETWEEN 0 AND 5),
     course_count INTEGER DEFAULT 0 CHECK (course_count >= 0),
+    rating_sum INTEGER NOT NULL DEFAULT 0 CHECK (rating_sum >= 0),
+    rating_count INTEGER NOT NULL DEFAULT 0 CHECK (rating_count >= 0),
     PRIMARY KEY (id),
     FOREIGN KEY (id) REFERENCES "user"(id) ON DELETE CASCADE ON UPDATE CASCADE
 );
@@ -72,10 +88,15 @@ CREATE TABLE course(
     last_update_date DATE,
     status VARCHAR(20) CHECK (status IN ('draft', 'pending', 'accepted', 'rejected')) DEFAULT 'draft',
     enrollment_count INTEGER CHECK (enrollment_count >= 0),
+    content_count INTEGER NOT NULL DEFAULT 0 CHECK (content_count >= 0),
     qna_link VARCHAR(100),
     difficulty_level INTEGER CHECK (difficulty_level BETWEEN 1 AND 5),
     creator_id VARCHAR(8) NOT NULL,
     approver_id VARCHAR(8),
+    search_vector TSVECTOR,
+    rating_sum INTEGER NOT NULL DEFAULT 0 CHECK (rating_sum >= 0),
+    rating_count INTEGER NOT NULL DEFAULT 0 CHECK (rating_count >= 0),
+    page_version INTEGER NOT NULL DEFAULT 0,
     PRIMARY KEY (course_id),
     FOREIGN KEY (creator_id) REFERENCES instructor(id) ON DELETE CASCADE,
     FOREIGN KEY (approver_id) REFERENCES admin(id) ON DELETE CASCADE
@@ -121,6 +142,7 @@ CREATE TABLE assessment(
     sec_id VARCHAR(8),
     content_id VARCHAR(8),
     question_count INTEGER CHECK (question_count >= 0),
+    question_version INTEGER NOT NULL DEFAULT 0,
     PRIMARY KEY (course_id, sec_id, content_id),
     FOREIGN KEY (course_id, sec_id, content_id) REFERENCES task(course_id, sec_id, content_id)
 );
@@ -199,6 +221,7 @@ CREATE TABLE enroll(
     student_id VARCHAR(8),
     enroll_date DATE, 
     progress_rate INTEGER CHECK (progress_rate BETWEEN 0 AND 100),
+    completed_count INTEGER NOT NULL DEFAULT 0 CHECK (completed_count >= 0),
     PRIMARY KEY (course_id, student_id),
     FOREIGN KEY (course_id) REFERENCES course(course_id) ON DELETE CASCADE,
     FOREIGN KEY (student_id) REFERENCES student(id) ON DELETE CASCADE
@@ -212,6 +235,11 @@ CREATE TABLE submit(
     grade INTEGER CHECK (grade BETWEEN 0 AND 100),
     submission_date DATE, 
     answers TEXT,
+    -- Multiple-choice part of an assessment that also has open-ended
+    -- questions, scored at submit time (answer_keys.py)
+    auto_points INTEGER CHECK (auto_points >= 0),
+    auto_max_points INTEGER CHECK (auto_max_points >= 0),
+    manual_max_points INTEGER CHECK (manual_max_points > 0),
     PRIMARY KEY (course_id, sec_id, content_id, student_id),
     FOREIGN KEY (course_id, sec_id, content_id) REFERENCES task(course_id, sec_id, content_id),
     FOREIGN KEY (student_id) REFERENCES student(id) ON DELETE CASCADE
@@ -446,6 +474,28 @@ CREATE TABLE admin_report (
     FOREIGN KEY (report_id) REFERENCES report(report_id) ON DELETE CASCADE
 );
 
+-- Background report generation (see report_jobs.py)
+CREATE TABLE report_job (
+    job_id       VARCHAR(8)  PRIMARY KEY,
+    admin_id     VARCHAR(8),
+    endpoint     VARCHAR(50) NOT NULL,
+    params       JSONB       NOT NULL DEFAULT '{}'::jsonb,
+    status       VARCHAR(10) NOT NULL DEFAULT 'queued'
+                 CHECK (status IN ('queued', 'running', 'done', 'failed')),
+    progress     INTEGER     NOT NULL DEFAULT 0 CHECK (progress BETWEEN 0 AND 100),
+    report_id    VARCHAR(8),
+    error        TEXT,
+    created_at   TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at   TIMESTAMPTZ,
+    finished_at  TIMESTAMPTZ,
+    owner        VARCHAR(64),   -- process whose worker pool runs the job
+    heartbeat_at TIMESTAMPTZ,   -- last sign of life from the owner
+    FOREIGN KEY (admin_id) REFERENCES admin(id) ON DELETE CASCADE,
+    FOREIGN KEY (report_id) REFERENCES report(report_id) ON DELETE SET NULL
+);
+
+CREATE INDEX idx_report_job_status ON report_job(status);
+
 -- VIEWS
 -- User with computed age
 CREATE VIEW user_with_age AS
@@ -517,22 +567,149 @@ FROM course
 WHERE status = 'accepted'
 GROUP BY category;
 
+-- Categories each student is enrolled in, with how many of their courses are
+-- in each, kept up to date by the recommendation triggers below. A student's
+-- recommendations are every accepted course they are not enrolled in, with
+-- priority 1 if it is in one of these categories (see student_home.py); only
+-- this small per-student profile is stored, not the students x courses list.
+CREATE TABLE student_category (
+    student_id VARCHAR(8),
+    category VARCHAR(50),
+    course_count INTEGER NOT NULL CHECK (course_count > 0),
+    PRIMARY KEY (student_id, category),
+    FOREIGN KEY (student_id) REFERENCES student(id) ON DELETE CASCADE
+);
+
 
 -- TRIGGERS
-CREATE OR REPLACE FUNCTION decrement_enrollment_count()
+-- COUNTER TRIGGERS
+-- course.enrollment_count, instructor.course_count and student.certificate_count
+-- are maintained by statement-level triggers: each INSERT/DELETE statement
+-- is aggregated through its transition table into one UPDATE per affected
+-- course/instructor/student, so bulk writes (e.g. approving many financial
+-- aid applications at once) touch each hot counter row once instead of once
+-- per inserted row.
+
+-- Enrollment count of a course
+CREATE OR REPLACE FUNCTION count_enrollments_on_insert()
 RETURNS TRIGGER AS $$
 BEGIN
-    UPDATE course
-    SET enrollment_count = enrollment_count - 1
-    WHERE course_id = OLD.course_id;
-    RETURN OLD;
+    UPDATE course c
+    SET enrollment_count = COALESCE(c.enrollment_count, 0) + d.added
+    FROM (SELECT course_id, COUNT(*)::INTEGER AS added FROM new_rows GROUP BY course_id) d
+    WHERE c.course_id = d.course_id;
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_decrement_enrollment_count
+CREATE OR REPLACE FUNCTION count_enrollments_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE course c
+    SET enrollment_count = GREATEST(COALESCE(c.enrollment_count, 0) - d.removed, 0)
+    FROM (SELECT course_id, COUNT(*)::INTEGER AS removed FROM old_rows GROUP BY course_id) d
+    WHERE c.course_id = d.course_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_count_enrollments_insert
+AFTER INSERT ON enroll
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_enrollments_on_insert();
+
+CREATE TRIGGER trg_count_enrollments_delete
 AFTER DELETE ON enroll
-FOR EACH ROW
-EXECUTE FUNCTION decrement_enrollment_count();
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_enrollments_on_delete();
+
+-- Course count of an instructor
+CREATE OR REPLACE FUNCTION count_courses_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE instructor i
+    SET course_count = COALESCE(i.course_count, 0) + d.added
+    FROM (SELECT creator_id, COUNT(*)::INTEGER AS added FROM new_rows GROUP BY creator_id) d
+    WHERE i.id = d.creator_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION count_courses_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- The deleted courses' feedback cascades after the course rows are gone,
+    -- so their ratings are taken out of the instructor totals here
+    UPDATE instructor i
+    SET course_count = GREATEST(COALESCE(i.course_count, 0) - d.removed, 0),
+        rating_sum = i.rating_sum - d.rating_sum,
+        rating_count = i.rating_count - d.rating_count,
+        i_rating = CASE
+            WHEN i.rating_count - d.rating_count > 0
+            THEN (i.rating_sum - d.rating_sum)::FLOAT / (i.rating_count - d.rating_count)
+            ELSE 0
+        END
+    FROM (
+        SELECT creator_id,
+               COUNT(*)::INTEGER AS removed,
+               SUM(rating_sum)::INTEGER AS rating_sum,
+               SUM(rating_count)::INTEGER AS rating_count
+        FROM old_rows
+        GROUP BY creator_id
+    ) d
+    WHERE i.id = d.creator_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_count_courses_insert
+AFTER INSERT ON course
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_courses_on_insert();
+
+CREATE TRIGGER trg_count_courses_delete
+AFTER DELETE ON course
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_courses_on_delete();
+
+-- Certificate count of a student (deleting a certificate cascades to earn_certificate)
+CREATE OR REPLACE FUNCTION count_certificates_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE student s
+    SET certificate_count = COALESCE(s.certificate_count, 0) + d.added
+    FROM (SELECT student_id, COUNT(*)::INTEGER AS added FROM new_rows GROUP BY student_id) d
+    WHERE s.id = d.student_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION count_certificates_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE student s
+    SET certificate_count = GREATEST(COALESCE(s.certificate_count, 0) - d.removed, 0)
+    FROM (SELECT student_id, COUNT(*)::INTEGER AS removed FROM old_rows GROUP BY student_id) d
+    WHERE s.id = d.student_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_count_certificates_insert
+AFTER INSERT ON earn_certificate
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_certificates_on_insert();
+
+CREATE TRIGGER trg_count_certificates_delete
+AFTER DELETE ON earn_certificate
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_certificates_on_delete();
 
 CREATE OR REPLACE FUNCTION update_admin_report_count()
 RETURNS TRIGGER AS $$
@@ -562,45 +739,105 @@ EXECUTE FUNCTION update_admin_report_count();
 ALTER TABLE admin_report
 ADD CONSTRAINT uq_admin_report UNIQUE (admin_id, report_id);
 
-CREATE OR REPLACE FUNCTION update_instructor_rating()
-RETURNS TRIGGER AS $$
+-- RATING COUNTERS
+-- course.rating_sum/rating_count and instructor.rating_sum/rating_count are
+-- running totals over feedback, so an average is a single-row lookup.
+-- instructor.i_rating is kept as rating_sum / rating_count.
+
+-- Add per-course rating deltas to the courses and their instructors
+CREATE OR REPLACE FUNCTION apply_rating_deltas(course_ids VARCHAR[], sums INTEGER[], counts INTEGER[])
+RETURNS VOID AS $$
 BEGIN
-    UPDATE instructor
-    SET i_rating = (
-        SELECT AVG(f.rating)
-        FROM feedback f
-        JOIN course c ON f.course_id = c.course_id
-        WHERE c.creator_id = instructor.id
+    WITH delta AS (
+        SELECT course_id, SUM(rating_sum)::INTEGER AS rating_sum, SUM(rating_count)::INTEGER AS rating_count
+        FROM unnest(course_ids, sums, counts) AS d(course_id, rating_sum, rating_count)
+        GROUP BY course_id
+    ),
+    courses AS (
+        UPDATE course c
+        SET rating_sum = c.rating_sum + d.rating_sum,
+            rating_count = c.rating_count + d.rating_count
+        FROM delta d
+        WHERE c.course_id = d.course_id
+        RETURNING c.creator_id, d.rating_sum, d.rating_count
     )
-    WHERE instructor.id = (
-        SELECT c.creator_id
-        FROM course c
-        WHERE c.course_id = NEW.course_id
-    );
-    RETURN NEW;
+    UPDATE instructor i
+    SET rating_sum = i.rating_sum + x.rating_sum,
+        rating_count = i.rating_count + x.rating_count,
+        i_rating = CASE
+            WHEN i.rating_count + x.rating_count > 0
+            THEN (i.rating_sum + x.rating_sum)::FLOAT / (i.rating_count + x.rating_count)
+            ELSE 0
+        END
+    FROM (
+        SELECT creator_id, SUM(rating_sum)::INTEGER AS rating_sum, SUM(rating_count)::INTEGER AS rating_count
+        FROM courses
+        GROUP BY creator_id
+    ) x
+    WHERE i.id = x.creator_id;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER update_i_rating
-AFTER INSERT ON feedback
-FOR EACH ROW
-EXECUTE FUNCTION update_instructor_rating();
+CREATE OR REPLACE FUNCTION count_ratings_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM apply_rating_deltas(array_agg(course_id), array_agg(rating_sum), array_agg(rating_count))
+    FROM (
+        SELECT course_id, SUM(rating)::INTEGER AS rating_sum, COUNT(*)::INTEGER AS rating_count
+        FROM new_rows
+        GROUP BY course_id
+    ) d;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
 
--- Update enrollment count when a student enrolls
-CREATE OR REPLACE FUNCTION update_enrollment_count()
+CREATE OR REPLACE FUNCTION count_ratings_on_update()
 RETURNS TRIGGER AS $$
 BEGIN
-    UPDATE course
-    SET enrollment_count = enrollment_count + 1
-    WHERE course_id = NEW.course_id;
-    RETURN NEW;
+    PERFORM apply_rating_deltas(array_agg(course_id), array_agg(rating_sum), array_agg(rating_count))
+    FROM (
+        SELECT course_id, SUM(rating_sum)::INTEGER AS rating_sum, SUM(rating_count)::INTEGER AS rating_count
+        FROM (
+            SELECT course_id, rating AS rating_sum, 1 AS rating_count FROM new_rows
+            UNION ALL
+            SELECT course_id, -rating, -1 FROM old_rows
+        ) changes
+        GROUP BY course_id
+    ) d;
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER enrollment_count_updater
-AFTER INSERT ON enroll
-FOR EACH ROW
-EXECUTE FUNCTION update_enrollment_count();
+CREATE OR REPLACE FUNCTION count_ratings_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM apply_rating_deltas(array_agg(course_id), array_agg(-rating_sum), array_agg(-rating_count))
+    FROM (
+        SELECT course_id, SUM(rating)::INTEGER AS rating_sum, COUNT(*)::INTEGER AS rating_count
+        FROM old_rows
+        GROUP BY course_id
+    ) d;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_count_ratings_insert
+AFTER INSERT ON feedback
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_ratings_on_insert();
+
+CREATE TRIGGER trg_count_ratings_update
+AFTER UPDATE ON feedback
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_ratings_on_update();
+
+CREATE TRIGGER trg_count_ratings_delete
+AFTER DELETE ON feedback
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_ratings_on_delete();
 
 -- Update section allocated_time after new content is added
 CREATE OR REPLACE FUNCTION update_section_allocated_time()
@@ -623,87 +860,148 @@ AFTER INSERT ON content
 FOR EACH ROW
 EXECUTE FUNCTION update_section_allocated_time();
 
--- Update enroll progress_rate after a content is completed
-CREATE OR REPLACE FUNCTION update_progress_rate()
+-- PROGRESS COUNTERS
+-- enroll.progress_rate is derived from two counters: course.content_count
+-- (content items in the course) and enroll.completed_count (items the student
+-- completed). Statement-level triggers fold each INSERT/UPDATE/DELETE batch
+-- into the counters in one pass using transition tables.
+
+CREATE OR REPLACE FUNCTION progress_from_counts(completed INTEGER, total INTEGER)
+RETURNS INTEGER AS $$
+    SELECT CASE WHEN total = 0 THEN 0
+                ELSE LEAST(100, ROUND(100.0 * completed / total))::INTEGER END;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Transition tables are only visible inside the trigger function itself,
+-- so each function folds its batch into per-(course, student) deltas inline
+CREATE OR REPLACE FUNCTION count_completions_on_insert()
 RETURNS TRIGGER AS $$
-DECLARE
-    total_count INTEGER;
-    completed_count INTEGER;
 BEGIN
-    SELECT COUNT(*) INTO total_count
-    FROM content
-    WHERE course_id = NEW.course_id;
-
-    SELECT COUNT(*) INTO completed_count
-    FROM complete
-    WHERE course_id = NEW.course_id AND student_id = NEW.student_id AND is_completed = TRUE;
-
-    UPDATE enroll
-    SET progress_rate = CASE
-        WHEN total_count = 0 THEN 0
-        ELSE ROUND(100.0 * completed_count / total_count)
-    END
-    WHERE course_id = NEW.course_id AND student_id = NEW.student_id;
-
-    RETURN NEW;
+    UPDATE enroll e
+    SET completed_count = e.completed_count + d.delta,
+        progress_rate = progress_from_counts(e.completed_count + d.delta, c.content_count)
+    FROM (
+        SELECT course_id, student_id, COUNT(*)::INTEGER AS delta
+        FROM new_rows
+        WHERE is_completed
+        GROUP BY course_id, student_id
+    ) d
+    JOIN course c ON c.course_id = d.course_id
+    WHERE e.course_id = d.course_id AND e.student_id = d.student_id;
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_update_progress_rate
-AFTER INSERT OR UPDATE ON complete
-FOR EACH ROW
-EXECUTE FUNCTION update_progress_rate();
-
--- Update enroll progress_rate after new content is added
-CREATE OR REPLACE FUNCTION update_progress_rate_on_content()
+CREATE OR REPLACE FUNCTION count_completions_on_update()
 RETURNS TRIGGER AS $$
 BEGIN
-    -- Update progress_rate for all students enrolled in the course
-    UPDATE enroll
-    SET progress_rate = CASE 
-        WHEN total.total_count = 0 THEN 0
-        ELSE ROUND(100.0 * COALESCE(completed.completed_count, 0) / total.total_count)
-    END
+    UPDATE enroll e
+    SET completed_count = GREATEST(e.completed_count + d.delta, 0),
+        progress_rate = progress_from_counts(GREATEST(e.completed_count + d.delta, 0), c.content_count)
     FROM (
-        SELECT course_id, COUNT(*) AS total_count
-        FROM content
-        WHERE course_id = NEW.course_id
-        GROUP BY course_id
-    ) AS total,
-    (
-        SELECT course_id, student_id, COUNT(*) AS completed_count
-        FROM complete
-        WHERE course_id = NEW.course_id AND is_completed = TRUE
+        SELECT course_id, student_id, SUM(change)::INTEGER AS delta
+        FROM (
+            SELECT course_id, student_id, 1 AS change FROM new_rows WHERE is_completed
+            UNION ALL
+            SELECT course_id, student_id, -1 FROM old_rows WHERE is_completed
+        ) changes
         GROUP BY course_id, student_id
-    ) AS completed
-    WHERE enroll.course_id = NEW.course_id
-    AND enroll.course_id = total.course_id
-    AND enroll.student_id = completed.student_id;
-    RETURN NEW;
+        HAVING SUM(change) <> 0
+    ) d
+    JOIN course c ON c.course_id = d.course_id
+    WHERE e.course_id = d.course_id AND e.student_id = d.student_id;
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_update_progress_rate_on_content
-AFTER INSERT ON content
-FOR EACH ROW
-EXECUTE FUNCTION update_progress_rate_on_content();
+CREATE OR REPLACE FUNCTION count_completions_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE enroll e
+    SET completed_count = GREATEST(e.completed_count - d.removed, 0),
+        progress_rate = progress_from_counts(GREATEST(e.completed_count - d.removed, 0), c.content_count)
+    FROM (
+        SELECT course_id, student_id, COUNT(*)::INTEGER AS removed
+        FROM old_rows
+        WHERE is_completed
+        GROUP BY course_id, student_id
+    ) d
+    JOIN course c ON c.course_id = d.course_id
+    WHERE e.course_id = d.course_id AND e.student_id = d.student_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
 
--- Update course count of instructor when a new course is added
-CREATE OR REPLACE FUNCTION update_instructor_course_count()
+CREATE TRIGGER trg_count_completions_insert
+AFTER INSERT ON complete
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_completions_on_insert();
+
+CREATE TRIGGER trg_count_completions_update
+AFTER UPDATE ON complete
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_completions_on_update();
+
+CREATE TRIGGER trg_count_completions_delete
+AFTER DELETE ON complete
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_completions_on_delete();
+
+-- Adding or removing content changes the denominator for everyone enrolled
+CREATE OR REPLACE FUNCTION count_content_on_insert()
 RETURNS TRIGGER AS $$
 BEGIN
-    UPDATE instructor
-    SET course_count = course_count + 1
-    WHERE id = NEW.creator_id;
+    UPDATE course c
+    SET content_count = c.content_count + d.added
+    FROM (SELECT course_id, COUNT(*)::INTEGER AS added FROM new_rows GROUP BY course_id) d
+    WHERE c.course_id = d.course_id;
+
+    UPDATE enroll e
+    SET progress_rate = progress_from_counts(e.completed_count, c.content_count)
+    FROM course c
+    WHERE c.course_id = e.course_id
+      AND e.course_id IN (SELECT DISTINCT course_id FROM new_rows)
+      -- Only rows whose rate changes: rewriting an unchanged 100 would fire
+      -- the course completion notification again
+      AND e.progress_rate IS DISTINCT FROM progress_from_counts(e.completed_count, c.content_count);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
 
-    RETURN NEW;
+CREATE OR REPLACE FUNCTION count_content_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE course c
+    SET content_count = GREATEST(c.content_count - d.removed, 0)
+    FROM (SELECT course_id, COUNT(*)::INTEGER AS removed FROM old_rows GROUP BY course_id) d
+    WHERE c.course_id = d.course_id;
+
+    UPDATE enroll e
+    SET progress_rate = progress_from_counts(e.completed_count, c.content_count)
+    FROM course c
+    WHERE c.course_id = e.course_id
+      AND e.course_id IN (SELECT DISTINCT course_id FROM old_rows)
+      -- Only rows whose rate changes: rewriting an unchanged 100 would fire
+      -- the course completion notification again
+      AND e.progress_rate IS DISTINCT FROM progress_from_counts(e.completed_count, c.content_count);
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_update_instructor_course_count
-AFTER INSERT ON course
-FOR EACH ROW
-EXECUTE FUNCTION update_instructor_course_count();
+CREATE TRIGGER trg_count_content_insert
+AFTER INSERT ON content
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_content_on_insert();
+
+CREATE TRIGGER trg_count_content_delete
+AFTER DELETE ON content
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION count_content_on_delete();
 
 -- Trigger for content order numbers
 CREATE OR REPLACE FUNCTION shift_order_numbers()
@@ -743,440 +1041,238 @@ FOR EACH ROW
 EXECUTE FUNCTION shift_section_order_numbers();
 
 -- Triggers for completion after grading
+-- Statement-level: grading many submissions in one UPDATE marks them all
+-- complete with a single INSERT ... ON CONFLICT.
 CREATE OR REPLACE FUNCTION mark_completion_on_grade()
 RETURNS TRIGGER AS $$
 BEGIN
-  -- Only run logic if grade is newly set and is NOT NULL
-  IF NEW.grade IS NOT NULL AND (OLD.grade IS NULL OR OLD.grade IS DISTINCT FROM NEW.grade) THEN
-
-    -- Try to update existing row
-    UPDATE complete
-    SET is_completed = TRUE
-    WHERE course_id = NEW.course_id
-      AND sec_id = NEW.sec_id
-      AND content_id = NEW.content_id
-      AND student_id = NEW.student_id;
-
-    -- If no row was updated, insert a new one
-    IF NOT FOUND THEN
-      INSERT INTO complete (course_id, sec_id, content_id, student_id, is_completed)
-      VALUES (NEW.course_id, NEW.sec_id, NEW.content_id, NEW.student_id, TRUE)
-      ON CONFLICT (course_id, sec_id, content_id, student_id)
-      DO UPDATE SET is_completed = TRUE;
-    END IF;
-
-  END IF;
-
-  RETURN NEW;
-END;
-$$ LANGUAGE plpgsql;
-
-CREATE TRIGGER trg_mark_completion_on_grade
-AFTER UPDATE OF grade ON submit
-FOR EACH ROW
-EXECUTE FUNCTION mark_completion_on_grade();
-
-
--- NOTIFICATION TRIGGERS
-
--- Generate notifications when a course status changes
-CREATE OR REPLACE FUNCTION generate_course_status_notification()
-RETURNS TRIGGER AS $$
-DECLARE
-    notify_id VARCHAR(8);
-BEGIN
-    -- For UPDATE operations, only trigger if status has changed
-    IF TG_OP = 'UPDATE' AND OLD.status = NEW.status THEN
-        RETURN NEW;
-    END IF;
-    
-    -- Generate a unique notification ID
-    notify_id := 'N' || SUBSTRING(MD5(RANDOM()::TEXT), 1, 7);
-    
-    -- Create notification based on status change
-    IF NEW.status = 'accepted' THEN
-        INSERT INTO notification (notification_id, type, entity_type, entity_id, message)
-        VALUES (notify_id, 'course_approved', 'course', NEW.course_id, 
-                'Your course "' || NEW.title || '" has been approved and is now accessible.');
-                
-        -- Send notification to the course creator
-        INSERT INTO receive (notification_id, id)
-        VALUES (notify_id, NEW.creator_id);
-        
-    ELSIF NEW.status = 'rejected' THEN
-        INSERT INTO notification (notification_id, type, entity_type, entity_id, message)
-        VALUES (notify_id, 'course_rejected', 'course', NEW.course_id, 
-                'Your course "' || NEW.title || '" has been rejected. Please review.');
-                
-        -- Send notification to the course creator
-        INSERT INTO receive (notification_id, id)
-        VALUES (notify_id, NEW.creator_id);
-        
-    ELSIF NEW.status = 'pending' THEN
-        -- Create notification for admin users about a new course needing review
-        INSERT INTO notification (notification_id, type, entity_type, entity_id, message)
-        VALUES (notify_id, 'course_pending_review', 'course', NEW.course_id, 
-                'A new course "' || NEW.title || '" needs your review.');
-                
-        -- Send notification to all admin users
-        INSERT INTO receive (notification_id, id)
-        SELECT notify_id, u.id
-        FROM "user" u
-        JOIN admin a ON u.id = a.id;
-    END IF;
-    
-    RETURN NEW;
+  -- Only rows whose grade is newly set or changed to a non-NULL value
+  INSERT INTO complete (course_id, sec_id, content_id, student_id, is_completed)
+  SELECT n.course_id, n.sec_id, n.content_id, n.student_id, TRUE
+  FROM new_rows n
+  JOIN old_rows o
+    ON o.course_id = n.course_id AND o.sec_id = n.sec_id
+   AND o.content_id = n.content_id AND o.student_id = n.student_id
+  WHERE n.grade IS NOT NULL
+    AND o.grade IS DISTINCT FROM n.grade
+  ON CONFLICT (course_id, sec_id, content_id, student_id)
+  DO UPDATE SET is_completed = TRUE
+  WHERE complete.is_completed IS DISTINCT FROM TRUE;
+
+  RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_course_status_notification
-AFTER INSERT OR UPDATE OF status ON course
-FOR EACH ROW
-EXECUTE FUNCTION generate_course_status_notification();
-
--- Generate notifications for financial aid application status changes
-CREATE OR REPLACE FUNCTION generate_financial_aid_notification()
+-- Updates enroll only applications whose status has just become 'approved',
+-- so editing an approved application later does not re-enroll a student
+-- who has since dropped the course. Transition tables cannot be combined
+-- with UPDATE OF <column>, so the trigger fires on any update and compares
+-- old and new rows here.
+CREATE OR REPLACE FUNCTION enroll_on_financial_aid_status_change()
 RETURNS TRIGGER AS $$
-DECLARE
-    notify_id VARCHAR(8);
-    course_title VARCHAR(150);
-    student_name VARCHAR(150);
 BEGIN
-    -- Only trigger if status has changed
-    IF OLD.status = NEW.status THEN
-        RETURN NEW;
-    END IF;
-    
-    -- Get course title
-    SELECT title INTO course_title 
-    FROM course
-    WHERE course_id = NEW.course_id;
-    
-    -- Get student name
-    SELECT first_name || ' ' || last_name INTO student_name
-    FROM "user"
-    WHERE id = NEW.student_id;
-    
-    -- Generate a unique notification ID
-    notify_id := 'N' || SUBSTRING(MD5(RANDOM()::TEXT), 1, 7);
-    
-    -- Create notification based on status change
-    IF NEW.status = 'approved' THEN
-        -- Notification for student
-        INSERT INTO notification (notification_id, type, entity_type, entity_id, message)
-        VALUES (notify_id, 'financial_aid_approved', 'course', NEW.course_id, 
-                'Your financial aid application for "' || course_title || '" has been approved!');
-                
-        -- Send notification to the student
-        INSERT INTO receive (notification_id, id)
-        VALUES (notify_id, NEW.student_id);
-        
-    ELSIF NEW.status = 'rejected' THEN
-        -- Notification for student
-        INSERT INTO notification (notification_id, type, entity_type, entity_id, message)
-        VALUES (notify_id, 'financial_aid_rejected', 'course', NEW.course_id, 
-                'Your financial aid application for "' || course_title || '" has been rejected.');
-                
-        -- Send notification to the student
-        INSERT INTO receive (notification_id, id)
-        VALUES (notify_id, NEW.student_id);
-        
-    ELSIF NEW.status = 'pending' THEN
-        -- Create a new notification for instructors
-        notify_id := 'N' || SUBSTRING(MD5(RANDOM()::TEXT), 1, 7);
-        INSERT INTO notification (notification_id, type, entity_type, entity_id, message)
-        VALUES (notify_id, 'financial_aid_pending', 'course', NEW.course_id, 
-                student_name || ' has applied for financial aid for your course "' || course_title || '".');
-                
-        -- Send notification to the course instructor
-        INSERT INTO receive (notification_id, id)
-        SELECT notify_id, c.creator_id
-        FROM course c
-        WHERE c.course_id = NEW.course_id;
-    END IF;
-    
-    RETURN NEW;
+    INSERT INTO enroll (course_id, student_id, enroll_date, progress_rate)
+    SELECT n.course_id, n.student_id, CURRENT_DATE, 0
+    FROM new_rows n
+    LEFT JOIN old_rows o ON o.course_id = n.course_id AND o.student_id = n.student_id
+    WHERE n.status = 'approved'
+      AND o.status IS DISTINCT FROM 'approved'
+    ON CONFLICT (course_id, student_id) DO NOTHING;
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_financial_aid_notification
-AFTER INSERT OR UPDATE OF status ON apply_financial_aid
-FOR EACH ROW
-EXECUTE FUNCTION generate_financial_aid_notification();
+CREATE TRIGGER trg_enroll_after_financial_aid_insert
+AFTER INSERT ON apply_financial_aid
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION enroll_on_financial_aid_approval();
 
--- Generate notifications when a student enrolls in a course
-CREATE OR REPLACE FUNCTION generate_enrollment_notification()
-RETURNS TRIGGER AS $$
-DECLARE
-    notify_id VARCHAR(8);
-    course_title VARCHAR(150);
-    student_name VARCHAR(150);
-    instructor_id VARCHAR(8);
-BEGIN
-    -- Get course title and instructor
-    SELECT title, creator_id INTO course_title, instructor_id
-    FROM course
-    WHERE course_id = NEW.course_id;
-    
-    -- Get student name
-    SELECT first_name || ' ' || last_name INTO student_name
-    FROM "user"
-    WHERE id = NEW.student_id;
-    
-    -- Generate a unique notification ID for student
-    notify_id := 'N' || SUBSTRING(MD5(RANDOM()::TEXT), 1, 7);
-    
-    -- Create notification for student
-    INSERT INTO notification (notification_id, type, entity_type, entity_id, message)
-    VALUES (notify_id, 'enrollment_success', 'course', NEW.course_id, 
-            'You have successfully enrolled in "' || course_title || '". You can start learning now!');
-            
-    -- Send notification to the student
-    INSERT INTO receive (notification_id, id)
-    VALUES (notify_id, NEW.student_id);
-    
-    -- Generate a unique notification ID for instructor
-    notify_id := 'N' || SUBSTRING(MD5(RANDOM()::TEXT), 1, 7);
-    
-    -- Create notification for instructor
-    INSERT INTO notification (notification_id, type, entity_type, entity_id, message)
-    VALUES (notify_id, 'new_student', 'course', NEW.course_id, 
-            student_name || ' has enrolled in your course "' || course_title || '".');
-            
-    -- Send notification to the instructor
-    INSERT INTO receive (notification_id, id)
-    VALUES (notify_id, instructor_id);
-    
-    RETURN NEW;
-END;
-$$ LANGUAGE plpgsql;
+CREATE TRIGGER trg_enroll_after_financial_aid_update
+AFTER UPDATE ON apply_financial_aid
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION enroll_on_financial_aid_status_change();
 
-CREATE TRIGGER trg_enrollment_notification
-AFTER INSERT ON enroll
-FOR EACH ROW
-EXECUTE FUNCTION generate_enrollment_notification();
+-- RECOMMENDATION TRIGGERS (maintain student_category)
 
--- Generate notifications when a student completes a course (progress_rate = 100)
-CREATE OR REPLACE FUNCTION generate_course_completion_notification()
-RETURNS TRIGGER AS $$
-DECLARE
-    notify_id VARCHAR(8);
-    course_title VARCHAR(150);
-    student_name VARCHAR(150);
-    instructor_id VARCHAR(8);
+-- Recount the category profile of the given students from their enrollments.
+-- Only students that still exist get rows: when a deleted user cascades to
+-- enroll, their profile is simply gone.
+CREATE OR REPLACE FUNCTION refresh_student_categories(p_student_ids VARCHAR[])
+RETURNS VOID AS $$
 BEGIN
-    -- Only trigger if progress_rate updated to 100
-    IF OLD.progress_rate < 100 AND NEW.progress_rate = 100 THEN  -- this line changed from "IF OLD.progress_rate = 100 OR NEW.progress_rate < 100 THEN RETURN NEW;" to this due to wrong logic
-        RETURN NEW;
-    END IF;
-    
-    -- Get course title and instructor
-    SELECT title, creator_id INTO course_title, instructor_id
-    FROM course
-    WHERE course_id = NEW.course_id;
-    
-    -- Get student name
-    SELECT first_name || ' ' || last_name INTO student_name
-    FROM "user"
-    WHERE id = NEW.student_id;
-    
-    -- Generate a unique notification ID for student
-    notify_id := 'N' || SUBSTRING(MD5(RANDOM()::TEXT), 1, 7);
-    
-    -- Create notification for student
-    INSERT INTO notification (notification_id, type, entity_type, entity_id, message)
-    VALUES (notify_id, 'course_completed', 'course', NEW.course_id, 
-            'Congratulations! You have completed "' || course_title || '". Please share your feedback!');
-            
-    -- Send notification to the student
-    INSERT INTO receive (notification_id, id)
-    VALUES (notify_id, NEW.student_id);
-    
-    -- Generate a unique notification ID for instructor
-    notify_id := 'N' || SUBSTRING(MD5(RANDOM()::TEXT), 1, 7);
-    
-    -- Create notification for instructor
-    INSERT INTO notification (notification_id, type, entity_type, entity_id, message)
-    VALUES (notify_id, 'student_completed_course', 'course', NEW.course_id, 
-            student_name || ' has completed your course "' || course_title || '".');
-            
-    -- Send notification to the instructor
-    INSERT INTO receive (notification_id, id)
-    VALUES (notify_id, instructor_id);
-    
-    RETURN NEW;
+    DELETE FROM student_category WHERE student_id = ANY(p_student_ids);
+
+    INSERT INTO student_category (student_id, category, course_count)
+    SELECT e.student_id, c.category, COUNT(*)::INTEGER
+    FROM enroll e
+    JOIN student s ON s.id = e.student_id
+    JOIN course c ON c.course_id = e.course_id
+    WHERE e.student_id = ANY(p_student_ids)
+      AND c.category IS NOT NULL
+    GROUP BY e.student_id, c.category;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_course_completion_notification
-AFTER UPDATE OF progress_rate ON enroll
-FOR EACH ROW
-WHEN (NEW.progress_rate = 100)
-EXECUTE FUNCTION generate_course_completion_notification();
-
--- Generate notifications when feedback is submitted
-CREATE OR REPLACE FUNCTION generate_feedback_notification()
+CREATE OR REPLACE FUNCTION update_student_categories_on_enroll_insert()
 RETURNS TRIGGER AS $$
-DECLARE
-    notify_id VARCHAR(8);
-    course_title VARCHAR(150);
-    student_name VARCHAR(150);
-    instructor_id VARCHAR(8);
 BEGIN
-    -- Get course title and instructor
-    SELECT title, creator_id INTO course_title, instructor_id
-    FROM course
-    WHERE course_id = NEW.course_id;
-    
-    -- Get student name
-    SELECT first_name || ' ' || last_name INTO student_name
-    FROM "user"
-    WHERE id = NEW.student_id;
-    
-    -- Generate a unique notification ID for instructor
-    notify_id := 'N' || SUBSTRING(MD5(RANDOM()::TEXT), 1, 7);
-    
-    -- Create notification for instructor
-    INSERT INTO notification (notification_id, type, entity_type, entity_id, message)
-    VALUES (notify_id, 'new_feedback', 'course', NEW.course_id, 
-            student_name || ' has left a ' || NEW.rating || '-star feedback for your course "' || course_title || '".');
-            
-    -- Send notification to the instructor
-    INSERT INTO receive (notification_id, id)
-    VALUES (notify_id, instructor_id);
-    
-    RETURN NEW;
+    PERFORM refresh_student_categories(ARRAY(SELECT DISTINCT student_id FROM new_rows));
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_feedback_notification
-AFTER INSERT ON feedback
-FOR EACH ROW
-EXECUTE FUNCTION generate_feedback_notification();
-
--- Generate notifications when an assignment is graded
-CREATE OR REPLACE FUNCTION generate_grade_notification()
+CREATE OR REPLACE FUNCTION update_student_categories_on_enroll_delete()
 RETURNS TRIGGER AS $$
-DECLARE
-    notify_id VARCHAR(8);
-    content_title VARCHAR(150);
-    course_title VARCHAR(150);
-    passing_grade INTEGER;
 BEGIN
-    -- Only trigger if grade is being added/updated (not NULL)
-    IF NEW.grade IS NULL THEN
-        RETURN NEW;
-    END IF;
-    
-    -- Get content and course title
-    SELECT c.title, course.title, t.passing_grade 
-    INTO content_title, course_title, passing_grade
-    FROM content c
-    JOIN course ON c.course_id = course.course_id
-    JOIN task t ON c.content_id = t.content_id AND c.course_id = t.course_id AND c.sec_id = t.sec_id
-    WHERE c.content_id = NEW.content_id AND c.course_id = NEW.course_id AND c.sec_id = NEW.sec_id;
-    
-    -- Generate a unique notification ID
-    notify_id := 'N' || SUBSTRING(MD5(RANDOM()::TEXT), 1, 7);
-    
-    -- Create notification based on grade
-    IF NEW.grade >= passing_grade THEN
-        INSERT INTO notification (notification_id, type, entity_type, entity_id, message)
-        VALUES (notify_id, 'assignment_passed', 'content', NEW.content_id, 
-                'You passed "' || content_title || '" in the course "' || course_title || '" with a grade of ' || NEW.grade || '.');
-    ELSE
-        INSERT INTO notification (notification_id, type, entity_type, entity_id, message)
-        VALUES (notify_id, 'assignment_failed', 'content', NEW.content_id, 
-                'You did not pass "' || content_title || '" in the course "' || course_title || '". Your grade: ' || NEW.grade || '.');
-    END IF;
-    
-    -- Send notification to student
-    INSERT INTO receive (notification_id, id)
-    VALUES (notify_id, NEW.student_id);
-    
-    RETURN NEW;
+    PERFORM refresh_student_categories(ARRAY(SELECT DISTINCT student_id FROM old_rows));
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_grade_notification
-AFTER INSERT OR UPDATE OF grade ON submit
-FOR EACH ROW
-EXECUTE FUNCTION generate_grade_notification();
-
--- Increment certificate_count of student when a new one is issued
-CREATE OR REPLACE FUNCTION increment_certificate_count()
-RETURNS TRIGGER AS $$
-BEGIN
-    UPDATE student
-    SET certificate_count = certificate_count + 1
-    WHERE ID = NEW.student_id;
-    RETURN NEW;
-END;
-$$ LANGUAGE plpgsql;
+CREATE TRIGGER trg_student_categories_enroll_insert
+AFTER INSERT ON enroll
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION update_student_categories_on_enroll_insert();
 
-CREATE TRIGGER update_certificate_count
-AFTER INSERT ON earn_certificate
-FOR EACH ROW
-EXECUTE FUNCTION increment_certificate_count();
+CREATE TRIGGER trg_student_categories_enroll_delete
+AFTER DELETE ON enroll
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION update_student_categories_on_enroll_delete();
 
--- Decrement certificate_count of student when an existing one is deleted
-CREATE OR REPLACE FUNCTION decrement_certificate_count_on_certificate_delete()
+-- Re-categorising a course changes the profile of everyone enrolled in it
+CREATE OR REPLACE FUNCTION update_student_categories_on_course()
 RETURNS TRIGGER AS $$
 BEGIN
-    UPDATE student
-    SET certificate_count = certificate_count - 1
-    WHERE ID IN (
-        SELECT student_id
-        FROM earn_certificate
-        WHERE certificate_id = OLD.certificate_id
-    );
-    RETURN OLD;
+    PERFORM refresh_student_categories(ARRAY(
+        SELECT DISTINCT e.student_id
+        FROM new_rows n
+        JOIN old_rows o ON o.course_id = n.course_id
+        JOIN enroll e ON e.course_id = n.course_id
+        WHERE n.category IS DISTINCT FROM o.category
+    ));
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER handle_certificate_delete
-BEFORE DELETE ON certificate
-FOR EACH ROW
-EXECUTE FUNCTION decrement_certificate_count_on_certificate_delete();
-
--- TRIGGER FUNCTION: When a course is deleted, update the instructor's course_count
-CREATE OR REPLACE FUNCTION decrement_instructor_course_count()
+CREATE TRIGGER trg_student_categories_course
+AFTER UPDATE ON course
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION update_student_categories_on_course();
+
+-- SEARCH
+-- course.search_vector indexes title (A), category and instructor name (B)
+-- and description (C) for the catalog search in online_degrees
+
+CREATE OR REPLACE FUNCTION course_search_vector(
+    p_title VARCHAR, p_category VARCHAR, p_description VARCHAR, p_creator_id VARCHAR
+)
+RETURNS TSVECTOR AS $$
+    SELECT setweight(to_tsvector('simple', COALESCE(p_title, '')), 'A')
+        || setweight(to_tsvector('simple', COALESCE(p_category, '')), 'B')
+        || setweight(to_tsvector('simple', COALESCE(
+               (SELECT CONCAT_WS(' ', u.first_name, u.middle_name, u.last_name)
+                FROM "user" u WHERE u.id = p_creator_id), '')), 'B')
+        || setweight(to_tsvector('simple', COALESCE(p_description, '')), 'C');
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION update_course_search_vector()
 RETURNS TRIGGER AS $$
 BEGIN
-    UPDATE instructor
-    SET course_count = course_count - 1
-    WHERE id = OLD.creator_id;
-    RETURN OLD;
+    NEW.search_vector := course_search_vector(NEW.title, NEW.category, NEW.description, NEW.creator_id);
+    RETURN NEW;
 END;
 $$ LANGUAGE plpgsql;
 
--- TRIGGER: Run above function after deleting a course
-CREATE TRIGGER trg_decrement_course_count
-AFTER DELETE ON course
+CREATE TRIGGER trg_course_search_vector
+BEFORE INSERT OR UPDATE OF title, category, description, creator_id ON course
 FOR EACH ROW
-EXECUTE FUNCTION decrement_instructor_course_count();
+EXECUTE FUNCTION update_course_search_vector();
 
--- Thanks to this trigger an approved financial aid will be reflected to the enrollment
-CREATE OR REPLACE FUNCTION enroll_on_financial_aid_approval()
+-- Renaming an instructor re-indexes their courses
+CREATE OR REPLACE FUNCTION update_instructor_course_search_vectors()
 RETURNS TRIGGER AS $$
 BEGIN
-    -- Only proceed if status is approved
-    IF NEW.status = 'approved' THEN
-        -- Insert into enroll if not already present
-        INSERT INTO enroll (course_id, student_id, enroll_date, progress_rate)
-        VALUES (NEW.course_id, NEW.student_id, CURRENT_DATE, 0)
-        ON CONFLICT (course_id, student_id) DO NOTHING;
+    IF NEW.role = 'instructor'
+       AND (OLD.first_name, OLD.middle_name, OLD.last_name)
+           IS DISTINCT FROM (NEW.first_name, NEW.middle_name, NEW.last_name) THEN
+        UPDATE course
+        SET search_vector = course_search_vector(title, category, description, creator_id)
+        WHERE creator_id = NEW.id;
     END IF;
     RETURN NEW;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_enroll_after_financial_aid_approval
-AFTER INSERT OR UPDATE OF status
-ON apply_financial_aid
+CREATE TRIGGER trg_instructor_course_search_vectors
+AFTER UPDATE OF first_name, middle_name, last_name ON "user"
 FOR EACH ROW
-EXECUTE FUNCTION enroll_on_financial_aid_approval();
-
+EXECUTE FUNCTION update_instructor_course_search_vectors();
+
+CREATE INDEX idx_course_search_vector ON course USING gin (search_vector);
+
+-- Trigram indexes: typo-tolerant title matching and the title/description ILIKE filters
+CREATE INDEX idx_course_title_trgm ON course USING gin (title gin_trgm_ops);
+CREATE INDEX idx_course_description_trgm ON course USING gin (description gin_trgm_ops);
+
+-- Catalog ordering: one index per /api/degrees sort key (see SORT_KEYS in
+-- online_degrees.py), so each keyset page is a short index range scan
+CREATE INDEX idx_course_catalog_newest
+    ON course ((COALESCE(creation_date, DATE '0001-01-01')) DESC, course_id DESC)
+    WHERE status = 'accepted';
+CREATE INDEX idx_course_catalog_enrolled
+    ON course ((COALESCE(enrollment_count, 0)) DESC, course_id DESC)
+    WHERE status = 'accepted';
+CREATE INDEX idx_course_catalog_price
+    ON course ((COALESCE(price, 0)), course_id)
+    WHERE status = 'accepted';
+CREATE INDEX idx_course_catalog_relevance
+    ON course ((COALESCE(enrollment_count, 0) * 5
+                + (COALESCE(creation_date, DATE '1970-01-01') - DATE '1970-01-01')) DESC,
+               course_id DESC)
+    WHERE status = 'accepted';
+
+
+-- SECONDARY INDEXES
+-- Student-, creator- and recipient-keyed access paths used by the routes.
+-- The primary keys above lead with course_id, so lookups by the other
+-- columns need their own indexes. Existing databases get these through
+-- migrations/0001_secondary_indexes.sql.
+
+-- enroll by student (dashboards, profile, enrolled courses)
+CREATE INDEX idx_enroll_student ON enroll(student_id) INCLUDE (progress_rate, enroll_date);
+
+-- courses by instructor, optionally by status (instructor dashboard, profile)
+CREATE INDEX idx_course_creator ON course(creator_id, status);
+
+-- courses by status for the admin review lists
+CREATE INDEX idx_course_status ON course(status, creation_date DESC);
+
+-- courses an admin approved or rejected (admin profile)
+CREATE INDEX idx_course_approver ON course(approver_id, status);
+
+-- a user's inbox, newest first (keyset pagination)
+CREATE INDEX idx_receive_inbox ON receive(id, received_at DESC, notification_id DESC);
+
+-- ungraded submissions waiting for an instructor
+CREATE INDEX idx_submit_ungraded ON submit(course_id, sec_id, content_id)
+    INCLUDE (submission_date)
+    WHERE grade IS NULL;
+
+-- per-student progress lookups
+CREATE INDEX idx_submit_student ON submit(student_id);
+CREATE INDEX idx_complete_student ON complete(student_id);
+CREATE INDEX idx_feedback_student ON feedback(student_id);
+CREATE INDEX idx_comment_user ON comment(user_id);
+
+-- financial aid by student, and pending applications per course
+CREATE INDEX idx_financial_aid_student ON apply_financial_aid(student_id);
+CREATE INDEX idx_financial_aid_pending ON apply_financial_aid(course_id)
+    WHERE status = 'pending';
 
 -- CASCADING DELETE CONSTRAINTS (if not already set manually)
 -- If possible, modify foreign keys on dependent tables like this:
@@ -2735,3 +2831,363 @@ VALUES
 ('C2002', 'S0202', 'CD0202', 'U0001011', TRUE),
 ('C2002', 'S0202', 'CV0202', 'U0001011', TRUE),
 ('C2002', 'S0202', 'CT0202', 'U0001011', TRUE);
+
+
+-- REPORT SNAPSHOTS
+-- Materialized views behind the admin "general" reports (report_cache.py).
+-- Each carries the refreshed_at time of its snapshot and a unique index, which
+-- REFRESH MATERIALIZED VIEW CONCURRENTLY requires (single-row views use
+-- refreshed_at). Built after the demo data so the first snapshot includes it.
+CREATE MATERIALIZED VIEW report_student_general AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+WITH base AS (
+    SELECT s.id,
+           DATE_PART('year', AGE(CURRENT_DATE, u.birth_date)) AS age,
+           s.major,
+           s.account_status,
+           s.certificate_count
+    FROM student s
+    JOIN "user" u ON u.id = s.id
+),
+enrolls AS (
+    SELECT student_id,
+           COUNT(*) AS enroll_cnt,
+           AVG(progress_rate) AS avg_progress
+    FROM enroll
+    GROUP BY student_id
+),
+majors AS (
+    SELECT major,
+           COUNT(*) AS cnt,
+           ROW_NUMBER() OVER(ORDER BY COUNT(*) DESC, major) AS rn
+    FROM student s
+    GROUP BY major
+)
+SELECT
+  (SELECT COUNT(*) FROM base)                                       AS total_students,
+  (SELECT COUNT(*) FROM base WHERE account_status = 'active')       AS active_student_count,
+  ROUND((SELECT AVG(enroll_cnt) FROM enrolls)::numeric,2)          AS avg_enroll_per_student,
+  ROUND((SELECT AVG(certificate_count) FROM base)::numeric,2)      AS avg_cert_per_student,
+  ROUND((SELECT AVG(avg_progress) FROM enrolls)::numeric,2)        AS avg_completion_rate,
+  (SELECT major FROM majors WHERE rn = 1)                          AS most_common_major,
+  (SELECT cnt FROM majors WHERE rn = 1)                            AS most_common_major_count,
+  ROUND((SELECT AVG(age) FROM base)::numeric,2)                    AS avg_age,
+  (SELECT MIN(age) FROM base)                                      AS youngest_age,
+  (SELECT MAX(age) FROM base)                                      AS oldest_age
+) q;
+
+CREATE UNIQUE INDEX report_student_general_key ON report_student_general (refreshed_at);
+
+CREATE MATERIALIZED VIEW report_student_top AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+WITH stats AS (
+    SELECT s.id,
+           s.certificate_count,
+           COUNT(e.course_id) AS enroll_cnt,
+           AVG(e.progress_rate) AS avg_progress
+    FROM student s
+    LEFT JOIN enroll e ON e.student_id = s.id
+    WHERE s.id IN (SELECT student_id FROM enroll WHERE progress_rate = 100) 
+    GROUP BY s.id, s.certificate_count
+),
+scores AS (
+    SELECT id,
+           ROUND(certificate_count*2 + enroll_cnt*0.5 + COALESCE(avg_progress,0)*0.1,2) AS achievement_score
+    FROM (
+      SELECT id,
+             certificate_count,
+             enroll_cnt,
+             COALESCE(ROUND(avg_progress::numeric,2),0) AS avg_progress
+      FROM stats
+    ) t
+)
+SELECT
+  sc.id,
+  u.first_name || ' ' || u.last_name AS full_name,
+  s.major,
+  sc.achievement_score
+FROM scores sc
+JOIN student s ON s.id = sc.id
+JOIN "user" u    ON u.id = sc.id
+ORDER BY sc.achievement_score DESC
+LIMIT 3
+) q;
+
+CREATE UNIQUE INDEX report_student_top_key ON report_student_top (id);
+
+CREATE MATERIALIZED VIEW report_course_general AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+WITH base AS (
+    SELECT course_id,
+           price,
+           COALESCE(enrollment_count,0) AS enrollment_count
+    FROM course
+),
+freepaid AS (
+    SELECT COUNT(*) FILTER(WHERE price=0) AS free_course_count,
+           COUNT(*) FILTER(WHERE price>0) AS paid_course_count
+    FROM base
+),
+popular AS (
+    SELECT c.course_id,
+           c.enrollment_count,
+           c.price,
+           c.creator_id
+    FROM course c
+    ORDER BY c.enrollment_count DESC
+    LIMIT 1
+),
+completed_raw AS (
+    SELECT b.course_id,
+           COALESCE(c.completion_count,0) AS completion_count,
+           b.enrollment_count,
+           CASE WHEN b.enrollment_count>0
+                THEN ROUND(COALESCE(c.completion_count,0)*100.0/b.enrollment_count,2)
+                ELSE 0 END AS completion_ratio,
+           b.price,
+           cr.creator_id
+    FROM base b
+    LEFT JOIN (
+      SELECT course_id, COUNT(*) AS completion_count
+      FROM enroll
+      WHERE progress_rate = 100
+      GROUP BY course_id
+    ) c USING(course_id)
+    JOIN course cr USING(course_id)
+    ORDER BY COALESCE(c.completion_count,0) DESC
+    LIMIT 1
+)
+SELECT
+  (SELECT COUNT(*) FROM base)                                        AS total_courses,
+
+  -- most popular
+  popular.course_id                                                 AS most_popular_course_id,
+  (SELECT title FROM course WHERE course_id = popular.course_id)    AS most_popular_course_title,
+  popular.enrollment_count                                          AS most_popular_enrollment_count,
+  popular.price                                                     AS most_popular_price,
+  popular.creator_id                                                AS most_popular_instructor_id,
+  (SELECT u.first_name || ' ' || u.last_name
+   FROM "user" u WHERE u.id = popular.creator_id)                   AS most_popular_instructor_name,
+
+  ROUND((SELECT AVG(enrollment_count)::numeric FROM base),2)        AS avg_enroll_per_course,
+  COALESCE((SELECT SUM(price*enrollment_count) FROM base),0)         AS total_revenue,
+  freepaid.free_course_count                                        AS free_course_count,
+  freepaid.paid_course_count                                        AS paid_course_count,
+
+  -- most completed
+  completed_raw.course_id                                           AS most_completed_course_id,
+  (SELECT title FROM course WHERE course_id = completed_raw.course_id) 
+                                                                    AS most_completed_course_title,
+  completed_raw.enrollment_count                                    AS most_completed_enrollment_count,
+  completed_raw.completion_ratio                                    AS most_completed_completion_ratio,
+  completed_raw.price                                               AS most_completed_price,
+  completed_raw.creator_id                                          AS most_completed_instructor_id,
+  (SELECT u.first_name || ' ' || u.last_name
+   FROM "user" u WHERE u.id = completed_raw.creator_id)            AS most_completed_instructor_name
+
+FROM popular
+CROSS JOIN freepaid
+CROSS JOIN completed_raw
+) q;
+
+CREATE UNIQUE INDEX report_course_general_key ON report_course_general (refreshed_at);
+
+CREATE MATERIALIZED VIEW report_course_enroll_stats AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT
+  ROUND(AVG(e.progress_rate)::numeric,2) AS avg_completion_rate,
+  COUNT(*) FILTER (WHERE c.price=0)   AS free_enroll_count,
+  COUNT(*) FILTER (WHERE c.price>0)   AS paid_enroll_count
+FROM enroll e
+JOIN course c ON c.course_id=e.course_id
+) q;
+
+CREATE UNIQUE INDEX report_course_enroll_stats_key ON report_course_enroll_stats (refreshed_at);
+
+CREATE MATERIALIZED VIEW report_category_enrollments AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT category, SUM(COALESCE(enrollment_count,0)) AS total_enrollments
+FROM course GROUP BY category ORDER BY total_enrollments DESC
+) q;
+
+CREATE UNIQUE INDEX report_category_enrollments_key ON report_category_enrollments (category);
+
+CREATE MATERIALIZED VIEW report_difficulty_stats AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT c.difficulty_level,
+       SUM(COALESCE(c.enrollment_count,0)) AS total_enrollments,
+       ROUND(COALESCE(AVG(e.progress_rate),0)::numeric,2) AS avg_completion_rate
+FROM course c LEFT JOIN enroll e ON e.course_id=c.course_id
+GROUP BY c.difficulty_level ORDER BY c.difficulty_level
+) q;
+
+CREATE UNIQUE INDEX report_difficulty_stats_key ON report_difficulty_stats (difficulty_level);
+
+CREATE MATERIALIZED VIEW report_instructor_general AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT *
+FROM (SELECT COUNT(*) AS total_instructors FROM instructor) total
+CROSS JOIN (SELECT COUNT(DISTINCT c.creator_id) FILTER(WHERE c.price=0) AS instructors_with_free_course,
+       COUNT(DISTINCT c.creator_id) FILTER(WHERE c.price>0) AS instructors_with_paid_course
+FROM course c) paid_free
+CROSS JOIN (SELECT ROUND(AVG(course_count)::numeric,2) AS avg_courses_per_instructor FROM instructor) avg_courses
+CROSS JOIN (SELECT ROUND(AVG(DATE_PART('year', AGE(CURRENT_DATE, u.birth_date)))::numeric,2) AS avg_age,
+       MIN(DATE_PART('year', AGE(CURRENT_DATE, u.birth_date))) AS youngest_age,
+       MAX(DATE_PART('year', AGE(CURRENT_DATE, u.birth_date))) AS oldest_age
+FROM instructor i
+JOIN "user" u ON u.id=i.id) ages
+) q;
+
+CREATE UNIQUE INDEX report_instructor_general_key ON report_instructor_general (refreshed_at);
+
+CREATE MATERIALIZED VIEW report_most_popular_instructor AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT i.id,
+       u.first_name || ' ' || u.last_name AS full_name,
+       COALESCE(SUM(c.enrollment_count),0) AS total_enrollments
+FROM instructor i
+JOIN "user" u ON u.id=i.id
+LEFT JOIN course c ON c.creator_id=i.id
+GROUP BY i.id,u.first_name,u.last_name
+ORDER BY total_enrollments DESC LIMIT 1
+) q;
+
+CREATE UNIQUE INDEX report_most_popular_instructor_key ON report_most_popular_instructor (id);
+
+CREATE MATERIALIZED VIEW report_student_monthly AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT TO_CHAR(date_trunc('month', u.registration_date),'YYYY-MM') AS month,
+       COUNT(*) AS registration_count
+FROM "user" u
+JOIN student s ON s.id = u.id
+GROUP BY month
+) q;
+
+CREATE UNIQUE INDEX report_student_monthly_key ON report_student_monthly (month);
+
+CREATE MATERIALIZED VIEW report_course_status_counts AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT status, COUNT(*) AS count FROM (
+  SELECT status FROM course WHERE creation_date>=CURRENT_DATE-INTERVAL '1 year'
+) sub GROUP BY status
+) q;
+
+CREATE UNIQUE INDEX report_course_status_counts_key ON report_course_status_counts (status);
+
+CREATE MATERIALIZED VIEW report_course_monthly AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT TO_CHAR(date_trunc('month', creation_date),'YYYY-MM') AS month,
+       COUNT(*) AS course_count
+FROM course WHERE creation_date>=CURRENT_DATE-INTERVAL '1 year'
+GROUP BY month
+) q;
+
+CREATE UNIQUE INDEX report_course_monthly_key ON report_course_monthly (month);
+
+-- First month with data, where each general report's range starts
+CREATE MATERIALIZED VIEW report_first_months AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT (SELECT MIN(date_trunc('month', registration_date)) FROM "user") AS first_user_month,
+       (SELECT MIN(date_trunc('month', u.registration_date))
+        FROM "user" u JOIN instructor i ON i.id = u.id) AS first_instructor_month,
+       (SELECT MIN(date_trunc('month', creation_date)) FROM course) AS first_course_month
+) q;
+
+CREATE UNIQUE INDEX report_first_months_key ON report_first_months (refreshed_at);
+
+CREATE MATERIALIZED VIEW report_most_active_instructor AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT i.id,
+       u.first_name || ' ' || u.last_name AS full_name,
+       i.course_count AS total_courses
+FROM instructor i
+JOIN "user" u ON u.id=i.id
+ORDER BY i.course_count DESC LIMIT 1
+) q;
+
+CREATE UNIQUE INDEX report_most_active_instructor_key ON report_most_active_instructor (id);
+
+-- Instructor registrations per month, with the running instructor total
+CREATE MATERIALIZED VIEW report_instructor_monthly AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT TO_CHAR(m, 'YYYY-MM') AS month,
+       registration_count,
+       SUM(registration_count) OVER (ORDER BY m) AS total_instructors
+FROM (
+  SELECT date_trunc('month', u.registration_date) AS m, COUNT(*) AS registration_count
+  FROM "user" u
+  JOIN instructor i ON i.id = u.id
+  WHERE u.registration_date IS NOT NULL
+  GROUP BY m
+) stats
+) q;
+
+CREATE UNIQUE INDEX report_instructor_monthly_key ON report_instructor_monthly (month);
+
+CREATE MATERIALIZED VIEW report_top_instructors AS
+SELECT q.*, now() AS refreshed_at
+FROM (
+SELECT i.id,
+       u.first_name || ' ' || u.last_name AS full_name,
+       i.i_rating AS rating
+FROM instructor i
+JOIN "user" u ON u.id=i.id
+ORDER BY i.i_rating DESC LIMIT 3
+) q;
+
+CREATE UNIQUE INDEX report_top_instructors_key ON report_top_instructors (id);
+
+
+-- MIGRATION HISTORY
+-- Everything above already contains these migrations, so a database built
+-- from this file records them as applied and migrate.py never re-runs them
+-- (it fills in the checksums). Add every new migration to this list.
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version      INTEGER PRIMARY KEY,
+    name         VARCHAR(100) NOT NULL,
+    checksum     CHAR(64),
+    applied_at   TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    execution_ms INTEGER
+);
+
+INSERT INTO schema_migrations (version, name) VALUES
+    (0, 'baseline'),
+    (1, 'secondary_indexes'),
+    (2, 'progress_counters'),
+    (3, 'statement_counters'),
+    (4, 'rating_counters'),
+    (5, 'notification_inbox'),
+    (6, 'receive_inbox_index'),
+    (7, 'notification_events'),
+    (8, 'bulk_grading_triggers'),
+    (9, 'completion_on_graded_insert'),
+    (10, 'question_version'),
+    (11, 'course_approver_index'),
+    (12, 'course_page_version'),
+    (13, 'report_snapshots'),
+    (14, 'report_jobs'),
+    (15, 'student_recommendations'),
+    (16, 'course_search'),
+    (17, 'course_search_indexes'),
+    (18, 'course_catalog_indexes'),
+    (19, 'course_page_version_columns'),
+    (20, 'report_snapshot_extras'),
+    (21, 'student_category_profile'),
+    (22, 'content_progress_changed_only'),
+    (23, 'financial_aid_approval_only'),
+    (24, 'submit_auto_points')
+ON CONFLICT (version) DO NOTHING;
@@ -20,14 +20,24 @@ const NotificationButton = ({ className = '' }) => {
       fetchNotificationCount();
     }
 
-    // Set up polling interval for notifications (every 30 seconds)
+    // Live updates pushed by the server; the browser reconnects on its own if the stream drops
+    const stream = userData?.user_id
+      ? notificationService.openNotificationStream(userData.user_id, (count) => setUnreadCount(count))
+      : null;
+
+    // Fall back to polling (every 30 seconds) while the stream is not connected
     const intervalId = setInterval(() => {
-      if (userData?.user_id) {
+      if (userData?.user_id && (!stream || stream.readyState !== EventSource.OPEN)) {
         fetchNotificationCount();
       }
     }, 30000); // 30 seconds
 
-    return () => clearInterval(intervalId);
+    return () => {
+      clearInterval(intervalId);
+      if (stream) {
+        stream.close();
+      }
+    };
   }, [userData?.user_id]);
 
   useEffect(() => {
@@ -64,9 +74,9 @@ const NotificationButton = ({ className = '' }) => {
     if (!userData?.user_id) return;
     
     try {
-      const response = await notificationService.getNotificationStats(userData.user_id);
+      const response = await notificationService.getUnreadCount(userData.user_id);
       if (response.success) {
-        const newCount = response.stats.by_status.unread || 0;
+        const newCount = response.unread_count || 0;
         setUnreadCount(newCount);
         
         // Check if this is a new notification using our service
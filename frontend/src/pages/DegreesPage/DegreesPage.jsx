@@ -22,6 +22,11 @@ const DegreesPage = () => {
   const [currentPage, setCurrentPage] = useState(1);
   const [itemsPerPage] = useState(6);
   const [sortOption, setSortOption] = useState("relevance");
+  // The catalog is served in keyset pages: the query of the current listing
+  // and the cursor of its next page
+  const [currentQuery, setCurrentQuery] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const [filters, setFilters] = useState({
     title: "",
@@ -55,6 +60,7 @@ const DegreesPage = () => {
     if (!initialFetchRef.current) {
       initialFetchRef.current = true;
       fetchCourses();
+      fetchFacets();
     }
   }, [navigate, userData]);
 
@@ -66,7 +72,7 @@ const DegreesPage = () => {
       setError('');
 
       const response = await axios.get('http://localhost:5001/api/degrees');
-      const coursesData = response.data;
+      const coursesData = response.data.courses;
 
       console.log('Degrees data received:', coursesData);
 
@@ -76,16 +82,8 @@ const DegreesPage = () => {
 
       setCourses(coursesData);
       setFilteredCourses(coursesData);
-
-      const uniqueCategories = [...new Set(coursesData.map(course => course.category))].filter(Boolean);
-      const uniqueInstructors = [...new Set(coursesData.map(course =>
-        course.instructor_name || "Unknown"))].filter(Boolean);
-      const uniqueLevels = [...new Set(coursesData.map(course =>
-        course.difficulty_level || "Not specified"))].filter(Boolean);
-
-      setCategories(uniqueCategories);
-      setUniversities(uniqueInstructors);
-      setLevels(uniqueLevels);
+      setCurrentQuery('');
+      setNextCursor(response.data.next_cursor);
     } catch (err) {
       console.error('Error fetching online degrees:', err);
       setError('Failed to load online degrees. Please try again later.');
@@ -94,6 +92,49 @@ const DegreesPage = () => {
     }
   };
 
+  // Filter choices cover the whole catalog, not just the pages loaded so far
+  const fetchFacets = async () => {
+    try {
+      const response = await axios.get('http://localhost:5001/api/degrees/facets');
+      if (response.data.success) {
+        setCategories(response.data.categories);
+        setUniversities(response.data.instructors);
+        setLevels(response.data.levels);
+      }
+    } catch (err) {
+      console.error('Error fetching catalog filters:', err);
+    }
+  };
+
+  // Load the next page of the current listing
+  const loadMore = async () => {
+    if (!nextCursor) return;
+
+    try {
+      setLoadingMore(true);
+      const params = new URLSearchParams(currentQuery);
+      params.append('cursor', nextCursor);
+
+      const response = await axios.get(`http://localhost:5001/api/degrees?${params.toString()}`);
+      const moreCourses = response.data.courses;
+
+      if (!Array.isArray(moreCourses)) {
+        throw new Error('Invalid response format');
+      }
+
+      setFilteredCourses((current) => [...current, ...moreCourses]);
+      setNextCursor(response.data.next_cursor);
+      if (!currentQuery) {
+        setCourses((current) => [...current, ...moreCourses]);
+      }
+    } catch (err) {
+      console.error('Error loading more courses:', err);
+      setError('Failed to load more courses. Please try again.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Apply filters with API
   const applyFilters = async () => {
     try {
@@ -160,13 +201,15 @@ const DegreesPage = () => {
       }
 
       const response = await axios.get(`http://localhost:5001/api/degrees?${params.toString()}`);
-      const filteredData = response.data;
+      const filteredData = response.data.courses;
 
       if (!Array.isArray(filteredData)) {
         throw new Error('Invalid response format');
       }
 
       setFilteredCourses(filteredData);
+      setCurrentQuery(params.toString());
+      setNextCursor(response.data.next_cursor);
       setCurrentPage(1);
 
     } catch (err) {
@@ -560,6 +603,12 @@ const DegreesPage = () => {
                 )}
               </div>
             )}
+
+            {!loading && nextCursor && (
+              <button className="load-more-button" onClick={loadMore} disabled={loadingMore}>
+                {loadingMore ? 'Loading...' : 'Load more courses'}
+              </button>
+            )}
           </div>
         </div>
       </div>
@@ -45,7 +45,8 @@ const InstructorGradingPage = () => {
     }
 
     setSubmittingGrade(key);
-    const result = await gradeSubmission(sub.course_id, sub.sec_id, sub.content_id, sub.student_id, grade);
+    const openEndedOnly = sub.auto_points != null;
+    const result = await gradeSubmission(sub.course_id, sub.sec_id, sub.content_id, sub.student_id, grade, openEndedOnly);
   
     if (result.success) {
       // Remove the graded item from list
@@ -164,6 +165,9 @@ const InstructorGradingPage = () => {
                   {sub.task_type === "assessment" && (
                     <div>
                       <p><strong>Question Count:</strong> {sub.question_count}</p>
+                      {sub.auto_points != null && (
+                        <p><strong>Multiple Choice Score:</strong> {sub.auto_points} / {sub.auto_max_points} (graded automatically)</p>
+                      )}
                       <h4>Questions:</h4>
                       {sub.questions && sub.questions.map((q, idx) => (
                         <div key={idx} style={{ marginBottom: '10px', paddingLeft: '10px' }}>
@@ -181,7 +185,7 @@ const InstructorGradingPage = () => {
                 )}
 
                 <div style={{ marginTop: '10px' }}>
-                  <label><strong>Grade (0-100):</strong></label>
+                  <label><strong>{sub.auto_points != null ? "Open-Ended Grade (0-100):" : "Grade (0-100):"}</strong></label>
                   <input
                     type="number"
                     min={0}
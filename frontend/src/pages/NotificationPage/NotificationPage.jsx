@@ -11,7 +11,10 @@ import InstructorHeader from '../../components/InstructorHeader';
 
 const NotificationPage = () => {
   const [notifications, setNotifications] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [unreadCount, setUnreadCount] = useState(0);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
   const navigate = useNavigate();
 
@@ -48,23 +51,12 @@ const NotificationPage = () => {
         const response = await notificationService.getUserNotifications(userId, statusParam);
 
         if (response.success) {
-          // Transform backend data to match our component's expected format
-          const transformedNotifications = response.notifications.map(note => ({
-            id: note.notification_id,
-            type: note.type,
-            title: getTitleFromType(note.type),
-            message: note.message,
-            course: note.entity_type === 'course' ? note.entity_id : null,
-            time: formatTimeAgo(note.timestamp),
-            read: note.status !== 'unread',
-            status: note.status
-          }));
-
-          setNotifications(transformedNotifications);
+          setNotifications(response.notifications.map(transformNotification));
+          setNextCursor(response.next_cursor);
+          setUnreadCount(response.unread_count);
 
           // Update the notification count in local storage for comparison
-          const unreadCount = transformedNotifications.filter(note => !note.read).length;
-          notificationService.acknowledgeNotifications(unreadCount);
+          notificationService.acknowledgeNotifications(response.unread_count);
         } else {
           setError(response.message || 'Failed to fetch notifications');
         }
@@ -79,6 +71,39 @@ const NotificationPage = () => {
     fetchNotifications();
   }, [userId, activeFilter]);
 
+  // Load the next page of notifications
+  const loadMore = async () => {
+    if (!userId || !nextCursor) return;
+
+    try {
+      setLoadingMore(true);
+      const statusParam = activeFilter !== 'all' ? activeFilter : null;
+      const response = await notificationService.getUserNotifications(userId, statusParam, nextCursor);
+
+      if (response.success) {
+        setNotifications((current) => [...current, ...response.notifications.map(transformNotification)]);
+        setNextCursor(response.next_cursor);
+        setUnreadCount(response.unread_count);
+      }
+    } catch (err) {
+      console.error('Error loading more notifications:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // Transform backend data to match our component's expected format
+  const transformNotification = (note) => ({
+    id: note.notification_id,
+    type: note.type,
+    title: getTitleFromType(note.type),
+    message: note.message,
+    course: note.entity_type === 'course' ? note.entity_id : null,
+    time: formatTimeAgo(note.timestamp),
+    read: note.status !== 'unread',
+    status: note.status
+  });
+
   // Helper function to generate title based on notification type
   const getTitleFromType = (type) => {
     switch (type) {
@@ -118,6 +143,9 @@ const NotificationPage = () => {
       const response = await notificationService.markNotificationAsRead(id, userId);
 
       if (response.success) {
+        if (notifications.some((note) => note.id === id && !note.read)) {
+          setUnreadCount((count) => Math.max(count - 1, 0));
+        }
         setNotifications(
           notifications.map((note) =>
             note.id === id ? { ...note, read: true, status: 'read' } : note
@@ -137,6 +165,7 @@ const NotificationPage = () => {
       const response = await notificationService.markAllNotificationsAsRead(userId);
 
       if (response.success) {
+        setUnreadCount(0);
         setNotifications(
           notifications.map((note) => ({ ...note, read: true, status: 'read' }))
         );
@@ -155,6 +184,9 @@ const NotificationPage = () => {
       const response = await notificationService.archiveNotification(id, userId);
 
       if (response.success) {
+        if (notifications.some((note) => note.id === id && !note.read)) {
+          setUnreadCount((count) => Math.max(count - 1, 0));
+        }
         // Remove the notification from the list if we're not viewing archived
         if (activeFilter !== 'archived') {
           setNotifications(notifications.filter(note => note.id !== id));
@@ -203,8 +235,6 @@ const NotificationPage = () => {
     }
   };
 
-  // Count unread notifications
-  const unreadCount = notifications.filter(note => !note.read).length;
 
   // Get filtered notifications
   const filteredNotifications = getFilteredNotifications();
@@ -321,6 +351,11 @@ const NotificationPage = () => {
               </div>
             ))
           )}
+          {!loading && !error && nextCursor && (
+            <button className="load-more-button" onClick={loadMore} disabled={loadingMore}>
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          )}
         </div>
       </div>
     </div>
@@ -20,6 +20,7 @@ const ProfilePage = () => {
     const [profile, setProfile] = useState(null);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
+    const [loadingFeedback, setLoadingFeedback] = useState(false);
 
     /* ───── read user from storage ───── */
     const userInfo = getCurrentUser();          // { user_id, role }
@@ -50,6 +51,30 @@ const ProfilePage = () => {
         fetchProfile();
     }, [userId]);
 
+    /* ───── next page of instructor feedback ───── */
+    const loadMoreFeedback = async () => {
+        const cursor = profile?.instructor_info?.feedback_next_cursor;
+        if (!cursor || loadingFeedback) return;
+        setLoadingFeedback(true);
+        try {
+            const res = await fetch(
+                `http://localhost:5001/api/profile/${userId}/feedback?cursor=${encodeURIComponent(cursor)}`,
+                { credentials: 'include' }
+            );
+            const data = await res.json();
+            if (!data.success) throw new Error(data.message);
+            setProfile(prev => ({
+                ...prev,
+                instructor_info: {
+                    ...prev.instructor_info,
+                    feedbacks: [...prev.instructor_info.feedbacks, ...data.feedbacks],
+                    feedback_next_cursor: data.next_cursor
+                }
+            }));
+        } catch (e) { console.error('Feedback fetch failed:', e); }
+        finally { setLoadingFeedback(false); }
+    };
+
     /* ───── early states ───── */
     if (loading) return <div className="profile-page"><p>Loading…</p></div>;
     if (error) return <div className="profile-page"><p className="error">{error}</p></div>;
@@ -98,6 +123,11 @@ const ProfilePage = () => {
                         <section className="feedback-wrapper">
                             <h4 className="feedback-heading">Feedback</h4>
                             <FeedbackCardList list={profile.instructor_info?.feedbacks ?? []} />
+                            {profile.instructor_info?.feedback_next_cursor && (
+                                <button className="load-more-button" onClick={loadMoreFeedback} disabled={loadingFeedback}>
+                                    {loadingFeedback ? 'Loading…' : 'Load more'}
+                                </button>
+                            )}
                         </section>
                     )}
 
@@ -38,13 +38,15 @@ export async function getUngradedSubmissions(instructorId, sort = 'newest', limi
   }
 }
 
-export async function gradeSubmission(courseId, secId, contentId, studentId, grade) {
+// openEndedOnly: grade covers only the open-ended part of an assessment whose
+// multiple-choice part was scored at submission
+export async function gradeSubmission(courseId, secId, contentId, studentId, grade, openEndedOnly = false) {
   try {
     const response = await fetch(`${BASE_URL}/api/grade/${courseId}/${secId}/${contentId}/${studentId}`, {
       method: 'PUT',
       headers: { 'Content-Type': 'application/json' },
       credentials: 'include',
-      body: JSON.stringify({ grade: parseInt(grade) })
+      body: JSON.stringify(openEndedOnly ? { open_ended_grade: parseInt(grade) } : { grade: parseInt(grade) })
     });
 
     return await response.json();
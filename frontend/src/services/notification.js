@@ -1,12 +1,18 @@
 const BASE_URL = 'http://localhost:5001';
 
-// Function to get all notifications for a user
-export async function getUserNotifications(userId, status = null) {
+// Function to get one page of a user's notifications (newest first).
+// Pass the next_cursor of the previous response to get the following page.
+export async function getUserNotifications(userId, status = null, cursor = null) {
   try {
-    let url = `${BASE_URL}/api/notifications/${userId}`;
+    const params = new URLSearchParams();
     if (status) {
-      url += `?status=${status}`;
+      params.append('status', status);
     }
+    if (cursor) {
+      params.append('cursor', cursor);
+    }
+    const query = params.toString();
+    const url = `${BASE_URL}/api/notifications/${userId}${query ? `?${query}` : ''}`;
     
     const response = await fetch(url, {
       method: 'GET',
@@ -125,6 +131,56 @@ export async function getNotificationStats(userId) {
   }
 }
 
+// Function to get the unread notification count (cheap, for polling)
+export async function getUnreadCount(userId) {
+  try {
+    const response = await fetch(`${BASE_URL}/api/notifications/unread-count/${userId}`, {
+      method: 'GET',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      credentials: 'include',
+    });
+    
+    const data = await response.json();
+    
+    if (!response.ok) {
+      throw new Error(data.message || 'Failed to fetch unread count');
+    }
+    
+    return data;
+  } catch (error) {
+    console.error('Error fetching unread count:', error);
+    throw error;
+  }
+}
+
+// Open the server-sent event stream of a user's notifications.
+// onUnreadCount is called with the current unread count on connect and on every new notification.
+// Returns the EventSource (call close() on it when done), or null if the browser has no EventSource.
+export function openNotificationStream(userId, onUnreadCount) {
+  if (typeof EventSource === 'undefined') {
+    return null;
+  }
+
+  const stream = new EventSource(`${BASE_URL}/api/notifications/stream/${userId}`, {
+    withCredentials: true,
+  });
+
+  const handleEvent = (event) => {
+    try {
+      const data = JSON.parse(event.data);
+      onUnreadCount(data.unread_count);
+    } catch (error) {
+      console.error('Error reading notification event:', error);
+    }
+  };
+
+  stream.addEventListener('unread', handleEvent);
+  stream.addEventListener('notification', handleEvent);
+  return stream;
+}
+
 // Function to create a custom notification
 export async function createNotification(notificationData) {
   try {